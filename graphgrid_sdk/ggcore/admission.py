@@ -0,0 +1,199 @@
+"""Define a host-wide limit on in-flight dag runs, shared by processes."""
+import contextlib
+import hashlib
+import logging
+import os
+import time
+import typing
+import uuid
+
+from graphgrid_sdk.ggcore.config import SdkBootstrapConfig
+from graphgrid_sdk.ggcore.timeouts import current_deadline
+from graphgrid_sdk.ggcore.token_cache import file_lock
+
+LEASE_SUFFIX = ".lease"
+PENDING_PREFIX = "pending-"
+RUN_PREFIX = "run-"
+
+logger = logging.getLogger(__name__)
+
+
+def _is_process_alive(pid: int) -> bool:
+    """Return whether a process with the pid exists on this host."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        # exists but belongs to someone else, or cannot be checked here
+        return True
+    return True
+
+
+class AdmissionLease:
+    """Define class representing one slot taken from a FileSlotSemaphore.
+
+    A lease is pending while its dag run is being triggered. Once bound to
+    the triggered run, any process polling the run renews it, and any
+    process observing the run's terminal state can release it through the
+    semaphore.
+    """
+
+    def __init__(self, semaphore: 'FileSlotSemaphore', path: str):
+        self._semaphore = semaphore
+        self._path = path
+
+    @property
+    def path(self) -> str:
+        """Return the path of the lease file."""
+        return self._path
+
+    def bind(self, dag_id: str, dag_run_id: str):
+        """Hold the slot until the dag run is observed in a terminal state.
+
+        The run was already triggered, so a lease that cannot be moved (e.g.
+        because it expired meanwhile) is created afresh rather than raising.
+        """
+        run_path = self._semaphore.run_lease_path(dag_id, dag_run_id)
+        try:
+            os.replace(self._path, run_path)
+        except OSError:
+            try:
+                with open(run_path, "a", encoding="utf-8"):
+                    pass
+                os.utime(run_path)
+            except OSError:
+                logger.warning("Could not hold an admission slot for dag "
+                               "run %s of %s.", dag_run_id, dag_id,
+                               exc_info=True)
+            with contextlib.suppress(OSError):
+                os.remove(self._path)
+        self._path = run_path
+
+    def cancel(self):
+        """Give the slot back, e.g. because no run was triggered."""
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self._path)
+
+
+class FileSlotSemaphore:
+    """Define class limiting in-flight dag runs across the processes of a
+    host.
+
+    Each in-flight run holds a lease file in ``directory``; at most
+    ``limit`` leases exist at once. Leases are counted and created under an
+    advisory file lock. Leases of runs expire ``lease_timeout`` seconds
+    after they were last renewed or bound, and pending leases of processes
+    that died before triggering are dropped.
+    """
+
+    def __init__(self, directory: str, limit: int,
+                 lease_timeout: float, poll_interval: float = 0.5):
+        self._directory = directory
+        self._limit = limit
+        self._lease_timeout = lease_timeout
+        self._poll_interval = poll_interval
+        self._lock_path = os.path.join(directory, ".lock")
+
+    @classmethod
+    def from_config(cls, bootstrap_config: SdkBootstrapConfig) \
+            -> typing.Optional['FileSlotSemaphore']:
+        """Return the semaphore configured for the host, if any."""
+        if bootstrap_config.admission_dir is None:
+            return None
+        return cls(bootstrap_config.admission_dir,
+                   bootstrap_config.admission_limit,
+                   bootstrap_config.admission_lease_timeout)
+
+    def run_lease_path(self, dag_id: str, dag_run_id: str) -> str:
+        """Return the lease file path for a dag run."""
+        digest = hashlib.sha256(
+            f"{dag_id}/{dag_run_id}".encode("utf-8")).hexdigest()
+        return os.path.join(self._directory,
+                            f"{RUN_PREFIX}{digest}{LEASE_SUFFIX}")
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Hold the host-wide lock of the semaphore."""
+        os.makedirs(self._directory, mode=0o700, exist_ok=True)
+        with file_lock(self._lock_path):
+            yield
+
+    def _is_stale(self, name: str, path: str, now: float) -> bool:
+        """Return whether a lease no longer holds a slot."""
+        if name.startswith(PENDING_PREFIX):
+            pid = name[len(PENDING_PREFIX):].split("-", 1)[0]
+            if pid.isdigit() and not _is_process_alive(int(pid)):
+                return True
+        return now - os.path.getmtime(path) > self._lease_timeout
+
+    def _live_leases(self) -> int:
+        """Count leases, removing stale ones. Call with the lock held."""
+        now = time.time()
+        live = 0
+        for name in os.listdir(self._directory):
+            if not name.endswith(LEASE_SUFFIX):
+                continue
+            path = os.path.join(self._directory, name)
+            try:
+                if self._is_stale(name, path, now):
+                    os.remove(path)
+                else:
+                    live += 1
+            except FileNotFoundError:
+                # released concurrently
+                pass
+        return live
+
+    def in_flight(self) -> int:
+        """Return the number of slots currently taken."""
+        with self._locked():
+            return self._live_leases()
+
+    def try_acquire(self) -> typing.Optional[AdmissionLease]:
+        """Take a slot if one is free, without waiting."""
+        with self._locked():
+            if self._live_leases() >= self._limit:
+                return None
+            path = os.path.join(
+                self._directory,
+                f"{PENDING_PREFIX}{os.getpid()}-{uuid.uuid4().hex}"
+                f"{LEASE_SUFFIX}")
+            with open(path, "x", encoding="utf-8"):
+                pass
+            return AdmissionLease(self, path)
+
+    def acquire(self) -> AdmissionLease:
+        """Take a slot, waiting for one to free up.
+
+        Raises SdkTimeoutException if the current call deadline passes
+        first.
+        """
+        while True:
+            lease = self.try_acquire()
+            if lease is not None:
+                return lease
+
+            delay = self._poll_interval
+            deadline = current_deadline()
+            if deadline is not None:
+                delay = min(delay, deadline.check())
+            time.sleep(delay)
+
+    def renew(self, dag_id: str, dag_run_id: str) -> bool:
+        """Restart the lease timeout of a dag run still in flight. Return
+        False if it held no slot.
+        """
+        try:
+            os.utime(self.run_lease_path(dag_id, dag_run_id))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def release(self, dag_id: str, dag_run_id: str) -> bool:
+        """Free the slot of a dag run. Return False if it held none."""
+        try:
+            os.remove(self.run_lease_path(dag_id, dag_run_id))
+        except FileNotFoundError:
+            return False
+        return True
@@ -3,11 +3,14 @@ import json
 import typing
 from dataclasses import dataclass
 
+from graphgrid_sdk.ggcore.retry import RetryPolicy, IDEMPOTENT_RETRY, \
+    NO_RETRY
 from graphgrid_sdk.ggcore.sdk_messages import SdkServiceResponse, \
     SdkServiceRequest, GetDataResponse, TestApiResponse, SaveDatasetResponse, \
     GenericResponse, GetTokenResponse, CheckTokenResponse, \
     PromoteModelResponse, DagRunResponse, NMTStatusResponse, \
     NMTTrainResponse, TrainRequestBody, GetActiveModelResponse
+from graphgrid_sdk.ggcore.upload import chunked, ProgressCallback
 from graphgrid_sdk.ggcore.utils import CONFIG, SECURITY, NLP, HttpMethod, \
     GRANT_TYPE_KEY, GRANT_TYPE_CLIENT_CREDENTIALS, CONTENT_TYPE_HEADER_KEY, \
     CONTENT_TYPE_APP_JSON, USER_AGENT, CONTENT_TYPE_APP_X_WWW_FORM_URLENCODED
@@ -50,6 +53,14 @@ class AbstractApi:
         """Return body of the http request."""
         return {}  # overrides provide api-specific body
 
+    def retry_policy(self) -> RetryPolicy:
+        """Return the retry policy for the http request. By default only
+        GET requests are retried; overrides can opt other safe requests in
+        (or out).
+        """
+        return IDEMPOTENT_RETRY if self.http_method() == HttpMethod.GET \
+            else NO_RETRY
+
     # pylint: disable=no-self-use
     def handler(self, generic_response: GenericResponse):
         """Handle the sdk response."""
@@ -147,6 +158,10 @@ class SecurityApi(ApiGroup):
         def query_params(self) -> dict:
             return {GRANT_TYPE_KEY: GRANT_TYPE_CLIENT_CREDENTIALS}
 
+        def retry_policy(self) -> RetryPolicy:
+            # issuing a token has no side effects, safe to repeat
+            return IDEMPOTENT_RETRY
+
         def handler(self, generic_response: GenericResponse):
             return GetTokenResponse(generic_response)
 
@@ -178,6 +193,10 @@ class SecurityApi(ApiGroup):
                 CONTENT_TYPE_HEADER_KEY: CONTENT_TYPE_APP_X_WWW_FORM_URLENCODED
             }
 
+        def retry_policy(self) -> RetryPolicy:
+            # checking a token is read-only, safe to repeat
+            return IDEMPOTENT_RETRY
+
         def handler(self, generic_response: GenericResponse):
             return CheckTokenResponse(generic_response)
 
@@ -186,9 +205,13 @@ class NlpApi(ApiGroup):
     """Define grouping of Nlp api definitions."""
 
     @classmethod
-    def save_dataset_api(cls, generator: typing.Generator, filename: str):
+    def save_dataset_api(cls, generator: typing.Generator, filename: str,
+                         chunk_size: typing.Optional[int] = None,
+                         progress_callback: typing.Optional[
+                             ProgressCallback] = None):
         """Return save dataset api."""
-        return cls.SaveDatasetApi(generator, filename)
+        return cls.SaveDatasetApi(generator, filename, chunk_size,
+                                  progress_callback)
 
     @classmethod
     def promote_model_api(cls, model_name: str, environment: str):
@@ -225,10 +248,17 @@ class NlpApi(ApiGroup):
         """Define SaveDatasetApi api."""
         _generator: typing.Generator
         _filename: str
+        _chunk_size: typing.Optional[int]
+        _progress_callback: typing.Optional[ProgressCallback]
 
-        def __init__(self, generator: typing.Generator, filename: str):
+        def __init__(self, generator: typing.Generator, filename: str,
+                     chunk_size: typing.Optional[int] = None,
+                     progress_callback: typing.Optional[
+                         ProgressCallback] = None):
             self._generator = generator
             self._filename = filename
+            self._chunk_size = chunk_size
+            self._progress_callback = progress_callback
 
         def api_base(self) -> str:
             return NLP
@@ -240,7 +270,10 @@ class NlpApi(ApiGroup):
             return HttpMethod.POST
 
         def body(self):
-            return self._generator
+            if self._chunk_size is None and self._progress_callback is None:
+                return self._generator
+            return chunked(self._generator, self._chunk_size,
+                           self._progress_callback)
 
         def handler(self, generic_response: GenericResponse):
             return SaveDatasetResponse(generic_response)
@@ -264,6 +297,10 @@ class NlpApi(ApiGroup):
         def http_method(self) -> HttpMethod:
             return HttpMethod.POST
 
+        def retry_policy(self) -> RetryPolicy:
+            # promotion swaps the live model, never repeat it blindly
+            return NO_RETRY
+
         def handler(self, generic_response: GenericResponse):
             return PromoteModelResponse(generic_response)
 
@@ -311,6 +348,10 @@ class NlpApi(ApiGroup):
         def http_method(self) -> HttpMethod:
             return HttpMethod.POST
 
+        def retry_policy(self) -> RetryPolicy:
+            # a repeated trigger starts a second dag run
+            return NO_RETRY
+
         def handler(self, generic_response: GenericResponse):
             return DagRunResponse(generic_response)
 
@@ -393,5 +434,6 @@ class SdkRequestBuilder:
         sdk_req.http_method = api_def.http_method()
         sdk_req.query_params = api_def.query_params()
         sdk_req.body = api_def.body()
+        sdk_req.retry_policy = api_def.retry_policy()
 
         return sdk_req
@@ -0,0 +1,337 @@
+"""Define asyncio client classes for the sdk.
+
+The async clients reuse the api definitions, request building and response
+handling of the blocking clients. Only the http exchange itself is handed to
+a bounded executor sharing the sdk's pooled session; token refresh is
+coordinated on the event loop so concurrent coroutines share one refresh.
+"""
+import asyncio
+import contextvars
+import functools
+import typing
+from concurrent.futures import Executor
+
+from graphgrid_sdk.ggcore.api import AbstractApi, ConfigApi, NlpApi
+from graphgrid_sdk.ggcore.client import SecurityClientBase, ConfigClient, \
+    NlpClient
+from graphgrid_sdk.ggcore.dedup import training_fingerprint
+from graphgrid_sdk.ggcore.http_base import SdkHttpClient
+from graphgrid_sdk.ggcore.sdk_exceptions import \
+    SdkUnauthorizedInvalidTokenException, SdkTimeoutException
+from graphgrid_sdk.ggcore.sdk_messages import GenericResponse, \
+    GetDataResponse, SaveDatasetResponse, PromoteModelResponse, \
+    DagRunResponse, NMTStatusResponse, NMTTrainResponse, TrainRequestBody
+from graphgrid_sdk.ggcore.timeouts import deadline_scope
+from graphgrid_sdk.ggcore.upload import ProgressCallback
+from graphgrid_sdk.ggcore.utils import NMT_DAG_ID
+
+DatasetGenerator = typing.Union[typing.Generator, typing.AsyncGenerator]
+
+# Marks the end of an async iterable consumed from a worker thread
+_EXHAUSTED = object()
+
+
+async def _anext(iterator: typing.AsyncIterator):
+    """Return the next item of an async iterator, or _EXHAUSTED."""
+    try:
+        return await iterator.__anext__()
+    except StopAsyncIteration:
+        return _EXHAUSTED
+
+
+def iterate_in_thread(async_iterable: typing.AsyncIterable,
+                      loop: asyncio.AbstractEventLoop) -> typing.Generator:
+    """Return a blocking generator over an async iterable.
+
+    Meant to be consumed from an executor thread while ``loop`` runs; each
+    item is produced on the loop, so the async iterable is never touched
+    from another thread.
+    """
+    iterator = async_iterable.__aiter__()
+    while True:
+        item = asyncio.run_coroutine_threadsafe(_anext(iterator),
+                                                loop).result()
+        if item is _EXHAUSTED:
+            return
+        yield item
+
+
+class AsyncSecurityClientBase:
+    """Define async security client base. Wrap a blocking security client
+    and provide awaitable, concurrency-safe invocation of api definitions.
+    """
+    _client: SecurityClientBase
+    _executor: Executor
+    _auth_lock: typing.Optional[asyncio.Lock] = None
+
+    def __init__(self, client: SecurityClientBase, executor: Executor):
+        self._client = client
+        self._executor = executor
+
+    @property
+    def security_client(self):
+        """Return the internal security client providing auth."""
+        return self._client.security_client
+
+    async def _run(self, func, *args):
+        """Run a blocking callable on the executor and await its result.
+
+        The callable runs in a copy of the current context so the call
+        deadline carries over to the worker thread.
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(context.run, func, *args))
+
+    async def prepare_auth(self, stale_token: typing.Optional[str] = None):
+        """Make sure a usable token is present.
+
+        Concurrent coroutines share a single refresh and wait for it on the
+        event loop rather than tying up executor threads; the token factory
+        is itself single-flight across threads. When ``stale_token`` is
+        given the token is force-refreshed, unless another caller already
+        replaced it.
+        """
+        security_client = self._client.security_client
+        if stale_token is None and security_client.is_auth_ready():
+            return
+
+        # created lazily so the lock binds to the running loop
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+
+        async with self._auth_lock:
+            if stale_token is None:
+                if not security_client.is_auth_ready():
+                    await self._run(security_client.prepare_auth)
+            elif security_client.get_current_token() == stale_token:
+                await self._run(security_client.prepare_auth, True,
+                                stale_token)
+
+    async def call_api(self, api: AbstractApi,
+                       stale_token: typing.Optional[str] = None
+                       ) -> typing.Tuple[GenericResponse, str]:
+        """Define method that composes the steps for a full api call.
+        Return the response and the token the request was sent with.
+        """
+        # prepare auth for call
+        await self.prepare_auth(stale_token)
+
+        # build request with the token read once, so the one reported is
+        # the one sent
+        used_token = self._client.security_client.get_current_token()
+        sdk_request = self._client.build_sdk_request(api, used_token)
+
+        # make request
+        return await self._run(self._client.make_request,
+                               sdk_request), used_token
+
+    async def _exchange(self, api: AbstractApi) -> GenericResponse:
+        """Call the api, checking the token and retrying once on 401."""
+        # fail fast while the service is known to be down
+        self._client.check_circuit(api)
+
+        # a 401 retry only refreshes the token this call went out with if
+        # no other coroutine has done so already
+        generic_response, used_token = await self.call_api(api)
+
+        # only a 401 needs the generic handler, which may check the token
+        # over the network
+        if generic_response.status_code == 401:
+            try:
+                await self._run(self._client.generic_response_handler,
+                                generic_response, used_token)
+            except SdkUnauthorizedInvalidTokenException:
+                # single retry for invalid token
+                generic_response, _ = await self.call_api(
+                    api, stale_token=used_token)
+
+        return generic_response
+
+    async def invoke(self, api: AbstractApi,
+                     timeout: typing.Optional[float] = None):
+        """Define method that builds and makes SDK requests from an API
+        definition.
+
+        The optional timeout (seconds) bounds the whole call, including
+        waiting for a shared token refresh.
+        """
+        with deadline_scope(self._client.call_timeout(timeout)) as deadline:
+            if deadline is None:
+                generic_response = await self._exchange(api)
+            else:
+                remaining = deadline.check()
+                try:
+                    generic_response = await asyncio.wait_for(
+                        self._exchange(api), remaining)
+                except asyncio.TimeoutError as timeout_error:
+                    raise SdkTimeoutException(
+                        "Sdk call exceeded its deadline.") from timeout_error
+
+        # custom handler call if response passes generic handler
+        return api.handler(generic_response)
+
+
+class AsyncConfigClient(AsyncSecurityClientBase):
+    """Define AsyncConfigClient to hold the async config sdk calls."""
+
+    def __init__(self, bootstrap_config, http_client: SdkHttpClient,
+                 executor: Executor):
+        super().__init__(ConfigClient(bootstrap_config, http_client),
+                         executor)
+
+    async def test_api(self, test_message: str,
+                       timeout: typing.Optional[float] = None):
+        """Return test api sdk call."""
+        api_call = ConfigApi.test_api(test_message)
+        return await self.invoke(api_call, timeout)
+
+    async def get_data(self, module: str,
+                       profiles: typing.Union[str, typing.List[str]],
+                       revision: str,
+                       timeout: typing.Optional[float] = None
+                       ) -> GetDataResponse:
+        """Return get data sdk call."""
+        api_call = ConfigApi.get_data_api(module, profiles, revision)
+        return await self.invoke(api_call, timeout)
+
+
+class AsyncNlpClient(AsyncSecurityClientBase):
+    """Define AsyncNlpClient to hold the async nlp sdk calls."""
+    _client: NlpClient
+    # deduplicated training triggers in flight, by request fingerprint
+    _training_triggers: typing.Dict[str, asyncio.Future]
+
+    def __init__(self, bootstrap_config, http_client: SdkHttpClient,
+                 executor: Executor):
+        super().__init__(NlpClient(bootstrap_config, http_client), executor)
+        self._training_triggers = {}
+
+    async def _trigger(self, api_call: AbstractApi, dag_id: str,
+                       timeout: typing.Optional[float]) -> DagRunResponse:
+        """Trigger a dag run once admitted by the host-wide admission
+        semaphore, if configured.
+        """
+        admission = self._client.admission
+        if admission is None:
+            return await self.invoke(api_call, timeout)
+
+        # waiting for admission counts against the call deadline
+        with deadline_scope(self._client.call_timeout(timeout)):
+            lease = await self._run(admission.acquire)
+            try:
+                response = await self.invoke(api_call)
+            except BaseException:
+                lease.cancel()
+                raise
+            self._client.settle_admission(lease, dag_id, response)
+        return response
+
+    async def save_dataset(self, generator: DatasetGenerator,
+                           filename: str,
+                           timeout: typing.Optional[float] = None,
+                           progress_callback: typing.Optional[
+                               ProgressCallback] = None
+                           ) -> SaveDatasetResponse:
+        """Return save dataset sdk call. Accepts sync or async
+        generators.
+        """
+        if hasattr(generator, "__aiter__"):
+            generator = iterate_in_thread(generator,
+                                          asyncio.get_running_loop())
+        api_call = self._client.save_dataset_api(generator, filename,
+                                                 progress_callback)
+        return await self.invoke(api_call, timeout)
+
+    async def promote_model(self, model_name: str,
+                            environment: str,
+                            timeout: typing.Optional[float] = None
+                            ) -> PromoteModelResponse:
+        """Return promote model sdk call."""
+        api_call = NlpApi.promote_model_api(model_name, environment)
+        promote_response = await self.invoke(api_call, timeout)
+        self._client.forget_active_models(promote_response)
+        return promote_response
+
+    async def get_dag_run_status(self, dag_id: str,
+                                 dag_run_id: str,
+                                 timeout: typing.Optional[float] = None
+                                 ) -> DagRunResponse:
+        """Return get dag run status sdk call."""
+        api_call = NlpApi.get_dag_run_status_api(dag_id, dag_run_id)
+        response = await self.invoke(api_call, timeout)
+        self._client.observe_dag_run(dag_id, response)
+        return response
+
+    async def trigger_dag(self, dag_id: str,
+                          request_body: dict,
+                          timeout: typing.Optional[float] = None
+                          ) -> DagRunResponse:
+        """Return trigger dag sdk call."""
+        api_call = NlpApi.trigger_dag_api(dag_id, request_body)
+        return await self._trigger(api_call, dag_id, timeout)
+
+    async def get_nmt_status(self, dag_run_id: str,
+                             timeout: typing.Optional[float] = None
+                             ) -> NMTStatusResponse:
+        """Return nmt train status call."""
+        api_call = NlpApi.nmt_status_api(dag_run_id)
+        response = await self.invoke(api_call, timeout)
+        self._client.observe_dag_run(NMT_DAG_ID, response)
+        return response
+
+    async def trigger_nmt(self, request_body: TrainRequestBody,
+                          timeout: typing.Optional[float] = None,
+                          deduplicate: bool = True) -> NMTTrainResponse:
+        """Return job train sdk call. With ``deduplicate`` an identical,
+        recently triggered or succeeded run is returned instead of
+        triggering a new one.
+
+        Concurrent identical calls share one trigger request, sent with the
+        first caller's timeout. Cancelling a waiting call does not cancel
+        the shared trigger.
+        """
+        api_call = NlpApi.nmt_train_api(request_body)
+        if not self._client.reuses_training(request_body, deduplicate):
+            return await self._trigger(api_call, NMT_DAG_ID, timeout)
+
+        training_runs = self._client.training_runs
+        fingerprint = training_fingerprint(request_body)
+        trigger_response = training_runs.get(fingerprint)
+        if trigger_response is not None:
+            return trigger_response
+
+        in_flight = self._training_triggers.get(fingerprint)
+        if in_flight is None:
+            in_flight = asyncio.ensure_future(self._trigger_training(
+                api_call, fingerprint, timeout))
+            self._training_triggers[fingerprint] = in_flight
+            in_flight.add_done_callback(
+                lambda _: self._training_triggers.pop(fingerprint, None))
+        return await asyncio.shield(in_flight)
+
+    async def _trigger_training(self, api_call: AbstractApi, fingerprint: str,
+                                timeout: typing.Optional[float]) \
+            -> NMTTrainResponse:
+        """Trigger a training run and reuse it for identical requests."""
+        trigger_response = await self._trigger(api_call, NMT_DAG_ID, timeout)
+        self._client.training_runs.remember(fingerprint, trigger_response)
+        return trigger_response
+
+    async def get_active_model(self, nlp_task: str,
+                               timeout: typing.Optional[float] = None):
+        """Return get active model sdk call, cached like the blocking
+        call.
+        """
+        active_models = self._client.http_client.active_models
+        if active_models is None:
+            api_call = NlpApi.get_active_model_api(nlp_task)
+            return await self.invoke(api_call, timeout)
+
+        cached = active_models.get(getattr(nlp_task, "value", nlp_task))
+        if cached is not None:
+            return cached
+        # a miss is filled single-flight with the blocking clients
+        return await self._run(self._client.get_active_model, nlp_task,
+                               timeout)
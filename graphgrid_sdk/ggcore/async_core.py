@@ -0,0 +1,133 @@
+"""Define the async SDK core entrypoint for async sdk calls."""
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+from graphgrid_sdk.ggcore.async_client import AsyncConfigClient, \
+    AsyncNlpClient, DatasetGenerator
+from graphgrid_sdk.ggcore.config import SdkBootstrapConfig
+from graphgrid_sdk.ggcore.http_base import SdkHttpClient
+from graphgrid_sdk.ggcore.sdk_messages import SaveDatasetResponse, \
+    PromoteModelResponse, GetDataResponse, \
+    DagRunResponse, NMTTrainResponse, NMTStatusResponse, TrainRequestBody
+from graphgrid_sdk.ggcore.upload import ProgressCallback
+from graphgrid_sdk.ggcore.utils import SUPPORTED_CLIENTS
+
+
+class AsyncSdkCore:
+    """Define async core sdk class to hold sdk configuration plus all async
+    clients used for the sdk. Execute the calls coming from
+    AsyncGraphGridSdk.
+    """
+    _configuration: SdkBootstrapConfig
+    _http_client: SdkHttpClient
+    _executor: ThreadPoolExecutor
+    _closed: bool = False
+
+    _config_client: AsyncConfigClient
+    _nlp_client: AsyncNlpClient
+
+    def __init__(self, bootstrap_config: SdkBootstrapConfig,
+                 max_workers: typing.Optional[int] = None):
+        self._configuration = bootstrap_config
+        self._http_client = SdkHttpClient(self._configuration)
+
+        # by default allow as many in-flight requests as pooled connections
+        if max_workers is None:
+            max_workers = sum(self._configuration.service_pool_maxsize(
+                api_base) for api_base in SUPPORTED_CLIENTS)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="graphgrid-sdk")
+
+        self._setup_clients()
+        # hold the shared token, renewing it if configured, until closed
+        self._nlp_client.security_client.hold_token()
+
+    def _setup_clients(self):
+        """Setup async clients on the shared connection pool."""
+        self._config_client = AsyncConfigClient(
+            self._configuration, self._http_client, self._executor)
+        self._nlp_client = AsyncNlpClient(
+            self._configuration, self._http_client, self._executor)
+
+    def close(self):
+        """Release the shared token, the executor and pooled
+        connections.
+        """
+        if not self._closed:
+            self._closed = True
+            self._nlp_client.security_client.release_token()
+        self._executor.shutdown(wait=False)
+        self._http_client.close()
+
+    # Other SDK methods
+    async def test_api(self, test_message=None,
+                       timeout: typing.Optional[float] = None):
+        """Execute test call. Test purposes only."""
+        return await self._config_client.test_api(test_message, timeout)
+
+    async def save_dataset(self, generator: DatasetGenerator,
+                           filename: str,
+                           timeout: typing.Optional[float] = None,
+                           progress_callback: typing.Optional[
+                               ProgressCallback] = None
+                           ) -> SaveDatasetResponse:
+        """Execute save dataset call."""
+        return await self._nlp_client.save_dataset(generator=generator,
+                                                   filename=filename,
+                                                   timeout=timeout,
+                                                   progress_callback=progress_callback)
+
+    async def promote_model(self, model_name: str,
+                            environment: str,
+                            timeout: typing.Optional[float] = None
+                            ) -> PromoteModelResponse:
+        """Execute promote model call."""
+        return await self._nlp_client.promote_model(model_name=model_name,
+                                                    environment=environment,
+                                                    timeout=timeout)
+
+    async def get_data(self, module: str,
+                       profiles: typing.Union[str, typing.List[str]],
+                       revision: str,
+                       timeout: typing.Optional[float] = None
+                       ) -> GetDataResponse:
+        """Execute get data call."""
+        return await self._config_client.get_data(module, profiles, revision,
+                                                  timeout)
+
+    # Generic DAG SDK methods
+    async def get_dag_status(self, dag_id: str,
+                             dag_run_id: str,
+                             timeout: typing.Optional[float] = None
+                             ) -> DagRunResponse:
+        """Execute get job status call."""
+        return await self._nlp_client.get_dag_run_status(dag_id, dag_run_id,
+                                                         timeout)
+
+    async def trigger_dag(self, dag_id: str,
+                          request_body: dict,
+                          timeout: typing.Optional[float] = None
+                          ) -> DagRunResponse:
+        """Execute get job train call."""
+        return await self._nlp_client.trigger_dag(dag_id, request_body,
+                                                  timeout)
+
+    # NMT DAG SDK methods
+    async def get_nmt_status(self, dag_run_id: str,
+                             timeout: typing.Optional[float] = None
+                             ) -> NMTStatusResponse:
+        """Execute nmt status call."""
+        return await self._nlp_client.get_nmt_status(dag_run_id, timeout)
+
+    async def nmt_train(self, request_body: TrainRequestBody,
+                        timeout: typing.Optional[float] = None,
+                        deduplicate: bool = True) -> NMTTrainResponse:
+        """Execute nmt train call."""
+        return await self._nlp_client.trigger_nmt(request_body, timeout,
+                                                  deduplicate)
+
+    async def get_active_model(self, nlp_task: str,
+                               timeout: typing.Optional[float] = None):
+        """Execute get active model call."""
+        return await self._nlp_client.get_active_model(nlp_task=nlp_task,
+                                                       timeout=timeout)
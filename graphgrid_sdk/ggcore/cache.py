@@ -0,0 +1,115 @@
+"""Define a small thread-safe ttl cache with single-flight loading."""
+import threading
+import time
+import typing
+from concurrent.futures import Future
+
+K = typing.TypeVar("K")
+V = typing.TypeVar("V")
+
+
+class TtlCache(typing.Generic[K, V]):
+    """Define class caching values for a limited time.
+
+    ``get_or_load`` is single-flight: concurrent callers missing the same
+    key share one call of the loader. A load still running when its key is
+    invalidated is not cached. Once ``max_size`` entries are held the
+    oldest entry is evicted.
+    """
+    _lock: threading.Lock
+    _entries: typing.Dict[K, typing.Tuple[float, V]]
+    _in_flight: typing.Dict[K, Future]
+    _invalidated: typing.Set[K]
+
+    def __init__(self, ttl: float, max_size: int = 1024):
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries = {}
+        self._in_flight = {}
+        self._invalidated = set()
+        self._lock = threading.Lock()
+
+    def get(self, key: K, default: typing.Optional[V] = None) \
+            -> typing.Optional[V]:
+        """Return the cached value for a key, or default if missing or
+        expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return default
+        return entry[1]
+
+    def put(self, key: K, value: V, ttl: typing.Optional[float] = None):
+        """Cache a value, optionally with its own ttl in seconds."""
+        expires_at = time.monotonic() + (self._ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries.pop(key, None)
+            if len(self._entries) >= self._max_size:
+                self._evict()
+            self._entries[key] = (expires_at, value)
+
+    def _evict(self):
+        """Drop expired entries, or the oldest one if none expired."""
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._entries.items()
+                   if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        if not expired:
+            del self._entries[next(iter(self._entries))]
+
+    def invalidate(self, key: typing.Optional[K] = None):
+        """Forget one key, or every key if none is given."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._invalidated.update(self._in_flight)
+            else:
+                self._entries.pop(key, None)
+                if key in self._in_flight:
+                    self._invalidated.add(key)
+
+    def get_or_load(self, key: K, loader: typing.Callable[[], V],
+                    cache_if: typing.Optional[
+                        typing.Callable[[V], bool]] = None,
+                    ttl: typing.Optional[float] = None) -> V:
+        """Return the cached value for a key, loading it on a miss.
+
+        Only values accepted by ``cache_if`` are cached, though concurrent
+        callers waiting on the load always share its result. Loader
+        exceptions are raised to every waiting caller and not cached.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_loader = future is None
+            if is_loader:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not is_loader:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as exception:
+            with self._lock:
+                del self._in_flight[key]
+                self._invalidated.discard(key)
+            future.set_exception(exception)
+            raise
+
+        if cache_if is None or cache_if(value):
+            self.put(key, value, ttl)
+        with self._lock:
+            del self._in_flight[key]
+            if key in self._invalidated:
+                # invalidated while loading: the value may be outdated
+                self._invalidated.discard(key)
+                self._entries.pop(key, None)
+        future.set_result(value)
+        return value
@@ -0,0 +1,153 @@
+"""Define per-service circuit breakers for sdk requests."""
+import enum
+import threading
+import time
+import typing
+
+import requests
+
+from graphgrid_sdk.ggcore.config import DEFAULT_FAILURE_THRESHOLD, \
+    DEFAULT_PROBE_INTERVAL
+from graphgrid_sdk.ggcore.sdk_exceptions import SdkCircuitOpenException, \
+    SdkTimeoutException
+from graphgrid_sdk.ggcore.sdk_messages import GenericResponse
+
+
+class CircuitState(enum.Enum):
+    """Define circuit breaker states."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+def is_failure_response(generic_response: GenericResponse) -> bool:
+    """Return whether a response means the service itself is failing."""
+    return generic_response.status_code >= 500
+
+
+def is_failure_exception(exception: BaseException) -> bool:
+    """Return whether an error sending a request means the service itself
+    is failing: it could not be connected to or did not answer in time.
+    Running out of call deadline is not held against the service.
+    """
+    if isinstance(exception, SdkTimeoutException):
+        # network timeouts are raised as the cause of the sdk timeout
+        exception = exception.__cause__
+    return isinstance(exception, (requests.ConnectionError, requests.Timeout))
+
+
+# pylint: disable=too-many-instance-attributes
+class CircuitBreaker:
+    """Define class tracking the health of a single service.
+
+    Closed: requests flow, consecutive failures are counted.
+    Open: requests fail immediately with SdkCircuitOpenException until
+    ``probe_interval`` seconds have passed.
+    Half-open: a single probe request is let through; its outcome closes or
+    re-opens the breaker.
+    """
+    _lock: threading.Lock
+    _state: CircuitState = CircuitState.CLOSED
+    _failures: int = 0
+    _opened_at: float = 0.0
+    _probe_in_flight: bool = False
+
+    def __init__(self, name: str,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 probe_interval: float = DEFAULT_PROBE_INTERVAL):
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._probe_interval = probe_interval
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        """Return the current breaker state."""
+        return self._state
+
+    def _is_rejecting(self) -> bool:
+        """Return whether the breaker is open and not yet due a probe."""
+        return self._state is CircuitState.OPEN \
+            and time.monotonic() - self._opened_at < self._probe_interval
+
+    def fail_fast(self):
+        """Raise SdkCircuitOpenException if the breaker is open and not yet
+        due a probe. Unlike before_call, never claims the probe.
+        """
+        if self._is_rejecting():
+            raise SdkCircuitOpenException(
+                f'Circuit for "{self.name}" is open; failing fast.')
+
+    def before_call(self) -> bool:
+        """Admit a call or raise SdkCircuitOpenException. Return whether
+        the call is the half-open probe.
+        """
+        # lock-free fast path for the common, healthy case
+        if self._state is CircuitState.CLOSED:
+            return False
+
+        with self._lock:
+            self.fail_fast()
+            if self._state is CircuitState.OPEN:
+                self._state = CircuitState.HALF_OPEN
+
+            if self._state is CircuitState.HALF_OPEN:
+                if self._probe_in_flight:
+                    raise SdkCircuitOpenException(
+                        f'Circuit for "{self.name}" is half-open and '
+                        f'probing; failing fast.')
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        """Record a successful call, closing the breaker."""
+        if self._state is CircuitState.CLOSED and self._failures == 0:
+            return
+        with self._lock:
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """Record a failed call, opening the breaker past the threshold or
+        when a half-open probe fails.
+        """
+        with self._lock:
+            self._failures += 1
+            if self._state is CircuitState.HALF_OPEN \
+                    or self._failures >= self._failure_threshold:
+                self._state = CircuitState.OPEN
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """Let another call probe the service after the probe ended without
+        telling whether the service is healthy.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+
+# pylint: disable=too-few-public-methods
+class CircuitBreakerRegistry:
+    """Define class holding one circuit breaker per api base."""
+    _breakers: typing.Dict[str, CircuitBreaker]
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 probe_interval: float = DEFAULT_PROBE_INTERVAL):
+        self._failure_threshold = failure_threshold
+        self._probe_interval = probe_interval
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, api_base: str) -> CircuitBreaker:
+        """Return the breaker for an api base, creating it on first use."""
+        breaker = self._breakers.get(api_base)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    api_base, CircuitBreaker(api_base,
+                                             self._failure_threshold,
+                                             self._probe_interval))
+        return breaker
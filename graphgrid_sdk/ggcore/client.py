@@ -2,10 +2,16 @@
 
 import typing
 
+from graphgrid_sdk.ggcore.admission import FileSlotSemaphore, AdmissionLease
 from graphgrid_sdk.ggcore.api import SecurityApi, SdkRequestBuilder, NlpApi, \
     ConfigApi, AbstractApi
+from graphgrid_sdk.ggcore.circuit_breaker import is_failure_response, \
+    is_failure_exception
 from graphgrid_sdk.ggcore.config import SdkBootstrapConfig
+from graphgrid_sdk.ggcore.dedup import TrainingRunCache, \
+    TrainingRunRegistry, training_fingerprint
 from graphgrid_sdk.ggcore.http_base import SdkHttpClient
+from graphgrid_sdk.ggcore.retry import call_with_retry, NO_RETRY
 from graphgrid_sdk.ggcore.sdk_exceptions import \
     SdkUnauthorizedValidTokenException, SdkUnauthorizedInvalidTokenException
 from graphgrid_sdk.ggcore.sdk_messages import SdkServiceRequest, \
@@ -13,26 +19,66 @@ from graphgrid_sdk.ggcore.sdk_messages import SdkServiceRequest, \
     SaveDatasetResponse, GetDataResponse, DagRunResponse, \
     NMTStatusResponse, NMTTrainResponse, TrainRequestBody
 from graphgrid_sdk.ggcore.security_base import SdkAuthHeaderBuilder
-from graphgrid_sdk.ggcore.session import TokenFactory
-from graphgrid_sdk.ggcore.utils import DOCKER_NGINX_PORT
+from graphgrid_sdk.ggcore.session import TokenFactory, TokenRegistry
+from graphgrid_sdk.ggcore.timeouts import deadline_scope
+from graphgrid_sdk.ggcore.upload import ProgressCallback
+from graphgrid_sdk.ggcore.utils import NMT_DAG_ID, DAG_TERMINAL_STATES
 
 
 # pylint: disable=too-few-public-methods
 class ClientBase:
     """Define base class for the other clients."""
     _bootstrap_config: SdkBootstrapConfig
+    _http_client: SdkHttpClient
 
-    def __init__(self, bootstrap_config):
+    def __init__(self, bootstrap_config,
+                 http_client: typing.Optional[SdkHttpClient] = None):
         self._bootstrap_config = bootstrap_config
 
-    # pylint: disable=no-self-use
+        # share the caller's pooled http client, or own a new one
+        self._http_client = http_client if http_client is not None \
+            else SdkHttpClient(bootstrap_config)
+
+    @property
+    def http_client(self) -> SdkHttpClient:
+        """Return the pooled http client the client sends requests with."""
+        return self._http_client
+
     def make_request(self,
                      sdk_request: SdkServiceRequest) -> GenericResponse:
         """Define base make_request that all client calls pass through.
         Return the resulting generic response.
+
+        Every attempt passes the circuit breaker of the request's service,
+        which counts connection errors, network timeouts and 5xx responses
+        as failures. Requests are retried per the request's retry policy,
+        within the retry budget shared by the sdk instance.
         """
+        retry_policy = sdk_request.retry_policy or NO_RETRY
+        breaker = self._http_client.circuit_breakers.get(
+            sdk_request.docker_base)
+
+        def send() -> GenericResponse:
+            is_probe = breaker.before_call()
+            try:
+                generic_response = self._http_client.execute_request(
+                    sdk_request)
+            except BaseException as exception:
+                if is_failure_exception(exception):
+                    breaker.record_failure()
+                elif is_probe:
+                    breaker.release_probe()
+                raise
+
+            if is_failure_response(generic_response):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            return generic_response
+
         # invoke request
-        return SdkHttpClient.execute_request(sdk_request)
+        return call_with_retry(send, retry_policy,
+                               self._http_client.retry_budget)
 
     def build_sdk_request(self,
                           api_def: AbstractApi) -> SdkServiceRequest:
@@ -41,17 +87,10 @@ class ClientBase:
         """
         sdk_request = SdkRequestBuilder.build_partial_sdk_request(api_def)
 
-        if self._bootstrap_config.is_docker_context:
-            # sdk running in docker context, set the host to be the same as
-            # the api endpoint.
-            sdk_request.url = f'http://{sdk_request.docker_base}' \
-                              f':{DOCKER_NGINX_PORT}' \
-                              f'/1.0/{sdk_request.api_endpoint}'
-        else:
-            # sdk running natively, set the host to be the static url base
-            # passed in on init.
-            sdk_request.url = f'http://{self._bootstrap_config.url_base}' \
-                              f'/1.0/{sdk_request.api_endpoint}'
+        # docker context hosts by api base, native context by the url base
+        url_root = self._bootstrap_config.service_url_root(
+            sdk_request.docker_base)
+        sdk_request.url = f'{url_root}{sdk_request.api_endpoint}'
 
         return sdk_request
 
@@ -67,11 +106,27 @@ class InternalSecurityClient(ClientBase):
     should go in SecurityClient instead.
     """
     _token_factory: TokenFactory
+    _basic_header: typing.Optional[typing.Mapping[str, str]] = None
+
+    def __init__(self, bootstrap_config,
+                 http_client: typing.Optional[SdkHttpClient] = None):
+        super().__init__(bootstrap_config, http_client)
 
-    def __init__(self, bootstrap_config):
-        super().__init__(bootstrap_config)
-        self._token_factory = TokenFactory(
-            self._get_token_builtin, self._check_token_builtin)
+        # share one token per credential across all clients in the process
+        self._token_factory = TokenRegistry.token_factory(
+            bootstrap_config, self._get_token_builtin,
+            self._check_token_builtin)
+
+    def hold_token(self):
+        """Hold the shared token for the sdk instance this client belongs
+        to, renewing it in the background if configured.
+        """
+        TokenRegistry.hold(self._bootstrap_config, self._get_token_builtin,
+                           self._check_token_builtin)
+
+    def release_token(self):
+        """Release the hold taken by hold_token."""
+        TokenRegistry.release(self._bootstrap_config, self._get_token_builtin)
 
     def _get_token_builtin(self) -> GetTokenResponse:
         """Define protected method to get a new security token."""
@@ -80,10 +135,14 @@ class InternalSecurityClient(ClientBase):
         # invoke request
         return self._invoke_with_basic_auth(api)
 
-    def _check_token_builtin(self) -> CheckTokenResponse:
-        """Define protected method to check the current security token."""
-        api = \
-            SecurityApi.check_token_api(self._token_factory.get_current_token())
+    def _check_token_builtin(self, token: typing.Optional[str] = None) \
+            -> CheckTokenResponse:
+        """Define protected method to check a security token (default: the
+        current token).
+        """
+        if token is None:
+            token = self._token_factory.get_current_token()
+        api = SecurityApi.check_token_api(token)
 
         # invoke request
         return self._invoke_with_basic_auth(api)
@@ -95,32 +154,54 @@ class InternalSecurityClient(ClientBase):
         # build request
         sdk_request = self.build_sdk_request(api)
 
-        # apply basic auth header
-        auth_basic_header = SdkAuthHeaderBuilder.get_basic_header(
-            self._bootstrap_config)
-        sdk_request.headers.update(auth_basic_header)
+        # apply basic auth header, built once per client
+        if self._basic_header is None:
+            self._basic_header = SdkAuthHeaderBuilder.get_basic_header(
+                self._bootstrap_config)
+        sdk_request.headers.update(self._basic_header)
 
         generic_response = self.make_request(sdk_request)
 
         return api.handler(generic_response)
 
-    def prepare_auth(self, force_token_refresh=False):
-        """Define method that prepares token factory for use."""
-        self._token_factory.refresh_token(force_token_refresh)
+    def prepare_auth(self, force_token_refresh=False,
+                     stale_token: typing.Optional[str] = None):
+        """Define method that prepares token factory for use. A forced
+        refresh of ``stale_token`` is skipped if it was already replaced.
+        """
+        self._token_factory.refresh_token(force_token_refresh, stale_token,
+                                          self._get_token_builtin)
+
+    def is_auth_ready(self) -> bool:
+        """Return whether the current token can be used without a refresh."""
+        return self._token_factory.is_token_ready()
 
-    def check_token(self) -> CheckTokenResponse:
-        """Define method that checks the current token and returns the
-        response.
+    def get_current_token(self) -> str:
+        """Return the current token."""
+        return self._token_factory.get_current_token()
+
+    def check_token(self, token: typing.Optional[str] = None) \
+            -> CheckTokenResponse:
+        """Define method that checks a token (default: the current token)
+        and returns the response.
+        """
+        return self._token_factory.call_check_token(
+            token, self._check_token_builtin)
+
+    def is_token_known_invalid(self, token: str) -> bool:
+        """Return whether a token is known to be invalid locally, without
+        checking it over the network.
         """
-        return self._token_factory.call_check_token()
+        return self._token_factory.is_token_known_invalid(token)
 
-    def authenticate_request(self, sdk_request: SdkServiceRequest):
-        """Define method that adds the current token as a bearer header to
-        the sdk request.
+    def authenticate_request(self, sdk_request: SdkServiceRequest,
+                             token: typing.Optional[str] = None):
+        """Define method that adds a token (default: the current token) as a
+        bearer header to the sdk request.
         """
-        sdk_request.add_headers(
-            SdkAuthHeaderBuilder.get_bearer_header(
-                self._token_factory.get_current_token()))
+        if token is None:
+            token = self._token_factory.get_current_token()
+        sdk_request.add_headers(SdkAuthHeaderBuilder.get_bearer_header(token))
         return sdk_request
 
 
@@ -130,43 +211,82 @@ class SecurityClientBase(ClientBase):
     """
     _security_client: InternalSecurityClient
 
-    def __init__(self, bootstrap_config):
-        super().__init__(bootstrap_config)
-
-        # Configure security client
-        self._security_client = InternalSecurityClient(self._bootstrap_config)
-
-    def build_sdk_request(self,
-                          api_def: AbstractApi) -> SdkServiceRequest:
+    def __init__(self, bootstrap_config,
+                 http_client: typing.Optional[SdkHttpClient] = None):
+        super().__init__(bootstrap_config, http_client)
+
+        # Configure security client on the same connection pool
+        self._security_client = InternalSecurityClient(self._bootstrap_config,
+                                                       self._http_client)
+
+    @property
+    def security_client(self) -> InternalSecurityClient:
+        """Return the internal security client providing auth."""
+        return self._security_client
+
+    # pylint: disable=arguments-differ
+    def build_sdk_request(self, api_def: AbstractApi,
+                          token: typing.Optional[str] = None) \
+            -> SdkServiceRequest:
+        """Build the sdk request and authenticate it with ``token``
+        (default: the current token).
+        """
         # call superclass build_sdk_request
         sdk_request = super().build_sdk_request(api_def)
 
         # authenticate request
-        self._security_client.authenticate_request(sdk_request)
+        self._security_client.authenticate_request(sdk_request, token)
 
         return sdk_request
 
+    def check_circuit(self, api: AbstractApi):
+        """Raise SdkCircuitOpenException if the api's service breaker is
+        open, before any token or request work is done.
+        """
+        self._http_client.circuit_breakers.get(api.api_base()).fail_fast()
+
     def call_api(self, api: AbstractApi,
-                 force_token_refresh=False) -> GenericResponse:
-        """Define method that composes the steps for a full api call."""
+                 force_token_refresh=False,
+                 stale_token: typing.Optional[str] = None) \
+            -> typing.Tuple[GenericResponse, str]:
+        """Define method that composes the steps for a full api call.
+        Return the response and the token the request was sent with.
+        """
+        # fail fast while the service is known to be down
+        self.check_circuit(api)
+
         # prepare auth for call
-        self._security_client.prepare_auth(force_token_refresh)
+        self._security_client.prepare_auth(force_token_refresh, stale_token)
 
-        # build request
-        sdk_request = self.build_sdk_request(api)
+        # build request; the token is read once so the one reported is the
+        # one sent, even if another thread refreshes it meanwhile
+        used_token = self._security_client.get_current_token()
+        sdk_request = self.build_sdk_request(api, used_token)
 
         # make request
-        return self.make_request(sdk_request)
+        return self.make_request(sdk_request), used_token
 
-    def generic_response_handler(self, generic_response: GenericResponse):
+    def generic_response_handler(self, generic_response: GenericResponse,
+                                 used_token: typing.Optional[str] = None):
         """Define method for generically processing responses before being
         passed to specific api handlers.
+
+        ``used_token`` is the token the request was sent with (default: the
+        current token).
         """
         # if the request returns a 401 Unauthorized then check token
         # and possibly retry
         if generic_response.status_code == 401:
+            if used_token is None:
+                used_token = self._security_client.get_current_token()
+
+            # expired or already replaced: recoverable, no check needed
+            if self._security_client.is_token_known_invalid(used_token):
+                raise SdkUnauthorizedInvalidTokenException()
+
             # request hit a 401, call check token
-            check_token_response = self._security_client.check_token()
+            check_token_response = \
+                self._security_client.check_token(used_token)
 
             # token is valid, surface unrecoverable exception
             if check_token_response.status_code == 200:
@@ -177,17 +297,32 @@ class SecurityClientBase(ClientBase):
             if check_token_response.status_code == 400:
                 raise SdkUnauthorizedInvalidTokenException()
 
-    def invoke(self, api: AbstractApi):
+    def call_timeout(self, timeout: typing.Optional[float]) \
+            -> typing.Optional[float]:
+        """Return the overall deadline for a call, falling back to the
+        configured call timeout.
+        """
+        return timeout if timeout is not None \
+            else self._bootstrap_config.call_timeout
+
+    def invoke(self, api: AbstractApi,
+               timeout: typing.Optional[float] = None):
         """Define method that builds and makes SDK requests from an API
         definition.
+
+        The optional timeout (seconds) bounds the whole call, including
+        token refresh, the token check on 401 and the retry.
         """
-        generic_response = self.call_api(api)
+        with deadline_scope(self.call_timeout(timeout)):
+            generic_response, used_token = self.call_api(api)
 
-        try:
-            self.generic_response_handler(generic_response)
-        except SdkUnauthorizedInvalidTokenException:
-            # single retry for invalid token
-            generic_response = self.call_api(api, force_token_refresh=True)
+            try:
+                self.generic_response_handler(generic_response, used_token)
+            except SdkUnauthorizedInvalidTokenException:
+                # single retry for invalid token; concurrent callers that
+                # hit the same invalid token share one refresh
+                generic_response, _ = self.call_api(
+                    api, force_token_refresh=True, stale_token=used_token)
 
         # custom handler call if response passes generic handler
         return api.handler(generic_response)
@@ -200,56 +335,194 @@ class SecurityClient(SecurityClientBase):
 class ConfigClient(SecurityClientBase):
     """Define ConfigClient to hold the config sdk calls."""
 
-    def test_api(self, test_message: str):
+    def test_api(self, test_message: str,
+                 timeout: typing.Optional[float] = None):
         """Return test api sdk call."""
         api_call = ConfigApi.test_api(test_message)
-        return self.invoke(api_call)
+        return self.invoke(api_call, timeout)
 
     def get_data(self, module: str,
                  profiles: typing.Union[str, typing.List[str]],
-                 revision: str) -> GetDataResponse:
+                 revision: str,
+                 timeout: typing.Optional[float] = None) -> GetDataResponse:
         """Return get data sdk call."""
         api_call = ConfigApi.get_data_api(module, profiles, revision)
-        return self.invoke(api_call)
+        return self.invoke(api_call, timeout)
 
 
 class NlpClient(SecurityClientBase):
-    """Define NlpClient to hold the nlp sdk calls."""
+    """Define NlpClient to hold the nlp sdk calls.
+
+    With an admission directory configured, triggering a dag run first
+    takes a slot of the host-wide admission semaphore, waiting for one to
+    free up within the call timeout. The slot is freed when a status call
+    from any process on the host sees the run in a terminal state.
+
+    Identical training requests reuse a running or recently succeeded run
+    triggered earlier in the process, unless deduplication is bypassed.
+
+    Active models are cached per nlp task by the shared http client, so
+    every client of a sdk sees a promotion made through any of them.
+    """
+    _admission: typing.Optional[FileSlotSemaphore]
+    _training_runs: typing.Optional[TrainingRunCache]
+
+    def __init__(self, bootstrap_config,
+                 http_client: typing.Optional[SdkHttpClient] = None):
+        super().__init__(bootstrap_config, http_client)
+        self._admission = FileSlotSemaphore.from_config(bootstrap_config)
+        self._training_runs = TrainingRunRegistry.training_runs(
+            bootstrap_config)
+
+    @property
+    def admission(self) -> typing.Optional[FileSlotSemaphore]:
+        """Return the host-wide admission semaphore, if configured."""
+        return self._admission
+
+    @property
+    def training_runs(self) -> typing.Optional[TrainingRunCache]:
+        """Return the cache of reusable training runs, if enabled."""
+        return self._training_runs
+
+    def settle_admission(self, lease: AdmissionLease, dag_id: str,
+                         response: DagRunResponse):
+        """Hold a lease for the triggered run, or give it back if no run
+        was triggered.
+        """
+        dag_run_id = getattr(response, "dagRunId", None)
+        if dag_run_id is None:
+            lease.cancel()
+        else:
+            lease.bind(dag_id, dag_run_id)
+
+    def observe_dag_run(self, dag_id: str, response: DagRunResponse):
+        """Free the admission slot of a run seen in a terminal state, or
+        renew it while the run is in flight, and update whether its training
+        run may be reused.
+        """
+        state = getattr(response, "state", None)
+        if state not in DAG_TERMINAL_STATES:
+            if self._admission is not None \
+                    and getattr(response, "dagRunId", None) is not None:
+                self._admission.renew(dag_id, response.dagRunId)
+            return
+        if self._admission is not None:
+            self._admission.release(dag_id, response.dagRunId)
+        if self._training_runs is not None and dag_id == NMT_DAG_ID:
+            self._training_runs.observe(response.dagRunId, state)
+
+    def forget_active_models(self, promote_response: PromoteModelResponse):
+        """Drop cached active models after a successful promotion.
+
+        Promotions are rare, so every task is dropped rather than relying
+        on the task named in the response.
+        """
+        active_models = self._http_client.active_models
+        if active_models is not None and promote_response.status_code == 200:
+            active_models.invalidate()
+
+    def reuses_training(self, request_body: TrainRequestBody,
+                        deduplicate: bool) -> bool:
+        """Return whether a training request may reuse an earlier run."""
+        return deduplicate and self._training_runs is not None \
+            and not request_body.no_cache
+
+    def _trigger(self, api_call: AbstractApi, dag_id: str,
+                 timeout: typing.Optional[float]) -> DagRunResponse:
+        """Trigger a dag run once admitted."""
+        if self._admission is None:
+            return self.invoke(api_call, timeout)
+
+        # waiting for admission counts against the call deadline
+        with deadline_scope(self.call_timeout(timeout)):
+            lease = self._admission.acquire()
+            try:
+                response = self.invoke(api_call)
+            except BaseException:
+                lease.cancel()
+                raise
+            self.settle_admission(lease, dag_id, response)
+        return response
+
+    def save_dataset_api(self, generator: typing.Iterable,
+                         filename: str,
+                         progress_callback: typing.Optional[
+                             ProgressCallback] = None) -> AbstractApi:
+        """Return the save dataset api, chunking uploads as configured."""
+        return NlpApi.save_dataset_api(
+            generator, filename, self._bootstrap_config.upload_chunk_size,
+            progress_callback)
 
     def save_dataset(self, generator: typing.Generator,
-                     filename: str) -> SaveDatasetResponse:
+                     filename: str,
+                     timeout: typing.Optional[float] = None,
+                     progress_callback: typing.Optional[
+                         ProgressCallback] = None
+                     ) -> SaveDatasetResponse:
         """Return save dataset sdk call."""
-        api_call = NlpApi.save_dataset_api(generator, filename)
-        return self.invoke(api_call)
+        api_call = self.save_dataset_api(generator, filename,
+                                         progress_callback)
+        return self.invoke(api_call, timeout)
 
     def promote_model(self, model_name: str,
-                      environment: str) -> PromoteModelResponse:
+                      environment: str,
+                      timeout: typing.Optional[float] = None
+                      ) -> PromoteModelResponse:
         """Return promote model sdk call."""
         api_call = NlpApi.promote_model_api(model_name, environment)
-        return self.invoke(api_call)
+        promote_response = self.invoke(api_call, timeout)
+        self.forget_active_models(promote_response)
+        return promote_response
 
     def get_dag_run_status(self, dag_id: str,
-                           dag_run_id: str) -> DagRunResponse:
+                           dag_run_id: str,
+                           timeout: typing.Optional[float] = None
+                           ) -> DagRunResponse:
         """Return get dag run status sdk call."""
         api_call = NlpApi.get_dag_run_status_api(dag_id, dag_run_id)
-        return self.invoke(api_call)
+        response = self.invoke(api_call, timeout)
+        self.observe_dag_run(dag_id, response)
+        return response
 
-    def trigger_dag(self, dag_id: str, request_body: dict) -> DagRunResponse:
+    def trigger_dag(self, dag_id: str, request_body: dict,
+                    timeout: typing.Optional[float] = None) -> DagRunResponse:
         """Return trigger dag sdk call."""
         api_call = NlpApi.trigger_dag_api(dag_id, request_body)
-        return self.invoke(api_call)
+        return self._trigger(api_call, dag_id, timeout)
 
-    def get_nmt_status(self, dag_run_id: str) -> NMTStatusResponse:
+    def get_nmt_status(self, dag_run_id: str,
+                       timeout: typing.Optional[float] = None
+                       ) -> NMTStatusResponse:
         """Return nmt train status call."""
         api_call = NlpApi.nmt_status_api(dag_run_id)
-        return self.invoke(api_call)
-
-    def trigger_nmt(self, request_body: TrainRequestBody) -> NMTTrainResponse:
-        """Return job train sdk call."""
+        response = self.invoke(api_call, timeout)
+        self.observe_dag_run(NMT_DAG_ID, response)
+        return response
+
+    def trigger_nmt(self, request_body: TrainRequestBody,
+                    timeout: typing.Optional[float] = None,
+                    deduplicate: bool = True) -> NMTTrainResponse:
+        """Return job train sdk call. With ``deduplicate`` an identical,
+        running or recently succeeded run is returned instead of triggering
+        a new one.
+        """
         api_call = NlpApi.nmt_train_api(request_body)
-        return self.invoke(api_call)
-
-    def get_active_model(self, nlp_task: str):
-        """Return get active model sdk call."""
+        if not self.reuses_training(request_body, deduplicate):
+            return self._trigger(api_call, NMT_DAG_ID, timeout)
+        return self._training_runs.get_or_trigger(
+            training_fingerprint(request_body),
+            lambda: self._trigger(api_call, NMT_DAG_ID, timeout))
+
+    def get_active_model(self, nlp_task: str,
+                         timeout: typing.Optional[float] = None):
+        """Return get active model sdk call. Successful responses are
+        cached; concurrent misses for a task share one request.
+        """
         api_call = NlpApi.get_active_model_api(nlp_task)
-        return self.invoke(api_call)
+        active_models = self._http_client.active_models
+        if active_models is None:
+            return self.invoke(api_call, timeout)
+        return active_models.get_or_load(
+            getattr(nlp_task, "value", nlp_task),
+            lambda: self.invoke(api_call, timeout),
+            cache_if=lambda response: response.status_code == 200)
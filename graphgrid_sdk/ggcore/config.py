@@ -1,7 +1,45 @@
 """Define classes and constants for controlling sdk configuration."""
 
 import typing
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from graphgrid_sdk.ggcore.utils import DOCKER_NGINX_PORT
+
+# Default number of pooled keep-alive connections kept per service host
+DEFAULT_POOL_MAXSIZE = 10
+
+# Default http timeouts in seconds
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 60.0
+
+# Default consecutive failures before a service's circuit breaker opens
+DEFAULT_FAILURE_THRESHOLD = 5
+# Default seconds an open circuit breaker waits before letting a probe through
+DEFAULT_PROBE_INTERVAL = 30.0
+
+# Default dag run polling: first interval and cap in seconds, growth factor
+# between polls of the same run, and max concurrent status requests
+DEFAULT_POLL_INITIAL_INTERVAL = 2.0
+DEFAULT_POLL_MAX_INTERVAL = 60.0
+DEFAULT_POLL_BACKOFF_FACTOR = 1.5
+DEFAULT_POLL_MAX_WORKERS = 8
+
+# Default host-wide max in-flight dag runs, and seconds after which a run
+# nobody polled stops counting against the limit
+DEFAULT_ADMISSION_LIMIT = 4
+DEFAULT_ADMISSION_LEASE_TIMEOUT = 15 * 60.0
+
+# Default seconds a get_active_model response is reused
+DEFAULT_ACTIVE_MODEL_CACHE_TTL = 30.0
+
+# Default seconds an active model recorded in the metrics store is trusted
+DEFAULT_METRICS_STORE_ACTIVE_MAX_AGE = 60 * 60.0
+
+# Default bytes of dataset lines sent per chunk of a save_dataset upload
+DEFAULT_UPLOAD_CHUNK_SIZE = 256 * 1024
+
+# Default max concurrently running training runs of a sweep
+DEFAULT_SWEEP_MAX_CONCURRENT = 4
 
 
 @dataclass
@@ -11,3 +49,83 @@ class SdkBootstrapConfig:
     access_key: typing.AnyStr
     secret_key: typing.AnyStr
     is_docker_context: typing.Optional[bool]
+    # Max pooled connections per service host keyed by api base (config,
+    # security, nlp). Services not listed use DEFAULT_POOL_MAXSIZE.
+    pool_maxsize: typing.Dict[str, int] = field(default_factory=dict)
+    # Seconds to wait for a connection / for response data on each request
+    connect_timeout: typing.Optional[float] = DEFAULT_CONNECT_TIMEOUT
+    read_timeout: typing.Optional[float] = DEFAULT_READ_TIMEOUT
+    # Overall deadline in seconds for a sdk call, spanning token refresh,
+    # token checks and retries. None means no deadline.
+    call_timeout: typing.Optional[float] = None
+    # Per-service circuit breaker: consecutive failures (connection errors,
+    # timeouts, 5xx) that open it, and seconds before an open breaker lets a
+    # probe request through
+    circuit_failure_threshold: int = DEFAULT_FAILURE_THRESHOLD
+    circuit_probe_interval: float = DEFAULT_PROBE_INTERVAL
+    # Renew tokens in the background once this fraction of their lifetime
+    # has passed (e.g. 0.75), jittered by +/- token_renewal_jitter of the
+    # lifetime. None renews lazily on the request path only.
+    token_renewal_fraction: typing.Optional[float] = None
+    token_renewal_jitter: float = 0.1
+    # Directory for a token cache shared by processes using the same
+    # credential. None keeps tokens in memory only.
+    token_cache_dir: typing.Optional[str] = None
+    # Dag run polling: each run is first polled after poll_initial_interval
+    # seconds, then at intervals growing by poll_backoff_factor up to
+    # poll_max_interval. At most poll_max_workers runs are polled at once.
+    poll_initial_interval: float = DEFAULT_POLL_INITIAL_INTERVAL
+    poll_max_interval: float = DEFAULT_POLL_MAX_INTERVAL
+    poll_backoff_factor: float = DEFAULT_POLL_BACKOFF_FACTOR
+    poll_max_workers: int = DEFAULT_POLL_MAX_WORKERS
+    # Training admission: max concurrently running training runs, and of
+    # those max gpu runs (None means no limit). Waiting runs start by
+    # priority per NlpModel value (lower first, unlisted 0), then FIFO.
+    max_concurrent_training: typing.Optional[int] = None
+    max_concurrent_gpu_training: typing.Optional[int] = None
+    training_priorities: typing.Dict[str, int] = field(default_factory=dict)
+    # Host-wide admission control: directory shared by every process
+    # triggering dag runs on the host, at most admission_limit of which are
+    # in flight at once. Status calls renew the slot of a run in flight; a
+    # run nobody polled for admission_lease_timeout seconds frees it. None
+    # disables admission control.
+    admission_dir: typing.Optional[str] = None
+    admission_limit: int = DEFAULT_ADMISSION_LIMIT
+    admission_lease_timeout: float = DEFAULT_ADMISSION_LEASE_TIMEOUT
+    # Identical training requests (no_cache=False) reuse the run of an
+    # earlier request in the process for this many seconds after it was
+    # triggered, and after it was seen succeeding. None (the default) always
+    # triggers a new run.
+    training_dedup_ttl: typing.Optional[float] = None
+    # Seconds get_active_model responses are cached per nlp task, until a
+    # model is promoted through the same sdk. None disables the cache.
+    active_model_cache_ttl: typing.Optional[float] = \
+        DEFAULT_ACTIVE_MODEL_CACHE_TTL
+    # SQLite database recording the training runs pipelines observe and the
+    # active models they compare against. Promotion decisions use an active
+    # model recorded less than metrics_store_active_max_age seconds ago
+    # instead of fetching it, and fetch it only to confirm a promotion. None
+    # disables the metrics store.
+    metrics_store_path: typing.Optional[str] = None
+    metrics_store_active_max_age: float = \
+        DEFAULT_METRICS_STORE_ACTIVE_MAX_AGE
+    # Max concurrently running training runs of one nmt_train_sweep. Sweeps
+    # still pass host-wide admission control.
+    sweep_max_concurrent: int = DEFAULT_SWEEP_MAX_CONCURRENT
+    # save_dataset uploads coalesce dataset lines into chunks of this many
+    # bytes. None sends every line as its own chunk.
+    upload_chunk_size: typing.Optional[int] = DEFAULT_UPLOAD_CHUNK_SIZE
+
+    def service_url_root(self, api_base: str) -> str:
+        """Return the url root ('http://<host>/1.0/') for an api base."""
+        if self.is_docker_context:
+            # sdk running in docker context, set the host to be the same as
+            # the api base.
+            return f'http://{api_base}:{DOCKER_NGINX_PORT}/1.0/'
+        # sdk running natively, set the host to be the static url base
+        # passed in on init.
+        return f'http://{self.url_base}/1.0/'
+
+    def service_pool_maxsize(self, api_base: str) -> int:
+        """Return the connection pool size for an api base."""
+        return self.pool_maxsize.get(api_base, DEFAULT_POOL_MAXSIZE)
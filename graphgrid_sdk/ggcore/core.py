@@ -1,11 +1,19 @@
 """Define the SDK core entrypoint for sdk calls."""
 import typing
+from concurrent.futures import Future
 
 from graphgrid_sdk.ggcore.client import ConfigClient, NlpClient
 from graphgrid_sdk.ggcore.config import SdkBootstrapConfig
+from graphgrid_sdk.ggcore.dag_run_handle import DagRunHandle
+from graphgrid_sdk.ggcore.http_base import SdkHttpClient
+from graphgrid_sdk.ggcore.polling import DagRunPollingEngine
+from graphgrid_sdk.ggcore.scheduler import TrainingScheduler, \
+    TrainingSchedulerRegistry
+from graphgrid_sdk.ggcore.sdk_exceptions import SdkDagRunException
 from graphgrid_sdk.ggcore.sdk_messages import SaveDatasetResponse, \
     PromoteModelResponse, GetDataResponse, \
     DagRunResponse, NMTTrainResponse, NMTStatusResponse, TrainRequestBody
+from graphgrid_sdk.ggcore.upload import ProgressCallback
 
 
 class SdkCore:
@@ -13,62 +21,168 @@ class SdkCore:
     for the sdk. Execute the calls coming from GraphGridSdk.
     """
     _configuration: SdkBootstrapConfig
+    _http_client: SdkHttpClient
+    _polling_engine: DagRunPollingEngine
+    _training_scheduler: TrainingScheduler
+    _closed: bool = False
 
     _config_client: ConfigClient
     _nlp_client: NlpClient
 
     def __init__(self, bootstrap_config: SdkBootstrapConfig):
         self._configuration = bootstrap_config
+        self._http_client = SdkHttpClient(self._configuration)
+        self._polling_engine = DagRunPollingEngine.from_config(
+            self._configuration)
 
         self._setup_clients()
+        # hold the shared token, renewing it if configured, until closed
+        self._nlp_client.security_client.hold_token()
+
+        # limits are shared by every sdk of the credential in the process
+        self._training_scheduler = \
+            TrainingSchedulerRegistry.training_scheduler(self._configuration)
 
     def _setup_clients(self):
-        """Setup low-level clients."""
-        self._config_client = ConfigClient(self._configuration)
-        self._nlp_client = NlpClient(self._configuration)
+        """Setup low-level clients on the shared connection pool."""
+        self._config_client = ConfigClient(self._configuration,
+                                           self._http_client)
+        self._nlp_client = NlpClient(self._configuration, self._http_client)
+
+    @property
+    def http_client(self) -> SdkHttpClient:
+        """Return the pooled http client shared by all clients."""
+        return self._http_client
+
+    @property
+    def polling_engine(self) -> DagRunPollingEngine:
+        """Return the engine polling all dag runs submitted by this sdk."""
+        return self._polling_engine
+
+    @property
+    def training_scheduler(self) -> TrainingScheduler:
+        """Return the scheduler admitting this sdk's training runs, shared
+        process-wide per credential.
+        """
+        return self._training_scheduler
+
+    def close(self):
+        """Stop polling dag runs, release the shared token and release
+        pooled connections held by the clients.
+        """
+        if not self._closed:
+            self._closed = True
+            self._nlp_client.security_client.release_token()
+        self._polling_engine.close()
+        self._http_client.close()
 
     # Other SDK methods
-    def test_api(self, test_message=None):
+    def test_api(self, test_message=None,
+                 timeout: typing.Optional[float] = None):
         """Execute test call. Test purposes only."""
-        return self._config_client.test_api(test_message)
+        return self._config_client.test_api(test_message, timeout)
 
     def save_dataset(self, generator: typing.Generator,
-                     filename: str) -> SaveDatasetResponse:
+                     filename: str,
+                     timeout: typing.Optional[float] = None,
+                     progress_callback: typing.Optional[
+                         ProgressCallback] = None
+                     ) -> SaveDatasetResponse:
         """Execute save dataset call."""
         return self._nlp_client.save_dataset(generator=generator,
-                                             filename=filename)
+                                             filename=filename,
+                                             timeout=timeout,
+                                             progress_callback=progress_callback)
 
     def promote_model(self, model_name: str,
-                      environment: str) -> PromoteModelResponse:
+                      environment: str,
+                      timeout: typing.Optional[float] = None
+                      ) -> PromoteModelResponse:
         """Execute promote model call."""
         return self._nlp_client.promote_model(model_name=model_name,
-                                              environment=environment)
+                                              environment=environment,
+                                              timeout=timeout)
 
     def get_data(self, module: str,
                  profiles: typing.Union[str, typing.List[str]],
-                 revision: str) -> GetDataResponse:
+                 revision: str,
+                 timeout: typing.Optional[float] = None) -> GetDataResponse:
         """Execute get data call."""
-        return self._config_client.get_data(module, profiles, revision)
+        return self._config_client.get_data(module, profiles, revision,
+                                            timeout)
 
     # Generic DAG SDK methods
     def get_dag_status(self, dag_id: str,
-                       dag_run_id: str) -> DagRunResponse:
+                       dag_run_id: str,
+                       timeout: typing.Optional[float] = None
+                       ) -> DagRunResponse:
         """Execute get job status call."""
-        return self._nlp_client.get_dag_run_status(dag_id, dag_run_id)
+        return self._nlp_client.get_dag_run_status(dag_id, dag_run_id,
+                                                   timeout)
 
-    def trigger_dag(self, dag_id: str, request_body: dict) -> DagRunResponse:
+    def trigger_dag(self, dag_id: str, request_body: dict,
+                    timeout: typing.Optional[float] = None) -> DagRunResponse:
         """Execute get job train call."""
-        return self._nlp_client.trigger_dag(dag_id, request_body)
+        return self._nlp_client.trigger_dag(dag_id, request_body, timeout)
 
     # NMT DAG SDK methods
-    def get_nmt_status(self, dag_run_id: str) -> NMTStatusResponse:
+    def get_nmt_status(self, dag_run_id: str,
+                       timeout: typing.Optional[float] = None
+                       ) -> NMTStatusResponse:
         """Execute nmt status call."""
-        return self._nlp_client.get_nmt_status(dag_run_id)
+        return self._nlp_client.get_nmt_status(dag_run_id, timeout)
 
-    def nmt_train(self, request_body: TrainRequestBody) -> NMTTrainResponse:
+    def nmt_train(self, request_body: TrainRequestBody,
+                  timeout: typing.Optional[float] = None,
+                  deduplicate: bool = True) -> NMTTrainResponse:
         """Execute nmt train call."""
-        return self._nlp_client.trigger_nmt(request_body)
+        return self._nlp_client.trigger_nmt(request_body, timeout,
+                                            deduplicate)
 
-    def get_active_model(self, nlp_task: str):
+    def get_active_model(self, nlp_task: str,
+                         timeout: typing.Optional[float] = None):
         """Execute get active model call."""
-        return self._nlp_client.get_active_model(nlp_task=nlp_task)
+        return self._nlp_client.get_active_model(nlp_task=nlp_task,
+                                                 timeout=timeout)
+
+    # Dag run handles
+    def _watch(self, trigger_response: DagRunResponse,
+               get_status: typing.Callable[[str], DagRunResponse]
+               ) -> DagRunHandle:
+        """Return a handle polling a triggered dag run to completion."""
+        if trigger_response.status_code != 200:
+            return DagRunHandle.failed(trigger_response, SdkDagRunException(
+                f'Unable to trigger dag run. Status code: '
+                f'"{trigger_response.status_code}".'))
+        return DagRunHandle(trigger_response, self._polling_engine.watch(
+            trigger_response.dagRunId, get_status))
+
+    def submit_dag(self, dag_id: str, request_body: dict,
+                   timeout: typing.Optional[float] = None) -> DagRunHandle:
+        """Execute trigger dag call and return a handle on the run."""
+        return self._watch(
+            self.trigger_dag(dag_id, request_body, timeout),
+            lambda dag_run_id: self.get_dag_status(dag_id, dag_run_id))
+
+    def schedule_nmt_train(self, request_body: TrainRequestBody,
+                           timeout: typing.Optional[float] = None,
+                           priority: typing.Optional[int] = None
+                           ) -> Future:
+        """Queue nmt train call on the training scheduler. Return a future
+        resolving to a handle on the run once it was triggered.
+        """
+        return self._training_scheduler.submit(
+            request_body, timeout, priority, self.nmt_train,
+            self._watch_nmt_train)
+
+    def _watch_nmt_train(self, dag_run_id: str) -> Future:
+        """Poll an nmt training run until it finishes."""
+        return self._polling_engine.watch(dag_run_id, self.get_nmt_status)
+
+    def submit_nmt_train(self, request_body: TrainRequestBody,
+                         timeout: typing.Optional[float] = None
+                         ) -> DagRunHandle:
+        """Execute nmt train call, once admitted by the training scheduler,
+        and return a handle on the run.
+        """
+        return self.schedule_nmt_train(request_body, timeout).result()
@@ -0,0 +1,107 @@
+"""Define handles for waiting on submitted dag runs."""
+import concurrent.futures
+import typing
+from concurrent.futures import Future
+
+from graphgrid_sdk.ggcore.sdk_exceptions import SdkTimeoutException
+from graphgrid_sdk.ggcore.sdk_messages import DagRunResponse
+
+
+class DagRunHandle:
+    """Define class representing a submitted dag run.
+
+    The run is polled in the background by the sdk's shared polling
+    engine; the handle resolves to the run's terminal status.
+    """
+    _trigger_response: DagRunResponse
+    _future: Future
+
+    def __init__(self, trigger_response: DagRunResponse, future: Future):
+        self._trigger_response = trigger_response
+        self._future = future
+
+    @classmethod
+    def failed(cls, trigger_response: DagRunResponse,
+               exception: BaseException) -> 'DagRunHandle':
+        """Return an already finished handle for a run that could not be
+        submitted.
+        """
+        future = Future()
+        future.set_exception(exception)
+        return cls(trigger_response, future)
+
+    @property
+    def trigger_response(self) -> DagRunResponse:
+        """Return the response of the call that triggered the run."""
+        return self._trigger_response
+
+    @property
+    def dag_id(self) -> typing.Optional[str]:
+        """Return the id of the run's dag."""
+        return self._trigger_response.dagId
+
+    @property
+    def dag_run_id(self) -> typing.Optional[str]:
+        """Return the id of the run."""
+        return self._trigger_response.dagRunId
+
+    @property
+    def future(self) -> Future:
+        """Return the future resolving to the run's terminal status."""
+        return self._future
+
+    def result(self, timeout: typing.Optional[float] = None) \
+            -> DagRunResponse:
+        """Wait for the run to finish and return its terminal status.
+
+        Raises SdkTimeoutException if the run has not finished within
+        ``timeout`` seconds, or the error that made polling give up.
+        """
+        try:
+            return self._future.result(timeout)
+        except concurrent.futures.TimeoutError as timeout_error:
+            raise SdkTimeoutException(
+                f'Dag run "{self.dag_run_id}" did not finish within '
+                f'{timeout} seconds.') from timeout_error
+
+    def done(self) -> bool:
+        """Return whether the run has finished or waiting was cancelled."""
+        return self._future.done()
+
+    def cancel_wait(self) -> bool:
+        """Stop polling the run. The dag run itself keeps running.
+
+        Returns False if the run had already finished.
+        """
+        return self._future.cancel()
+
+    def cancelled(self) -> bool:
+        """Return whether waiting on the run was cancelled."""
+        return self._future.cancelled()
+
+    def add_done_callback(self,
+                          callback: typing.Callable[['DagRunHandle'], None]):
+        """Call ``callback`` with this handle once the run has finished.
+
+        Called immediately if the run already has finished.
+        """
+        self._future.add_done_callback(lambda _: callback(self))
+
+
+def as_completed(handles: typing.Iterable[DagRunHandle],
+                 timeout: typing.Optional[float] = None) \
+        -> typing.Iterator[DagRunHandle]:
+    """Yield handles as their runs finish.
+
+    Raises SdkTimeoutException if not all runs have finished within
+    ``timeout`` seconds.
+    """
+    handles_by_future = {handle.future: handle for handle in handles}
+    try:
+        for future in concurrent.futures.as_completed(handles_by_future,
+                                                      timeout):
+            yield handles_by_future[future]
+    except concurrent.futures.TimeoutError as timeout_error:
+        raise SdkTimeoutException(
+            f'Dag runs did not finish within {timeout} seconds.') \
+            from timeout_error
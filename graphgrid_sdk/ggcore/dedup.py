@@ -0,0 +1,132 @@
+"""Define deduplication of identical training triggers."""
+import dataclasses
+import hashlib
+import json
+import threading
+import typing
+
+from graphgrid_sdk.ggcore.cache import TtlCache
+from graphgrid_sdk.ggcore.config import SdkBootstrapConfig
+from graphgrid_sdk.ggcore.sdk_messages import NMTTrainResponse, \
+    TrainRequestBody
+from graphgrid_sdk.ggcore.session import credential_key
+from graphgrid_sdk.ggcore.utils import DAG_STATE_SUCCESS, DAG_TERMINAL_STATES
+
+
+def training_fingerprint(request_body: TrainRequestBody) -> str:
+    """Return a fingerprint identifying identical training requests."""
+    fields = dataclasses.asdict(request_body)
+    fields["model"] = getattr(request_body.model, "value",
+                              request_body.model)
+    fields["no_cache"] = bool(request_body.no_cache)
+    fields["gpu"] = bool(request_body.gpu)
+    canonical = json.dumps(fields, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _is_triggered(trigger_response: NMTTrainResponse) -> bool:
+    return getattr(trigger_response, "dagRunId", None) is not None
+
+
+class TrainingRunCache:
+    """Define class remembering which dag run trains a given request.
+
+    A run is reused for ``ttl`` seconds after it was triggered, and again
+    for ``ttl`` seconds after it is seen succeeding; a run seen failing is
+    forgotten right away. Runs are never reused for longer unobserved, so a
+    run that died without being seen is not handed out for long. Concurrent
+    identical triggers share a single trigger request.
+    """
+    _lock: threading.Lock
+    # fingerprint and trigger response of every run not seen finishing yet
+    _tracked: typing.Dict[str, typing.Tuple[str, NMTTrainResponse]]
+
+    def __init__(self, ttl: float):
+        self._ttl = ttl
+        self._runs = TtlCache(ttl)
+        self._tracked = {}
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint: str) -> typing.Optional[NMTTrainResponse]:
+        """Return the trigger response of a reusable run, if any."""
+        return self._runs.get(fingerprint)
+
+    def get_or_trigger(self, fingerprint: str,
+                       trigger: typing.Callable[[], NMTTrainResponse]) \
+            -> NMTTrainResponse:
+        """Return the trigger response of a reusable run, triggering a new
+        run if there is none.
+        """
+        def load() -> NMTTrainResponse:
+            trigger_response = trigger()
+            self._track(fingerprint, trigger_response)
+            return trigger_response
+
+        return self._runs.get_or_load(fingerprint, load,
+                                      cache_if=_is_triggered)
+
+    def remember(self, fingerprint: str, trigger_response: NMTTrainResponse):
+        """Reuse a newly triggered run for identical requests."""
+        if _is_triggered(trigger_response):
+            self._track(fingerprint, trigger_response)
+            self._runs.put(fingerprint, trigger_response)
+
+    def _track(self, fingerprint: str, trigger_response: NMTTrainResponse):
+        if _is_triggered(trigger_response):
+            with self._lock:
+                self._tracked[trigger_response.dagRunId] = \
+                    (fingerprint, trigger_response)
+
+    def observe(self, dag_run_id: str, state: str):
+        """Update reuse of a run from its observed state."""
+        if state not in DAG_TERMINAL_STATES:
+            return
+        with self._lock:
+            tracked = self._tracked.pop(dag_run_id, None)
+        if tracked is None:
+            return
+
+        fingerprint, trigger_response = tracked
+        # the run trained for longer than the ttl if its entry expired; a
+        # newer run of the request is left alone
+        current = self._runs.get(fingerprint)
+        if current is not None and current.dagRunId != dag_run_id:
+            return
+        if state == DAG_STATE_SUCCESS:
+            self._runs.put(fingerprint, trigger_response, self._ttl)
+        else:
+            self._runs.invalidate(fingerprint)
+
+
+class TrainingRunRegistry:
+    """Define process-wide registry sharing one TrainingRunCache per
+    credential, so retries and overlapping pipelines in a process reuse each
+    other's runs.
+    """
+    _caches: typing.Dict[typing.Tuple[str, str, str], TrainingRunCache] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def training_runs(cls, bootstrap_config: SdkBootstrapConfig) \
+            -> typing.Optional[TrainingRunCache]:
+        """Return the shared cache for the config's credential, or None if
+        deduplication is disabled (the default).
+        """
+        if bootstrap_config is None \
+                or bootstrap_config.training_dedup_ttl is None:
+            return None
+
+        key = credential_key(bootstrap_config)
+        with cls._lock:
+            training_runs = cls._caches.get(key)
+            if training_runs is None:
+                training_runs = TrainingRunCache(
+                    bootstrap_config.training_dedup_ttl)
+                cls._caches[key] = training_runs
+        return training_runs
+
+    @classmethod
+    def clear(cls):
+        """Forget all shared caches."""
+        with cls._lock:
+            cls._caches.clear()
@@ -1,11 +1,91 @@
 """Define classes for building, executing, processing http requests."""
+import threading
+import typing
+
 import requests
+from requests.adapters import HTTPAdapter
 
+from graphgrid_sdk.ggcore.cache import TtlCache
+from graphgrid_sdk.ggcore.circuit_breaker import CircuitBreakerRegistry
+from graphgrid_sdk.ggcore.config import SdkBootstrapConfig
+from graphgrid_sdk.ggcore.retry import RetryBudget
+from graphgrid_sdk.ggcore.sdk_exceptions import SdkTimeoutException
 from graphgrid_sdk.ggcore.sdk_messages import SdkServiceRequest, GenericResponse
+from graphgrid_sdk.ggcore.timeouts import request_timeout
+from graphgrid_sdk.ggcore.utils import SUPPORTED_CLIENTS
 
 
 class SdkHttpClient:
-    """Define class containing all sdk http methods."""
+    """Define class containing all sdk http methods.
+
+    Each instance owns a pooled keep-alive session with one connection pool
+    mounted per service host (config, security, nlp), so consecutive sdk
+    calls reuse open connections instead of reconnecting every time.
+    """
+    _bootstrap_config: SdkBootstrapConfig
+    _session: requests.Session = None
+    _retry_budget: RetryBudget
+    _circuit_breakers: CircuitBreakerRegistry = None
+    _active_models: typing.Optional[TtlCache] = None
+
+    def __init__(self, bootstrap_config: SdkBootstrapConfig):
+        self._bootstrap_config = bootstrap_config
+        self._session_lock = threading.Lock()
+        self._retry_budget = RetryBudget()
+        if bootstrap_config is not None:
+            self._circuit_breakers = CircuitBreakerRegistry(
+                bootstrap_config.circuit_failure_threshold,
+                bootstrap_config.circuit_probe_interval)
+            if bootstrap_config.active_model_cache_ttl is not None:
+                self._active_models = TtlCache(
+                    bootstrap_config.active_model_cache_ttl)
+
+    @property
+    def circuit_breakers(self) -> CircuitBreakerRegistry:
+        """Return the per-service circuit breakers of this client."""
+        return self._circuit_breakers
+
+    @property
+    def retry_budget(self) -> RetryBudget:
+        """Return the retry budget shared by all requests of this client."""
+        return self._retry_budget
+
+    @property
+    def active_models(self) -> typing.Optional[TtlCache]:
+        """Return the get_active_model responses cached for all sdk
+        clients sharing this http client, if enabled.
+        """
+        return self._active_models
+
+    @property
+    def session(self) -> requests.Session:
+        """Return the pooled session, creating it on first use."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def _build_session(self) -> requests.Session:
+        """Build a session with a connection pool mounted per service."""
+        session = requests.Session()
+        for api_base in SUPPORTED_CLIENTS:
+            pool_maxsize = self._bootstrap_config.service_pool_maxsize(
+                api_base)
+            adapter = HTTPAdapter(pool_connections=1,
+                                  pool_maxsize=pool_maxsize)
+            # mount on the service prefix so each service gets its own pool
+            session.mount(
+                f'{self._bootstrap_config.service_url_root(api_base)}'
+                f'{api_base}/', adapter)
+        return session
+
+    def close(self):
+        """Close the pooled session and release its connections."""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
 
     @classmethod
     def http_response_to_generic_response(cls,
@@ -17,6 +97,8 @@ class SdkHttpClient:
 
         generic_response.response = http_response.content.decode()
 
+        generic_response.headers = http_response.headers
+
         try:
             # raise exception if one occurred
             http_response.raise_for_status()
@@ -28,17 +110,28 @@ class SdkHttpClient:
 
         return generic_response
 
-    @classmethod
-    def execute_request(cls,
+    def execute_request(self,
                         sdk_request: SdkServiceRequest) -> GenericResponse:
         """Invoke the SdkServiceRequest by building and executing an http
         request.
+
+        Raises SdkTimeoutException if the request times out or the current
+        call deadline has passed.
         """
-        http_response: requests.Response = requests.request(
-            method=sdk_request.http_method.value,
-            url=sdk_request.url,
-            params=sdk_request.query_params,
-            data=sdk_request.body,
-            headers=sdk_request.headers)
-
-        return cls.http_response_to_generic_response(http_response)
+        # configured timeouts, clipped to the deadline of the current call
+        timeout = request_timeout(self._bootstrap_config.connect_timeout,
+                                  self._bootstrap_config.read_timeout)
+        try:
+            http_response: requests.Response = self.session.request(
+                method=sdk_request.http_method.value,
+                url=sdk_request.url,
+                params=sdk_request.query_params,
+                data=sdk_request.body,
+                headers=sdk_request.headers,
+                timeout=timeout)
+        except requests.Timeout as timeout_exception:
+            raise SdkTimeoutException(
+                f'Request to "{sdk_request.url}" timed out.') \
+                from timeout_exception
+
+        return self.http_response_to_generic_response(http_response)
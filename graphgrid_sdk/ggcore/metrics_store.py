@@ -0,0 +1,223 @@
+"""Define a local SQLite history of training runs and active models."""
+import contextlib
+import dataclasses
+import json
+import sqlite3
+import time
+import typing
+from dataclasses import dataclass
+
+from graphgrid_sdk.ggcore.config import SdkBootstrapConfig
+from graphgrid_sdk.ggcore.sdk_messages import NMTStatusResponse, \
+    TrainedModelData, GetActiveModelResponse
+
+# Seconds to wait for another process holding the database lock
+DB_BUSY_TIMEOUT_S = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS training_runs (
+    dag_run_id TEXT PRIMARY KEY,
+    task TEXT NOT NULL,
+    state TEXT,
+    saved_model_name TEXT,
+    dataset_id TEXT,
+    properties TEXT,
+    training_accuracy REAL,
+    training_loss REAL,
+    eval_accuracy REAL,
+    eval_loss REAL,
+    start_date TEXT,
+    end_date TEXT,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS training_runs_task_eval
+    ON training_runs (task, eval_accuracy DESC, eval_loss);
+CREATE INDEX IF NOT EXISTS training_runs_task_recorded
+    ON training_runs (task, recorded_at);
+CREATE TABLE IF NOT EXISTS active_models (
+    task TEXT PRIMARY KEY,
+    model_name TEXT,
+    trained_model_data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+# pylint: disable=invalid-name,too-many-instance-attributes
+@dataclass(frozen=True)
+class TrainingRunRecord:
+    """Define class representing a recorded training run. Metric names
+    match NMTStatusResponse, so records can be ranked like statuses.
+    """
+    dagRunId: str
+    task: str
+    state: typing.Optional[str]
+    savedModelName: typing.Optional[str]
+    datasetId: typing.Optional[str]
+    properties: typing.Optional[dict]
+    trainingAccuracy: typing.Optional[float]
+    trainingLoss: typing.Optional[float]
+    evalAccuracy: typing.Optional[float]
+    evalLoss: typing.Optional[float]
+    startDate: typing.Optional[str]
+    endDate: typing.Optional[str]
+    recordedAt: float
+
+
+# pylint: disable=invalid-name
+@dataclass(frozen=True)
+class ActiveModelRecord:
+    """Define class representing the last known active model of a task.
+    Shaped like GetActiveModelResponse, so it can stand in for one.
+    """
+    modelName: typing.Optional[str]
+    trainedModelData: TrainedModelData
+    updatedAt: float
+
+
+def _trained_model_data(task: str, status: NMTStatusResponse,
+                        dataset_id: typing.Optional[str]) \
+        -> TrainedModelData:
+    """Return the trained model data of a promoted training run."""
+    return TrainedModelData(
+        modelType=task,
+        trainingDataset=[] if dataset_id is None else [dataset_id],
+        trainingAccuracy=getattr(status, "trainingAccuracy", None),
+        trainingLoss=getattr(status, "trainingLoss", None),
+        evalAccuracy=getattr(status, "evalAccuracy", None),
+        evalLoss=getattr(status, "evalLoss", None),
+        properties=getattr(status, "properties", None),
+        location=getattr(status, "savedModelUrl", None),
+        timestamp=getattr(status, "endDate", None),
+        platformVersion=None)
+
+
+class MetricsStore:
+    """Define class recording training runs and active models in a local
+    SQLite database.
+
+    The database may be shared by threads and processes; every operation
+    uses its own short-lived connection and transaction.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        with self._connect() as connection:
+            connection.executescript(_SCHEMA)
+
+    @classmethod
+    def from_config(cls, bootstrap_config: SdkBootstrapConfig) \
+            -> typing.Optional['MetricsStore']:
+        """Return the metrics store configured in the bootstrap config."""
+        if bootstrap_config.metrics_store_path is None:
+            return None
+        return cls(bootstrap_config.metrics_store_path)
+
+    @property
+    def path(self) -> str:
+        """Return the path of the database."""
+        return self._path
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """Yield a connection, committing on success."""
+        connection = sqlite3.connect(self._path, timeout=DB_BUSY_TIMEOUT_S)
+        connection.row_factory = sqlite3.Row
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def record_run(self, task: str, status: NMTStatusResponse,
+                   dataset_id: typing.Optional[str] = None):
+        """Record or update the observed status of a training run."""
+        properties = getattr(status, "properties", None)
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO training_runs VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (status.dagRunId, task, getattr(status, "state", None),
+                 getattr(status, "savedModelName", None), dataset_id,
+                 None if properties is None
+                 else json.dumps(properties, sort_keys=True),
+                 getattr(status, "trainingAccuracy", None),
+                 getattr(status, "trainingLoss", None),
+                 getattr(status, "evalAccuracy", None),
+                 getattr(status, "evalLoss", None),
+                 getattr(status, "startDate", None),
+                 getattr(status, "endDate", None), time.time()))
+
+    def record_active_model(self, task: str,
+                            active_model: typing.Union[
+                                GetActiveModelResponse, ActiveModelRecord]):
+        """Record the active model of a task."""
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO active_models VALUES (?, ?, ?, ?)",
+                (task, active_model.modelName,
+                 json.dumps(dataclasses.asdict(
+                     active_model.trainedModelData)), time.time()))
+
+    def record_promotion(self, task: str, model_name: str,
+                         status: NMTStatusResponse,
+                         dataset_id: typing.Optional[str] = None):
+        """Record that a training run was promoted to active model."""
+        self.record_active_model(task, ActiveModelRecord(
+            model_name, _trained_model_data(task, status, dataset_id),
+            time.time()))
+
+    def active_model(self, task: str,
+                     max_age: typing.Optional[float] = None) \
+            -> typing.Optional[ActiveModelRecord]:
+        """Return the last known active model of a task, unless it was
+        recorded more than ``max_age`` seconds ago.
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT * FROM active_models WHERE task = ?",
+                (task,)).fetchone()
+        if row is None or (max_age is not None
+                           and time.time() - row["updated_at"] > max_age):
+            return None
+        return ActiveModelRecord(
+            row["model_name"],
+            TrainedModelData(**json.loads(row["trained_model_data"])),
+            row["updated_at"])
+
+    def runs(self, task: str, limit: typing.Optional[int] = None) \
+            -> typing.List[TrainingRunRecord]:
+        """Return the runs recorded for a task, most recent first."""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT * FROM training_runs WHERE task = ? "
+                "ORDER BY recorded_at DESC LIMIT ?",
+                (task, -1 if limit is None else limit)).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def best(self, task: str, count: int,
+             state: typing.Optional[str] = "success") \
+            -> typing.List[TrainingRunRecord]:
+        """Return the ``count`` runs of a task with the highest eval
+        accuracy, then lowest eval loss. Runs without eval accuracy come
+        last.
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT * FROM training_runs WHERE task = ? "
+                "AND (? IS NULL OR state = ?) "
+                "ORDER BY eval_accuracy IS NULL, eval_accuracy DESC, "
+                "eval_loss IS NULL, eval_loss, recorded_at DESC LIMIT ?",
+                (task, state, state, count)).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> TrainingRunRecord:
+        return TrainingRunRecord(
+            row["dag_run_id"], row["task"], row["state"],
+            row["saved_model_name"], row["dataset_id"],
+            None if row["properties"] is None
+            else json.loads(row["properties"]),
+            row["training_accuracy"], row["training_loss"],
+            row["eval_accuracy"], row["eval_loss"], row["start_date"],
+            row["end_date"], row["recorded_at"])
@@ -0,0 +1,190 @@
+"""Define ranking of trained models against the active model."""
+import typing
+from dataclasses import dataclass
+
+import numpy as np
+
+from graphgrid_sdk.ggcore.sdk_messages import NMTStatusResponse, \
+    TrainedModelData
+
+# Metrics a candidate was compared on, in order of preference
+TIER_EVAL = "eval"
+TIER_TRAINING = "training"
+TIER_EVAL_LOSS = "eval_loss"
+TIER_PROPERTIES_CHANGED = "properties_changed"
+TIER_NO_METRICS = "no_metrics"
+TIERS = (TIER_EVAL, TIER_TRAINING, TIER_EVAL_LOSS, TIER_PROPERTIES_CHANGED,
+         TIER_NO_METRICS)
+
+# Return a score per candidate from candidate losses and accuracies and the
+# active model's loss and accuracy; a score >= 0 beats the active model
+Scorer = typing.Callable[[np.ndarray, np.ndarray, float, float], np.ndarray]
+
+
+def sigmoid(values: np.ndarray) -> np.ndarray:
+    """Return the element-wise logistic sigmoid."""
+    return 1.0 / (1.0 + np.exp(-values))
+
+
+def loss_accuracy_score(losses: np.ndarray, accuracies: np.ndarray,
+                        active_loss: float,
+                        active_accuracy: float) -> np.ndarray:
+    """Score lower (sigmoid-squashed) losses and higher accuracies."""
+    return (sigmoid(np.float64(active_loss)) - sigmoid(losses)) \
+        + (accuracies - active_accuracy)
+
+
+# pylint: disable=unused-argument
+def loss_score(losses: np.ndarray, accuracies: np.ndarray,
+               active_loss: float, active_accuracy: float) -> np.ndarray:
+    """Score lower losses only."""
+    return active_loss - losses
+
+
+@dataclass(frozen=True)
+class RankedModel:
+    """Define class representing one row of a model ranking."""
+    rank: int
+    candidate: NMTStatusResponse
+    tier: str
+    score: float
+    beats_active: bool
+
+
+def _metric(candidates: typing.Sequence, name: str) -> np.ndarray:
+    """Return a metric of every candidate, NaN where missing."""
+    return np.array([np.nan if getattr(candidate, name, None) is None
+                     else getattr(candidate, name)
+                     for candidate in candidates], dtype=np.float64)
+
+
+def _active_metric(active: typing.Optional[TrainedModelData],
+                   name: str) -> float:
+    value = getattr(active, name, None)
+    return np.nan if value is None else float(value)
+
+
+class ModelRanker:
+    """Define class ranking a batch of trained models against the active
+    model of their task.
+
+    Each candidate is compared on the best metrics both it and the active
+    model have: eval loss and accuracy, then training loss and accuracy,
+    then eval loss alone. A candidate with eval metrics beats an active
+    model without them, and a candidate whose properties differ from the
+    active model's, or that has no comparable metrics, always beats it.
+    Scores are computed for the whole batch at once by the tier's scorer.
+    Candidates whose properties changed cannot be compared with the active
+    model, so they are scored against each other on the best metrics they
+    have.
+
+    Rows are ordered: candidates beating the active model first, then by
+    tier, then (among candidates whose properties changed) by the metrics
+    they were scored on, then by score, then later candidates first.
+    """
+
+    def __init__(self, eval_scorer: Scorer = loss_accuracy_score,
+                 training_scorer: Scorer = loss_accuracy_score,
+                 eval_loss_scorer: Scorer = loss_score):
+        self._eval_scorer = eval_scorer
+        self._training_scorer = training_scorer
+        self._eval_loss_scorer = eval_loss_scorer
+
+    # pylint: disable=too-many-locals
+    def rank(self, candidates: typing.Sequence[NMTStatusResponse],
+             active: typing.Optional[TrainedModelData]) \
+            -> typing.List[RankedModel]:
+        """Return the ranked candidates. ``active`` is None when the task has
+        no active model.
+        """
+        count = len(candidates)
+        if count == 0:
+            return []
+
+        eval_loss = _metric(candidates, "evalLoss")
+        eval_accuracy = _metric(candidates, "evalAccuracy")
+        training_loss = _metric(candidates, "trainingLoss")
+        training_accuracy = _metric(candidates, "trainingAccuracy")
+        active_eval_loss = _active_metric(active, "evalLoss")
+        active_eval_accuracy = _active_metric(active, "evalAccuracy")
+        active_training_loss = _active_metric(active, "trainingLoss")
+        active_training_accuracy = _active_metric(active, "trainingAccuracy")
+
+        properties_changed = np.array(
+            [active is not None
+             and getattr(candidate, "properties", None) != active.properties
+             for candidate in candidates], dtype=bool)
+        has_eval = ~np.isnan(eval_loss) & ~np.isnan(eval_accuracy)
+        own_training = ~np.isnan(training_loss) & ~np.isnan(training_accuracy)
+        has_training = own_training \
+            & (active is None or not (np.isnan(active_training_loss)
+                                      or np.isnan(active_training_accuracy)))
+        has_eval_loss = ~np.isnan(eval_loss) \
+            & (active is None or not np.isnan(active_eval_loss))
+
+        # the best metrics each candidate has, whatever the active model has
+        metric_tiers = np.select(
+            [has_eval, own_training, ~np.isnan(eval_loss)],
+            [TIERS.index(TIER_EVAL), TIERS.index(TIER_TRAINING),
+             TIERS.index(TIER_EVAL_LOSS)],
+            TIERS.index(TIER_NO_METRICS))
+
+        # first matching tier wins, as in np.select
+        tiers = np.select(
+            [properties_changed, has_eval, has_training, has_eval_loss],
+            [TIERS.index(TIER_PROPERTIES_CHANGED), TIERS.index(TIER_EVAL),
+             TIERS.index(TIER_TRAINING), TIERS.index(TIER_EVAL_LOSS)],
+            TIERS.index(TIER_NO_METRICS))
+
+        # without an active metric the candidates only compete with each
+        # other, so score them against zero
+        scores = np.full(count, np.nan)
+        beats_active = np.ones(count, dtype=bool)
+        for tier, scorer, losses, accuracies, active_loss, \
+                active_accuracy in (
+                    (TIER_EVAL, self._eval_scorer, eval_loss, eval_accuracy,
+                     active_eval_loss, active_eval_accuracy),
+                    (TIER_TRAINING, self._training_scorer, training_loss,
+                     training_accuracy, active_training_loss,
+                     active_training_accuracy),
+                    (TIER_EVAL_LOSS, self._eval_loss_scorer, eval_loss,
+                     eval_accuracy, active_eval_loss,
+                     active_eval_accuracy)):
+            # candidates whose properties changed still beat the active
+            # model, but compete with each other on their own metrics
+            changed = properties_changed & (metric_tiers == TIERS.index(tier))
+            if changed.any():
+                scores[changed] = np.asarray(
+                    scorer(losses[changed], accuracies[changed], 0.0, 0.0),
+                    dtype=np.float64)
+
+            mask = tiers == TIERS.index(tier)
+            if not mask.any():
+                continue
+            comparable = active is not None and not np.isnan(active_loss) \
+                and (tier == TIER_EVAL_LOSS or not np.isnan(active_accuracy))
+            tier_scores = np.asarray(scorer(
+                losses[mask], accuracies[mask],
+                active_loss if comparable else 0.0,
+                active_accuracy if comparable else 0.0), dtype=np.float64)
+            scores[mask] = tier_scores
+            if comparable:
+                beats_active[mask] = tier_scores >= 0
+
+        # np.lexsort sorts by the last key first
+        order = np.lexsort((-np.arange(count),
+                            -np.nan_to_num(scores, nan=-np.inf),
+                            np.where(properties_changed, metric_tiers, 0),
+                            tiers, ~beats_active))
+        return [RankedModel(rank, candidates[index], TIERS[tiers[index]],
+                            float(scores[index]), bool(beats_active[index]))
+                for rank, index in enumerate(order, 1)]
+
+    def best(self, candidates: typing.Sequence[NMTStatusResponse],
+             active: typing.Optional[TrainedModelData]) \
+            -> typing.Optional[NMTStatusResponse]:
+        """Return the best candidate if it beats the active model."""
+        ranking = self.rank(candidates, active)
+        if ranking and ranking[0].beats_active:
+            return ranking[0].candidate
+        return None
@@ -1,80 +1,47 @@
-import math
+import functools
+import queue
+import threading
 import time
 import typing
-
-import requests
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 
 from graphgrid_sdk.ggcore.client import ConfigClient, NlpClient
 from graphgrid_sdk.ggcore.config import SdkBootstrapConfig
-from graphgrid_sdk.ggcore.sdk_messages import TrainRequestBody, PromoteModelResponse, NMTStatusResponse, \
-    GetActiveModelResponse, NMTTrainPipelineResponse
-from graphgrid_sdk.ggcore.utils import NlpModel
-
-
-def sigmoid(x):
-    return 1 / (1 + math.exp(-x))
-
-
-def evaluate_models(active_model: GetActiveModelResponse, new_model: NMTStatusResponse):
-    active_model_data = active_model.trainedModelData
-    if active_model_data.properties == new_model.properties:
-        # Properties match (note: order matters for lists)
-        # Now check if newer model has eval metrics
-        if new_model.evalAccuracy is not None \
-                and new_model.evalLoss is not None:
-            # Does the other model have eval metrics too?
-            if active_model_data.evalAccuracy is not None \
-                    and active_model_data.evalLoss is not None:
-                # Lower losses are preferred
-                loss_delta = sigmoid(active_model_data.evalLoss) - \
-                             sigmoid(new_model.evalLoss)
-                # Higher accuracies are preferred
-                acc_delta = -1 * (active_model_data.evalAccuracy - active_model_data.evalAccuracy)
-                # The more positive, the better the model
-                diff = loss_delta + acc_delta
-
-                if diff >= 0:
-                    # Update the selected model. Newer one is better
-                    return new_model
-                else:
-                    return active_model
-            else:
-                # Choose more recent model with eval metrics
-                return new_model
-
-        elif active_model_data.trainingAccuracy is not None \
-                and active_model_data.trainingLoss is not None \
-                and new_model.trainingAccuracy is not None \
-                and new_model.trainingLoss is not None:
-            # Lower losses are preferred
-            loss_delta = sigmoid(active_model_data.trainingLoss) - \
-                         sigmoid(new_model.trainingLoss)
-            # Higher accuracies are preferred
-            acc_delta = -1 * (
-                    active_model_data.trainingAccuracy - new_model.trainingAccuracy)
-            # The more positive, the better the model
-            diff = loss_delta + acc_delta
-
-            if diff >= 0:
-                # Update the selected model. Newer one is better
-                return new_model
-            else:
-                return active_model
+from graphgrid_sdk.ggcore.http_base import SdkHttpClient
+from graphgrid_sdk.ggcore.metrics_store import MetricsStore, ActiveModelRecord
+from graphgrid_sdk.ggcore.model_ranking import ModelRanker
+from graphgrid_sdk.ggcore.pipeline_journal import PipelineJournal, JournaledPipeline, JournaledJob
+from graphgrid_sdk.ggcore.polling import DagRunPollingEngine
+from graphgrid_sdk.ggcore.scheduler import TrainingScheduler, TrainingSchedulerRegistry
+from graphgrid_sdk.ggcore.sdk_exceptions import SdkDagRunException
+from graphgrid_sdk.ggcore.sdk_messages import TrainRequestBody, \
+    PromoteModelResponse, NMTStatusResponse, GetActiveModelResponse, \
+    NMTTrainPipelineResponse, ModelOutcome, SaveDatasetResponse, \
+    DatasetTrainResult
+from graphgrid_sdk.ggcore.utils import NlpModel, DAG_STATE_SUCCESS, DAG_STATE_FAILED
 
-        elif active_model_data.evalLoss is not None \
-                and new_model.evalLoss is not None:
-            # This should only apply to translation
-            if new_model.evalLoss <= active_model_data.evalLoss:
-                return new_model
-            else:
-                return active_model
 
-        else:
-            # With no training or eval metrics choose more recent models
-            return new_model
-    else:
-        # Properties do not match. Choose the newer model
+def select_best_model(active_model: GetActiveModelResponse,
+                      candidates: typing.Sequence[NMTStatusResponse]) \
+        -> typing.Optional[NMTStatusResponse]:
+    """Return the best of a batch of trained models of one task if it beats
+    the active model, otherwise None.
+    """
+    # a task without an active model has no trainedModelData
+    return ModelRanker().best(
+        candidates, getattr(active_model, "trainedModelData", None))
+
+
+def evaluate_models(active_model: GetActiveModelResponse,
+                    new_model: NMTStatusResponse):
+    """Return the new model if it beats the active model, otherwise the
+    active model. Autopromotion ranks batches with ``select_best_model``
+    instead.
+    """
+    if select_best_model(active_model, [new_model]) is not None:
         return new_model
+    return active_model
 
 
 class NmtTrainPipeline:
@@ -82,16 +49,279 @@ class NmtTrainPipeline:
 
     _config_client: ConfigClient
     _nlp_client: NlpClient
+    _metrics_store: typing.Optional[MetricsStore]
+    _polling_engine: typing.Optional[DagRunPollingEngine]
+    _training_scheduler: typing.Optional[TrainingScheduler]
 
-    def __init__(self, bootstrap_config: SdkBootstrapConfig):
+    def __init__(self, bootstrap_config: SdkBootstrapConfig,
+                 http_client: typing.Optional[SdkHttpClient] = None,
+                 polling_engine: typing.Optional[DagRunPollingEngine] = None,
+                 training_scheduler: typing.Optional[TrainingScheduler] = None):
         self._configuration = bootstrap_config
+        self._polling_engine = polling_engine
+        self._training_scheduler = training_scheduler
+        self._metrics_store = MetricsStore.from_config(bootstrap_config)
 
-        self._setup_clients()
+        self._setup_clients(http_client)
 
-    def _setup_clients(self):
+    def _setup_clients(self, http_client: typing.Optional[SdkHttpClient]):
         """Setup low-level clients."""
-        self._config_client = ConfigClient(self._configuration)
-        self._nlp_client = NlpClient(self._configuration)
+        self._config_client = ConfigClient(self._configuration, http_client)
+        self._nlp_client = NlpClient(self._configuration, http_client)
+
+    def _active_model(self, model: NlpModel) \
+            -> typing.Union[GetActiveModelResponse, ActiveModelRecord]:
+        """Return the active model of a task, as recorded in the metrics
+        store if it was recorded recently enough, otherwise as fetched.
+        """
+        task = getattr(model, "value", model)
+        if self._metrics_store is not None:
+            recorded = self._metrics_store.active_model(
+                task, self._configuration.metrics_store_active_max_age)
+            if recorded is not None:
+                return recorded
+        return self._fetch_active_model(model)
+
+    def _fetch_active_model(self, model: NlpModel) -> GetActiveModelResponse:
+        """Return the active model of a task as fetched, recording it in the
+        metrics store.
+        """
+        task = getattr(model, "value", model)
+        active_model = self._nlp_client.get_active_model(model)
+        if self._metrics_store is not None \
+                and getattr(active_model, "trainedModelData", None) is not None:
+            self._metrics_store.record_active_model(task, active_model)
+        return active_model
+
+    def _prefetched_active_model(self, prefetched: typing.Optional[Future]) \
+            -> typing.Tuple[typing.Optional[typing.Union[
+                GetActiveModelResponse, ActiveModelRecord]], bool]:
+        """Return the active model fetched by ``_prefetch_active_models``, if
+        any, and whether it may be stale.
+        """
+        if prefetched is None:
+            return None, False
+        try:
+            active_model, fetched_at = prefetched.result()
+        # pylint: disable=broad-except
+        except Exception:
+            # fetched again when needed
+            return None, False
+        max_age = self._configuration.active_model_cache_ttl or 0.0
+        stale = isinstance(active_model, ActiveModelRecord) \
+            or time.monotonic() - fetched_at > max_age
+        return active_model, stale
+
+    def _select_promotion(self, model: NlpModel,
+                          candidates: typing.List[NMTStatusResponse],
+                          prefetched: typing.Optional[Future] = None) \
+            -> typing.Optional[NMTStatusResponse]:
+        """Return the best of a batch of trained models of one task if it
+        beats the active model, otherwise None.
+
+        The active model is the ``prefetched`` one, if any, otherwise as
+        recorded or fetched. A recorded or prefetched active model may have
+        been replaced since, so unless it is fresh a model beating it is only
+        selected if it also beats the active model as fetched.
+        """
+        active_model, stale = self._prefetched_active_model(prefetched)
+        if active_model is None:
+            active_model = self._active_model(model)
+            stale = isinstance(active_model, ActiveModelRecord)
+        best = select_best_model(active_model, candidates)
+        if best is not None and stale:
+            best = select_best_model(self._fetch_active_model(model),
+                                     candidates)
+        return best
+
+    # pylint: disable=too-many-arguments
+    def _promote_best(self, model: NlpModel,
+                      batch: typing.List[typing.Tuple[int, NMTStatusResponse]],
+                      dataset_id: typing.Optional[str] = None,
+                      prefetched: typing.Optional[Future] = None) \
+            -> typing.Dict[int, typing.Tuple[typing.Optional[str], str]]:
+        """Rank a batch of successfully trained models of one task in one
+        pass and promote the best if it beats the active model (see
+        ``_select_promotion``). Return the promoted model name, if any, and
+        what happened, per job index.
+        """
+        best = self._select_promotion(
+            model, [model_status for _, model_status in batch], prefetched)
+        if best is None:
+            print("Model has not been promoted; currently active model has "
+                  "greater accuracy")
+        decisions = {}
+        for index, model_status in batch:
+            if best is None:
+                decisions[index] = None, "active model is better"
+            elif model_status is best:
+                decisions[index] = self._promote(model, model_status,
+                                                 dataset_id)
+            else:
+                decisions[index] = \
+                    None, "another model of the task ranked higher"
+        return decisions
+
+    def _evaluate(self, index: int, model: NlpModel,
+                  model_status: NMTStatusResponse, run: '_PipelineRun') \
+            -> typing.Tuple[typing.Optional[str], str]:
+        """Evaluate a successfully trained model and promote it if it is the
+        best. Return the promoted model name, if any, and what happened.
+
+        Tasks are evaluated in parallel. Within a task one batch is evaluated
+        at a time, against the model the previous batch may have promoted;
+        models of the task finishing meanwhile are ranked together in the
+        next batch.
+        """
+        task = getattr(model, "value", model)
+        with run.lock:
+            run.pending.setdefault(task, []).append((index, model_status))
+        with run.task_locks[task]:
+            with run.lock:
+                batch = run.pending.pop(task, [])
+            # an empty batch was evaluated by the job holding the lock before
+            if batch:
+                with run.lock:
+                    # only the first batch of a task was ranked before any
+                    # promotion of this run
+                    prefetched = run.active_models.pop(task, None)
+                decisions = self._promote_best(model, batch, run.dataset_id,
+                                               prefetched)
+                with run.lock:
+                    run.decisions.update(decisions)
+        with run.lock:
+            return run.decisions.pop(index)
+
+    def _promote(self, model: NlpModel, completed_job: NMTStatusResponse,
+                 dataset_id: typing.Optional[str] = None) \
+            -> typing.Tuple[typing.Optional[str], str]:
+        """Promote a successfully trained model. Return the promoted model
+        name, if any, and what happened.
+        """
+        promote_model_response: PromoteModelResponse = \
+            self._nlp_client.promote_model(completed_job.savedModelName,
+                                           "default")
+        if promote_model_response.status_code != 200:
+            print("Error promoting model: ", promote_model_response.exception)
+            return None, \
+                f"promotion failed: {promote_model_response.exception}"
+
+        if self._metrics_store is not None:
+            self._metrics_store.record_promotion(
+                getattr(model, "value", model),
+                promote_model_response.modelName, completed_job, dataset_id)
+        print("Model has been promoted.")
+        return promote_model_response.modelName, "promoted"
+
+    def _prefetch_active_models(self, models: typing.Iterable[NlpModel],
+                                executor: Executor) \
+            -> typing.Dict[str, Future]:
+        """Start fetching the active model of every task in one concurrent
+        batch. Return a future per task resolving to its active model, as
+        recorded or fetched, and the monotonic time it was looked up.
+        """
+        tasks = {getattr(model, "value", model): model for model in models}
+        return {task: executor.submit(self._timed_active_model, model)
+                for task, model in tasks.items()}
+
+    def _timed_active_model(self, model: NlpModel) \
+            -> typing.Tuple[typing.Union[GetActiveModelResponse,
+                                         ActiveModelRecord], float]:
+        """Return the active model of a task and the monotonic time it was
+        looked up.
+        """
+        return self._active_model(model), time.monotonic()
+
+    def _finish_job(self, index: int, model: NlpModel, status_future: Future,
+                    run: '_PipelineRun') \
+            -> typing.Tuple[typing.Optional[NMTStatusResponse], ModelOutcome]:
+        """Run the handler and, if enabled, promotion for a finished job.
+        Return its final status (None if it could not be polled) and its
+        outcome.
+        """
+        task = getattr(model, "value", model)
+        outcome = ModelOutcome(task)
+        try:
+            model_status = status_future.result()
+        # pylint: disable=broad-except
+        except Exception as exception:
+            print(f"Job for model {task} failed.")
+            outcome.detail = \
+                f"training could not be started or polled: {exception}"
+            return None, outcome
+
+        outcome.dagRunId = getattr(model_status, "dagRunId", None)
+        outcome.state = model_status.state
+        if run.journal is not None:
+            run.journal.record_finished(index, outcome.dagRunId, outcome.state)
+        if self._metrics_store is not None and outcome.dagRunId is not None:
+            self._metrics_store.record_run(task, model_status, run.dataset_id)
+
+        if model_status.state == DAG_STATE_SUCCESS \
+                and run.success_handler is not None:
+            run.success_handler(model_status)
+        elif model_status.state == DAG_STATE_FAILED \
+                and run.failed_handler is not None:
+            run.failed_handler(model_status)
+
+        if model_status.state != DAG_STATE_SUCCESS:
+            outcome.detail = "training failed"
+        elif run.autopromote:
+            outcome.promotedModelName, outcome.detail = \
+                self._evaluate(index, model, model_status, run)
+            outcome.promoted = outcome.promotedModelName is not None
+
+        if run.journal is not None:
+            run.journal.record_evaluated(index, outcome.promotedModelName)
+        return model_status, outcome
+
+    def _journaled_outcome(self, job: JournaledJob) \
+            -> typing.Tuple[typing.Optional[NMTStatusResponse], ModelOutcome]:
+        """Return the final status and outcome of a job evaluated before the
+        pipeline was resumed.
+        """
+        outcome = ModelOutcome(job.model.value, job.dag_run_id, job.state,
+                               job.promoted_model is not None,
+                               job.promoted_model,
+                               "evaluated before the pipeline was resumed")
+        try:
+            model_status = self._nlp_client.get_nmt_status(job.dag_run_id)
+        # pylint: disable=broad-except
+        except Exception:
+            model_status = None
+        if model_status is None or model_status.status_code != 200:
+            print(f"Unable to get the status of dag run {job.dag_run_id}.")
+            return None, outcome
+        return model_status, outcome
+
+    @staticmethod
+    def _on_job_finished(index: int, finished_jobs: queue.Queue,
+                         status_future: Future):
+        """Queue a finished job."""
+        finished_jobs.put((index, status_future))
+
+    @staticmethod
+    def _on_job_started(index: int, finished_jobs: queue.Queue,
+                        journal: typing.Optional[PipelineJournal],
+                        handle_future: Future):
+        """Queue a job once it has finished, or right away if it could not be
+        triggered or was withdrawn.
+        """
+        if handle_future.cancelled():
+            # queue it as failed, so nothing waits for it forever
+            withdrawn = Future()
+            withdrawn.set_exception(SdkDagRunException(
+                "training run was withdrawn before it was triggered"))
+            finished_jobs.put((index, withdrawn))
+            return
+        if handle_future.exception() is not None:
+            finished_jobs.put((index, handle_future))
+            return
+        handle = handle_future.result()
+        if journal is not None and handle.dag_run_id is not None:
+            journal.record_triggered(index, handle.dag_run_id)
+        handle.future.add_done_callback(
+            functools.partial(NmtTrainPipeline._on_job_finished, index, finished_jobs))
 
     def nmt_train_pipeline(self, models_to_train: typing.List[NlpModel],
                            dataset_id: str,
@@ -99,65 +329,270 @@ class NmtTrainPipeline:
                            gpu: typing.Optional[bool],
                            autopromote: bool,
                            success_handler: typing.Optional[callable],
-                           failed_handler: typing.Optional[callable]):
+                           failed_handler: typing.Optional[callable],
+                           executor: typing.Optional[Executor] = None,
+                           journal_path: typing.Optional[str] = None):
+        """Train the models and, as soon as each model's job finishes, run
+        its handler and (optionally) its evaluation and promotion on
+        ``executor``. Without an executor a thread pool is used for the call.
 
-        num_models = len(models_to_train)
+        With a ``journal_path`` the pipeline's progress is appended to that
+        journal, so it can be picked up by ``resume_pipeline`` if this
+        process dies.
+        """
+        journal = None
+        if journal_path is not None:
+            journal = PipelineJournal(journal_path)
+            journal.record_pipeline(models_to_train, dataset_id, no_cache,
+                                    gpu, autopromote)
 
-        train_request_bodies = []
-        for model in models_to_train:
-            train_request_bodies.append(
-                TrainRequestBody(model=model, dataset_id=dataset_id,
-                                 no_cache=no_cache, gpu=gpu))
+        print("...running dag...")
+        pipeline = JournaledPipeline(
+            dataset_id, no_cache, gpu, autopromote,
+            [JournaledJob(model) for model in models_to_train])
+        return self._run_pipeline(pipeline, success_handler, failed_handler,
+                                  executor, journal)
 
-        jobs = []
-        for i in range(num_models):
-            jobs.append(self._nlp_client.trigger_nmt(train_request_bodies[i]))
+    def resume_pipeline(self, journal_path: str,
+                        success_handler: typing.Optional[callable] = None,
+                        failed_handler: typing.Optional[callable] = None,
+                        executor: typing.Optional[Executor] = None):
+        """Resume the last pipeline recorded in a journal written by
+        ``nmt_train_pipeline``.
 
-        completed_jobs = []
-        while jobs:
-            print("...running dag...")
-            time.sleep(10)
-            for i, job in enumerate(jobs):
+        Jobs that were never triggered are triggered, running jobs are
+        reattached to without being triggered again, and finished jobs are
+        evaluated and promoted unless the journal shows that already
+        happened. Handlers of a job that finished but was not yet recorded as
+        evaluated may run a second time.
+        """
+        journal = PipelineJournal(journal_path)
+        pipeline = journal.replay()
+
+        print("...resuming dag...")
+        return self._run_pipeline(pipeline, success_handler, failed_handler,
+                                  executor, journal)
+
+    # pylint: disable=too-many-arguments
+    def upload_train_pipeline(self, datasets: typing.Iterable[
+                                  typing.Tuple[typing.Generator,
+                                               typing.Optional[str]]],
+                              models_to_train: typing.List[NlpModel],
+                              no_cache: typing.Optional[bool],
+                              gpu: typing.Optional[bool],
+                              autopromote: bool,
+                              success_handler: typing.Optional[callable],
+                              failed_handler: typing.Optional[callable],
+                              executor: typing.Optional[Executor] = None,
+                              max_pending_uploads: int = 1) \
+            -> typing.List[DatasetTrainResult]:
+        """Upload each ``(data_generator, filename)`` of ``datasets`` on a
+        background thread and train the models on every uploaded dataset in
+        turn, so dataset N+1 uploads while dataset N trains. At most
+        ``max_pending_uploads`` uploaded datasets wait for training; further
+        uploads wait until one is taken.
+
+        A dataset that fails to upload is reported and skipped.
+        """
+        uploaded = queue.Queue(maxsize=max_pending_uploads)
+        stop = threading.Event()
+        threading.Thread(target=self._upload_datasets,
+                         args=(datasets, uploaded, stop),
+                         name="graphgrid-sdk-upload", daemon=True).start()
+        results = []
+        try:
+            upload = uploaded.get()
+            while upload is not None:
+                if isinstance(upload, BaseException):
+                    raise upload
+                results.append(self._train_uploaded(
+                    upload, models_to_train, no_cache, gpu, autopromote,
+                    success_handler, failed_handler, executor))
+                upload = uploaded.get()
+        finally:
+            # stop uploading once the caller stops training
+            stop.set()
+        return results
+
+    def _upload_datasets(self, datasets: typing.Iterable[
+                             typing.Tuple[typing.Generator,
+                                          typing.Optional[str]]],
+                         uploaded: queue.Queue, stop: threading.Event):
+        """Upload datasets one after another and queue each upload, then
+        None. An error reading ``datasets`` is queued in place of None.
+        """
+        end = None
+        try:
+            for index, (generator, filename) in enumerate(datasets):
+                if stop.is_set():
+                    return
+                upload = _DatasetUpload(index, filename)
                 try:
-                    job_status = self._nlp_client.get_nmt_status(job.dagRunId)
+                    upload.response = self._nlp_client.save_dataset(
+                        generator, filename)
+                # pylint: disable=broad-except
+                except Exception as exception:
+                    upload.exception = exception
+                if not self._put_unless_stopped(uploaded, upload, stop):
+                    return
+        # pylint: disable=broad-except
+        except Exception as exception:
+            end = exception
+        self._put_unless_stopped(uploaded, end, stop)
 
-                    if job_status.status_code != 200:
-                        print(f"Job {job.dagRunId} failed.")
-                        jobs.pop(i)
+    @staticmethod
+    def _put_unless_stopped(uploaded: queue.Queue, item,
+                            stop: threading.Event) -> bool:
+        """Queue an item once there is room, unless stopped first. Return
+        whether it was queued.
+        """
+        while not stop.is_set():
+            try:
+                uploaded.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
 
-                    if job_status.state == "success" or \
-                            job_status.state == "failed":
-                        jobs.pop(i)
-                        completed_jobs.append(job_status)
+    def _train_uploaded(self, upload: '_DatasetUpload',
+                        models_to_train: typing.List[NlpModel],
+                        no_cache: typing.Optional[bool],
+                        gpu: typing.Optional[bool], autopromote: bool,
+                        success_handler: typing.Optional[callable],
+                        failed_handler: typing.Optional[callable],
+                        executor: typing.Optional[Executor]) \
+            -> DatasetTrainResult:
+        """Train the models on an uploaded dataset and return the result."""
+        result = DatasetTrainResult(upload.index, upload.filename)
+        if upload.exception is not None:
+            result.detail = f"upload failed: {upload.exception}"
+            return result
+        if upload.response.status_code != 200 \
+                or upload.response.dataset_id is None:
+            print(f"Error uploading dataset {upload.index}: ",
+                  upload.response.exception)
+            result.detail = f"upload failed with status code " \
+                            f"{upload.response.status_code}"
+            return result
 
-                except requests.RequestException:
-                    print(f"Job {job.dagRunId} failed.")
-                    jobs.pop(i)
+        result.datasetId = upload.response.dataset_id
+        print(f"...running dag for dataset {result.datasetId}...")
+        pipeline = JournaledPipeline(
+            result.datasetId, no_cache, gpu, autopromote,
+            [JournaledJob(model) for model in models_to_train])
+        result.pipelineResponse = self._run_pipeline(
+            pipeline, success_handler, failed_handler, executor, None)
+        return result
 
-        for model_status in completed_jobs:
-            if model_status.state == "success" and success_handler is not None:
-                success_handler(model_status)
-            elif model_status.state == "failed" and failed_handler is not None:
-                failed_handler(model_status)
+    # pylint: disable=too-many-locals
+    def _run_pipeline(self, pipeline: JournaledPipeline,
+                      success_handler: typing.Optional[callable],
+                      failed_handler: typing.Optional[callable],
+                      executor: typing.Optional[Executor],
+                      journal: typing.Optional[PipelineJournal]) \
+            -> NMTTrainPipelineResponse:
+        """Run the pipeline's outstanding work and return the outcome of every
+        job.
+        """
+        jobs = pipeline.jobs
+        run = _PipelineRun(pipeline.dataset_id, pipeline.autopromote,
+                           success_handler, failed_handler, journal,
+                           {job.model.value: threading.Lock() for job in jobs})
+        polling_engine = self._polling_engine \
+            or DagRunPollingEngine.from_config(self._configuration)
+        training_scheduler = self._training_scheduler \
+            or TrainingSchedulerRegistry.training_scheduler(self._configuration)
+        job_executor = executor or ThreadPoolExecutor(
+            max_workers=max(len(jobs), 1),
+            thread_name_prefix="graphgrid-sdk-pipeline")
+        try:
+            finished_jobs = queue.Queue()
+            finish_futures = [None] * len(jobs)
+            running = [job.model for job in jobs if not job.evaluated]
+            if pipeline.autopromote:
+                # fetched while the jobs train, and awaited by the first evaluation of each task
+                run.active_models = self._prefetch_active_models(running, job_executor)
+            for i, job in enumerate(jobs):
+                if job.evaluated:
+                    finish_futures[i] = job_executor.submit(
+                        self._journaled_outcome, job)
+                    continue
 
-        print("Dag training/eval/model upload has finished.")
+                if job.dag_run_id is not None:
+                    # reattach to a run triggered before the pipeline was resumed
+                    polling_engine.watch(
+                        job.dag_run_id, self._nlp_client.get_nmt_status
+                    ).add_done_callback(functools.partial(
+                        self._on_job_finished, i, finished_jobs))
+                else:
+                    # jobs are triggered as the training scheduler admits them
+                    request_body = TrainRequestBody(
+                        model=job.model, dataset_id=pipeline.dataset_id,
+                        no_cache=pipeline.no_cache, gpu=pipeline.gpu)
+                    training_scheduler.submit(
+                        request_body, trigger=self._nlp_client.trigger_nmt,
+                        watch=lambda dag_run_id: polling_engine.watch(
+                            dag_run_id, self._nlp_client.get_nmt_status)
+                    ).add_done_callback(functools.partial(
+                        self._on_job_started, i, finished_jobs, journal))
+
+            # hand each job to the executor the moment it finishes
+            for _ in running:
+                i, status_future = finished_jobs.get()
+                finish_futures[i] = job_executor.submit(
+                    self._finish_job, i, jobs[i].model, status_future, run)
+            outcomes = [finish_future.result()
+                        for finish_future in finish_futures]
+        finally:
+            if executor is None:
+                job_executor.shutdown(wait=True)
+            if polling_engine is not self._polling_engine:
+                polling_engine.close()
 
-        promoted_models = []
-        if autopromote:
-            for i, completed_job in enumerate(completed_jobs):
-                if completed_job.state == "success":
-                    selected_model = evaluate_models(self._nlp_client.get_active_model(models_to_train[i]), completed_job)
-                    if selected_model == completed_job:
-                        promote_model_response: PromoteModelResponse = \
-                            self._nlp_client.promote_model(completed_job.savedModelName, "default")
-                        if promote_model_response.status_code == 200:
-                            print("Model has been promoted.")
-                            promoted_models.append(promote_model_response.modelName)
-                        else:
-                            print("Error promoting model: ", promote_model_response.exception)
-                    else:
-                        print("Model has not been promoted; currently active model has` greater accuracy")
+        print("Dag training/eval/model upload has finished.")
 
+        completed_jobs = [model_status for model_status, _ in outcomes
+                          if model_status is not None]
+        model_outcomes = [outcome for _, outcome in outcomes]
+        promoted_models = [outcome.promotedModelName
+                           for outcome in model_outcomes if outcome.promoted]
+        if pipeline.autopromote:
             print("Model promotion is complete.")
 
-        return NMTTrainPipelineResponse(completed_jobs, promoted_models)
+        return NMTTrainPipelineResponse(completed_jobs, promoted_models,
+                                        model_outcomes)
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass
+class _PipelineRun:
+    """Define class holding what the jobs of one pipeline run share."""
+    dataset_id: str
+    autopromote: bool
+    success_handler: typing.Optional[callable]
+    failed_handler: typing.Optional[callable]
+    journal: typing.Optional[PipelineJournal]
+    # one lock per task, held while a batch of the task is evaluated and
+    # promoted
+    task_locks: typing.Dict[str, threading.Lock]
+    # guards pending, decisions and active_models
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    # finished jobs per task waiting to be evaluated, and evaluated jobs'
+    # (promoted model, detail) by index
+    pending: typing.Dict[
+        str, typing.List[typing.Tuple[int, NMTStatusResponse]]] = \
+        field(default_factory=dict)
+    decisions: typing.Dict[int, typing.Tuple[typing.Optional[str], str]] = \
+        field(default_factory=dict)
+    # per task, the active model prefetched when the run started, until its
+    # first batch is evaluated
+    active_models: typing.Dict[str, Future] = field(default_factory=dict)
+
+
+@dataclass
+class _DatasetUpload:
+    """Define class holding the outcome of one dataset upload."""
+    index: int
+    filename: typing.Optional[str]
+    response: typing.Optional[SaveDatasetResponse] = None
+    exception: typing.Optional[Exception] = None
@@ -0,0 +1,150 @@
+"""Define an append-only journal of nmt train pipeline progress."""
+import json
+import logging
+import os
+import threading
+import time
+import typing
+from dataclasses import dataclass, field
+
+from graphgrid_sdk.ggcore.sdk_exceptions import SdkPipelineJournalException
+from graphgrid_sdk.ggcore.utils import NlpModel
+
+# Journal events, in the order a job goes through them
+EVENT_PIPELINE = "pipeline"
+EVENT_TRIGGERED = "triggered"
+EVENT_FINISHED = "finished"
+EVENT_EVALUATED = "evaluated"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class JournaledJob:
+    """Define class representing what a journal knows about one job."""
+    model: NlpModel
+    dag_run_id: typing.Optional[str] = None
+    state: typing.Optional[str] = None
+    evaluated: bool = False
+    promoted_model: typing.Optional[str] = None
+
+
+@dataclass
+class JournaledPipeline:
+    """Define class representing a pipeline replayed from its journal."""
+    dataset_id: str
+    no_cache: typing.Optional[bool]
+    gpu: typing.Optional[bool]
+    autopromote: bool
+    jobs: typing.List[JournaledJob] = field(default_factory=list)
+
+
+class PipelineJournal:
+    """Define class recording pipeline progress in a JSON lines file.
+
+    Each record is appended and flushed to disk before the pipeline moves
+    on, so a pipeline whose process died can be resumed from the journal:
+    a job's dag run is known once triggered, and its evaluation and
+    promotion are known once done. Jobs are identified by their position
+    in the pipeline. A journal may hold several pipelines; the last one is
+    replayed.
+    """
+    _lock: threading.Lock
+
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        """Return the path of the journal file."""
+        return self._path
+
+    def _append(self, event: str, **record):
+        """Durably append a record to the journal."""
+        record = {"event": event, "time": time.time(), **record}
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            with open(self._path, "a", encoding="utf-8") as journal_file:
+                journal_file.write(line)
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+
+    def record_pipeline(self, models: typing.List[NlpModel], dataset_id: str,
+                        no_cache: typing.Optional[bool],
+                        gpu: typing.Optional[bool], autopromote: bool):
+        """Record the start of a pipeline."""
+        self._append(EVENT_PIPELINE,
+                     models=[getattr(model, "value", model)
+                             for model in models],
+                     dataset_id=dataset_id, no_cache=no_cache, gpu=gpu,
+                     autopromote=autopromote)
+
+    def record_triggered(self, index: int, dag_run_id: str):
+        """Record the dag run started for a job."""
+        self._append(EVENT_TRIGGERED, index=index, dag_run_id=dag_run_id)
+
+    def record_finished(self, index: int, dag_run_id: str, state: str):
+        """Record the terminal state of a job's dag run."""
+        self._append(EVENT_FINISHED, index=index, dag_run_id=dag_run_id,
+                     state=state)
+
+    def record_evaluated(self, index: int,
+                         promoted_model: typing.Optional[str]):
+        """Record that a job's handlers and promotion have run."""
+        self._append(EVENT_EVALUATED, index=index,
+                     promoted_model=promoted_model)
+
+    def read(self) -> typing.List[dict]:
+        """Return the journal's records.
+
+        A last line cut short by a crash is skipped.
+        """
+        try:
+            with open(self._path, encoding="utf-8") as journal_file:
+                lines = journal_file.readlines()
+        except FileNotFoundError as not_found:
+            raise SdkPipelineJournalException(
+                f'Pipeline journal "{self._path}" does not exist.') \
+                from not_found
+
+        records = []
+        for number, line in enumerate(lines, 1):
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                if number < len(lines):
+                    raise SdkPipelineJournalException(
+                        f'Pipeline journal "{self._path}" is corrupt at '
+                        f'line {number}.') from None
+                logger.warning("Skipping incomplete last record of "
+                               "pipeline journal %s.", self._path)
+        return records
+
+    def replay(self) -> JournaledPipeline:
+        """Return the state of the journal's last pipeline."""
+        pipeline = None
+        for record in self.read():
+            event = record.get("event")
+            if event == EVENT_PIPELINE:
+                pipeline = JournaledPipeline(
+                    record["dataset_id"], record["no_cache"], record["gpu"],
+                    record["autopromote"],
+                    [JournaledJob(NlpModel(model))
+                     for model in record["models"]])
+            elif pipeline is not None and event in (
+                    EVENT_TRIGGERED, EVENT_FINISHED, EVENT_EVALUATED):
+                job = pipeline.jobs[record["index"]]
+                if event == EVENT_TRIGGERED:
+                    job.dag_run_id = record["dag_run_id"]
+                elif event == EVENT_FINISHED:
+                    job.dag_run_id = record["dag_run_id"]
+                    job.state = record["state"]
+                else:
+                    job.evaluated = True
+                    job.promoted_model = record["promoted_model"]
+
+        if pipeline is None:
+            raise SdkPipelineJournalException(
+                f'Pipeline journal "{self._path}" records no pipeline.')
+        return pipeline
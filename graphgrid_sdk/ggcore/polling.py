@@ -0,0 +1,236 @@
+"""Define concurrent, adaptive polling of dag runs."""
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+import typing
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+import requests
+
+from graphgrid_sdk.ggcore.config import SdkBootstrapConfig, \
+    DEFAULT_POLL_INITIAL_INTERVAL, DEFAULT_POLL_MAX_INTERVAL, \
+    DEFAULT_POLL_BACKOFF_FACTOR, DEFAULT_POLL_MAX_WORKERS
+from graphgrid_sdk.ggcore.sdk_exceptions import SdkException, \
+    SdkDagRunException
+from graphgrid_sdk.ggcore.sdk_messages import DagRunResponse
+from graphgrid_sdk.ggcore.utils import DAG_TERMINAL_STATES
+
+# Consecutive failed status requests after which a run is given up on
+DEFAULT_MAX_POLL_ERRORS = 3
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PollSchedule:
+    """Define class describing how often a single dag run is polled.
+
+    Runs are polled quickly at first, then at intervals growing by
+    ``backoff_factor`` up to ``max_interval``, so a run is never noticed
+    more than ``max_interval`` seconds after it finished.
+    """
+    initial_interval: float = DEFAULT_POLL_INITIAL_INTERVAL
+    max_interval: float = DEFAULT_POLL_MAX_INTERVAL
+    backoff_factor: float = DEFAULT_POLL_BACKOFF_FACTOR
+
+    @classmethod
+    def from_config(cls, bootstrap_config: SdkBootstrapConfig) \
+            -> 'PollSchedule':
+        """Return the poll schedule configured in the bootstrap config."""
+        return cls(bootstrap_config.poll_initial_interval,
+                   bootstrap_config.poll_max_interval,
+                   bootstrap_config.poll_backoff_factor)
+
+    def interval(self, polls: int) -> float:
+        """Return seconds to wait before the next poll of a run that has
+        already been polled ``polls`` times.
+        """
+        if self.backoff_factor > 1:
+            # stop growing the exponent once the cap is reached, so runs
+            # polled for a long time do not overflow it
+            polls = min(polls, self._growth_polls())
+        return min(self.initial_interval * self.backoff_factor ** polls,
+                   self.max_interval)
+
+    def _growth_polls(self) -> int:
+        """Return the polls after which a growing interval reaches the
+        cap.
+        """
+        if self.initial_interval <= 0 \
+                or self.max_interval <= self.initial_interval:
+            return 0
+        return math.ceil(math.log(self.max_interval / self.initial_interval,
+                                  self.backoff_factor))
+
+
+@dataclass
+class _PolledRun:
+    """Define class tracking the polling of a single dag run."""
+    dag_run_id: str
+    get_status: typing.Callable[[str], DagRunResponse]
+    future: Future
+    polls: int = 0
+    errors: int = 0
+
+
+# pylint: disable=too-many-instance-attributes
+class DagRunPollingEngine:
+    """Define class polling dag runs until each reaches a terminal state.
+
+    One engine serves any number of watched runs: a single scheduler
+    thread hands runs that are due a poll to a bounded pool of worker
+    threads, each run on its own adaptive schedule. Failed status requests
+    are retried on the run's schedule; a run is given up on after
+    ``max_errors`` consecutive failures. Threads are started on first use.
+    """
+    _lock: threading.Condition
+    _queue: typing.List[typing.Tuple[float, int, _PolledRun]]
+    _scheduler: typing.Optional[threading.Thread] = None
+    _executor: typing.Optional[ThreadPoolExecutor] = None
+    _closed: bool = False
+
+    def __init__(self, schedule: PollSchedule = PollSchedule(),
+                 max_workers: int = DEFAULT_POLL_MAX_WORKERS,
+                 max_errors: int = DEFAULT_MAX_POLL_ERRORS):
+        self._schedule = schedule
+        self._max_workers = max_workers
+        self._max_errors = max_errors
+        self._queue = []
+        self._sequence = itertools.count()
+        self._lock = threading.Condition()
+
+    @classmethod
+    def from_config(cls, bootstrap_config: SdkBootstrapConfig) \
+            -> 'DagRunPollingEngine':
+        """Return a polling engine configured by the bootstrap config."""
+        return cls(PollSchedule.from_config(bootstrap_config),
+                   bootstrap_config.poll_max_workers)
+
+    def watch(self, dag_run_id: str,
+              get_status: typing.Callable[[str], DagRunResponse]) -> Future:
+        """Start polling a dag run with ``get_status``.
+
+        Returns a future resolving to the run's terminal status, or to the
+        error that made polling give up. Cancelling the future stops
+        polling the run; the run itself is not affected.
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Polling engine is closed.")
+            if self._scheduler is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix="graphgrid-sdk-poll")
+                self._scheduler = threading.Thread(
+                    target=self._schedule_polls,
+                    name="graphgrid-sdk-poll-scheduler", daemon=True)
+                self._scheduler.start()
+            self._enqueue(_PolledRun(dag_run_id, get_status, future))
+        return future
+
+    def close(self):
+        """Stop polling and cancel the futures of all watched runs."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            queue, self._queue = self._queue, []
+            self._lock.notify_all()
+
+        for _, _, run in queue:
+            run.future.cancel()
+        if self._scheduler is not None:
+            self._scheduler.join()
+            self._executor.shutdown(wait=True)
+
+    def _enqueue(self, run: _PolledRun):
+        """Schedule the next poll of a run. Call with the lock held."""
+        next_poll_at = time.monotonic() + self._schedule.interval(run.polls)
+        heapq.heappush(self._queue,
+                       (next_poll_at, next(self._sequence), run))
+        self._lock.notify()
+
+    def _reschedule(self, run: _PolledRun):
+        with self._lock:
+            if self._closed:
+                run.future.cancel()
+            else:
+                self._enqueue(run)
+
+    def _schedule_polls(self):
+        """Hand runs that are due a poll to the worker pool until closed."""
+        while True:
+            with self._lock:
+                while not self._closed and (
+                        not self._queue
+                        or self._queue[0][0] > time.monotonic()):
+                    self._lock.wait(self._queue[0][0] - time.monotonic()
+                                    if self._queue else None)
+                if self._closed:
+                    return
+
+                now = time.monotonic()
+                due = []
+                while self._queue and self._queue[0][0] <= now:
+                    due.append(heapq.heappop(self._queue)[2])
+
+            for run in due:
+                # runs whose waiters gave up are dropped
+                if not run.future.cancelled():
+                    self._executor.submit(self._poll, run)
+
+    def _poll(self, run: _PolledRun):
+        """Poll a run once, then resolve its future or reschedule it. An
+        error while doing so resolves the future, so its waiter never hangs.
+        """
+        try:
+            self._poll_once(run)
+        # pylint: disable=broad-except
+        except Exception as exception:
+            self._resolve(run, exception=exception)
+
+    def _poll_once(self, run: _PolledRun):
+        """Poll a run once, then resolve its future or reschedule it."""
+        try:
+            status = run.get_status(run.dag_run_id)
+            if status.status_code != 200:
+                raise SdkDagRunException(
+                    f'Polling dag run "{run.dag_run_id}" returned status '
+                    f'{status.status_code}.')
+        except (requests.RequestException, SdkException) as exception:
+            run.errors += 1
+            logger.warning("Polling dag run %s failed (%s/%s).",
+                           run.dag_run_id, run.errors, self._max_errors,
+                           exc_info=True)
+            if run.errors >= self._max_errors:
+                self._resolve(run, exception=exception)
+            else:
+                self._reschedule(run)
+        # pylint: disable=broad-except
+        except Exception as exception:
+            self._resolve(run, exception=exception)
+        else:
+            run.errors = 0
+            if status.state in DAG_TERMINAL_STATES:
+                self._resolve(run, status=status)
+            else:
+                run.polls += 1
+                self._reschedule(run)
+
+    @staticmethod
+    def _resolve(run: _PolledRun, status: DagRunResponse = None,
+                 exception: Exception = None):
+        """Complete a run's future, unless it was cancelled or already
+        completed.
+        """
+        if run.future.done() or not run.future.set_running_or_notify_cancel():
+            return
+        if exception is not None:
+            run.future.set_exception(exception)
+        else:
+            run.future.set_result(status)
@@ -0,0 +1,164 @@
+"""Define retry policies, backoff and the retry budget for sdk requests."""
+import email.utils
+import random
+import threading
+import time
+import typing
+from dataclasses import dataclass
+
+import requests
+
+from graphgrid_sdk.ggcore.sdk_exceptions import SdkTimeoutException
+from graphgrid_sdk.ggcore.sdk_messages import GenericResponse
+from graphgrid_sdk.ggcore.timeouts import current_deadline
+
+# Gateway errors returned by nginx while a service is restarting/overloaded
+RETRYABLE_STATUS_CODES = frozenset({502, 503, 504})
+
+RETRY_AFTER_HEADER_KEY = "Retry-After"
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Define class describing if and how a request may be retried.
+
+    Backoff is capped exponential with full jitter: attempt n sleeps a random
+    time in [0, min(max_delay, base_delay * 2 ** (n - 1))]. A Retry-After
+    header replaces the computed backoff; if it asks for longer than
+    max_delay the request is not retried.
+    """
+    max_attempts: int = 3
+    base_delay: float = 0.2  # in seconds
+    max_delay: float = 10.0  # in seconds
+    retry_on_status: typing.FrozenSet[int] = RETRYABLE_STATUS_CODES
+    retry_on_connection_error: bool = True
+    retry_on_timeout: bool = False
+
+    def is_retryable_response(self, generic_response: GenericResponse) -> bool:
+        """Return whether the response status warrants a retry."""
+        return generic_response.status_code in self.retry_on_status
+
+    def is_retryable_exception(self, exception: Exception) -> bool:
+        """Return whether the raised exception warrants a retry."""
+        if isinstance(exception, SdkTimeoutException):
+            return self.retry_on_timeout
+        return self.retry_on_connection_error \
+            and isinstance(exception, requests.ConnectionError)
+
+    def backoff(self, attempt: int) -> float:
+        """Return the jittered delay in seconds after the given attempt."""
+        cap = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, cap)
+
+
+# Never retry: used for requests that are not safe to repeat
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+# Default policy for idempotent requests
+IDEMPOTENT_RETRY = RetryPolicy()
+
+
+class RetryBudget:
+    """Define class limiting retries to a fraction of overall traffic.
+
+    Every first attempt deposits ``ratio`` tokens and every retry withdraws
+    one, so when a service is degraded retries stay at roughly ``ratio`` of
+    the request rate instead of multiplying it. ``min_tokens`` allows a
+    few retries while traffic is low.
+    """
+    _lock: threading.Lock
+    _tokens: float
+
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 10.0,
+                 max_tokens: float = 100.0):
+        self._ratio = ratio
+        self._max_tokens = max_tokens
+        self._tokens = min_tokens
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        """Record a first attempt, earning retry credit."""
+        with self._lock:
+            self._tokens = min(self._tokens + self._ratio, self._max_tokens)
+
+    def try_acquire(self) -> bool:
+        """Withdraw credit for one retry. Return False if exhausted."""
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+
+def parse_retry_after(generic_response: GenericResponse) \
+        -> typing.Optional[float]:
+    """Return the Retry-After delay of a response in seconds, if any.
+
+    Supports both delay-seconds and HTTP-date values.
+    """
+    headers = generic_response.headers or {}
+    value = headers.get(RETRY_AFTER_HEADER_KEY)
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def _sleep_before_retry(delay: float, policy: RetryPolicy,
+                        budget: RetryBudget) -> bool:
+    """Sleep before the next attempt. Return False, without sleeping, if the
+    retry is not allowed by the policy, the call deadline or the budget.
+    """
+    if delay > policy.max_delay:
+        return False
+
+    deadline = current_deadline()
+    if deadline is not None and delay >= deadline.remaining():
+        return False
+
+    if not budget.try_acquire():
+        return False
+
+    time.sleep(delay)
+    return True
+
+
+def call_with_retry(send: typing.Callable[[], GenericResponse],
+                    policy: RetryPolicy,
+                    budget: RetryBudget) -> GenericResponse:
+    """Call ``send`` and retry it according to the policy and budget.
+
+    Returns the last response. Re-raises the last exception if the final
+    attempt raised.
+    """
+    budget.record_request()
+
+    attempt = 1
+    while True:
+        try:
+            generic_response = send()
+        except (requests.ConnectionError, SdkTimeoutException) as exception:
+            if attempt >= policy.max_attempts \
+                    or not policy.is_retryable_exception(exception) \
+                    or not _sleep_before_retry(policy.backoff(attempt),
+                                               policy, budget):
+                raise
+        else:
+            if attempt >= policy.max_attempts \
+                    or not policy.is_retryable_response(generic_response):
+                return generic_response
+
+            retry_after = parse_retry_after(generic_response)
+            delay = retry_after if retry_after is not None \
+                else policy.backoff(attempt)
+            if not _sleep_before_retry(delay, policy, budget):
+                return generic_response
+
+        attempt += 1
@@ -0,0 +1,261 @@
+"""Define admission control for nlp model training runs."""
+import bisect
+import itertools
+import threading
+import typing
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from graphgrid_sdk.ggcore.config import SdkBootstrapConfig
+from graphgrid_sdk.ggcore.dag_run_handle import DagRunHandle
+from graphgrid_sdk.ggcore.sdk_exceptions import SdkDagRunException
+from graphgrid_sdk.ggcore.sdk_messages import NMTTrainResponse, \
+    TrainRequestBody
+from graphgrid_sdk.ggcore.session import credential_key
+
+Trigger = typing.Callable[[TrainRequestBody, typing.Optional[float]],
+                          NMTTrainResponse]
+Watch = typing.Callable[[str], Future]
+
+
+@dataclass(order=True)
+class _QueuedRun:
+    """Define class for a training run waiting for admission. Runs order by
+    priority, then by submission.
+    """
+    priority: int
+    sequence: int
+    request_body: TrainRequestBody = field(compare=False)
+    timeout: typing.Optional[float] = field(compare=False)
+    future: Future = field(compare=False)
+    trigger: Trigger = field(compare=False)
+    watch: Watch = field(compare=False)
+
+    @property
+    def gpu(self) -> bool:
+        """Return whether the run trains on gpu."""
+        return bool(self.request_body.gpu)
+
+
+def _forward(source: Future, target: Future):
+    """Copy the outcome of a finished future to another future, unless the
+    other future was cancelled.
+    """
+    if not target.set_running_or_notify_cancel():
+        return
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+# pylint: disable=too-many-instance-attributes
+class TrainingScheduler:
+    """Define class admitting training runs under concurrency limits.
+
+    At most ``max_concurrent`` runs, of which at most ``max_concurrent_gpu``
+    train on gpu, are active at once; None means no limit. Waiting runs are
+    admitted by priority (lower first, see ``priorities``), then in
+    submission order. A gpu run waiting for a gpu slot does not hold back
+    cpu runs behind it. A run's slot is freed once its dag run reaches a
+    terminal state.
+
+    Admitted runs are triggered in admission order on a dedicated dispatch
+    thread, so neither submitting callers nor the threads reporting finished
+    runs block on trigger requests or host-wide admission.
+    """
+    _lock: threading.Lock
+    _queue: typing.List[_QueuedRun]
+    _dispatcher: ThreadPoolExecutor
+    _running: int = 0
+    _running_gpu: int = 0
+
+    def __init__(self,
+                 trigger: typing.Optional[Trigger] = None,
+                 watch: typing.Optional[Watch] = None,
+                 max_concurrent: typing.Optional[int] = None,
+                 max_concurrent_gpu: typing.Optional[int] = None,
+                 priorities: typing.Optional[
+                     typing.Mapping[str, int]] = None):
+        self._trigger = trigger
+        self._watch = watch
+        self._max_concurrent = max_concurrent
+        self._max_concurrent_gpu = max_concurrent_gpu
+        self._priorities = dict(priorities or {})
+        self._queue = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._dispatcher = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="graphgrid-sdk-training-dispatch")
+
+    @classmethod
+    def from_config(cls, bootstrap_config: SdkBootstrapConfig,
+                    trigger: typing.Optional[Trigger] = None,
+                    watch: typing.Optional[Watch] = None) \
+            -> 'TrainingScheduler':
+        """Return a scheduler with the limits of the bootstrap config."""
+        return cls(trigger, watch,
+                   bootstrap_config.max_concurrent_training,
+                   bootstrap_config.max_concurrent_gpu_training,
+                   bootstrap_config.training_priorities)
+
+    @property
+    def running(self) -> int:
+        """Return the number of admitted, unfinished runs."""
+        return self._running
+
+    @property
+    def queued(self) -> int:
+        """Return the number of runs waiting for admission."""
+        return len(self._queue)
+
+    def priority(self, request_body: TrainRequestBody) -> int:
+        """Return the configured priority of a run's model."""
+        model = request_body.model
+        return self._priorities.get(getattr(model, "value", model), 0)
+
+    def submit(self, request_body: TrainRequestBody,
+               timeout: typing.Optional[float] = None,
+               priority: typing.Optional[int] = None,
+               trigger: typing.Optional[Trigger] = None,
+               watch: typing.Optional[Watch] = None) -> Future:
+        """Queue a training run, triggered with ``trigger`` and watched with
+        ``watch`` (default: the scheduler's).
+
+        Returns a future resolving to the run's DagRunHandle once it was
+        admitted and triggered. Cancelling the future withdraws a run that
+        has not been admitted yet.
+        """
+        queued_run = _QueuedRun(
+            self.priority(request_body) if priority is None else priority,
+            next(self._sequence), request_body, timeout, Future(),
+            trigger or self._trigger, watch or self._watch)
+        with self._lock:
+            bisect.insort(self._queue, queued_run)
+        self._dispatch()
+        return queued_run.future
+
+    def _has_slot(self, gpu: bool) -> bool:
+        """Return whether a run can be admitted. Call with the lock held."""
+        if self._max_concurrent is not None \
+                and self._running >= self._max_concurrent:
+            return False
+        return not gpu or self._max_concurrent_gpu is None \
+            or self._running_gpu < self._max_concurrent_gpu
+
+    def _admit(self) -> typing.List[_QueuedRun]:
+        """Take the runs that fit the free slots off the queue."""
+        admitted = []
+        with self._lock:
+            waiting = []
+            for queued_run in self._queue:
+                if not self._has_slot(queued_run.gpu):
+                    waiting.append(queued_run)
+                elif queued_run.future.set_running_or_notify_cancel():
+                    self._running += 1
+                    self._running_gpu += queued_run.gpu
+                    admitted.append(queued_run)
+            self._queue = waiting
+        return admitted
+
+    def _free_slot(self, gpu: bool):
+        """Free a run's slot."""
+        with self._lock:
+            self._running -= 1
+            self._running_gpu -= gpu
+
+    def _release(self, gpu: bool):
+        """Free a run's slot and admit the next runs."""
+        self._free_slot(gpu)
+        self._dispatch()
+
+    def _dispatch(self):
+        """Hand the runs that fit the free slots to the dispatch thread."""
+        for queued_run in self._admit():
+            try:
+                self._dispatcher.submit(self._start, queued_run)
+            except RuntimeError as exception:
+                # closed: the run is never started
+                self._free_slot(queued_run.gpu)
+                queued_run.future.set_exception(exception)
+
+    def close(self):
+        """Stop triggering runs. Runs waiting for admission are withdrawn;
+        runs already triggered are not affected.
+        """
+        self._dispatcher.shutdown(wait=False)
+        with self._lock:
+            queue, self._queue = self._queue, []
+        for queued_run in queue:
+            queued_run.future.cancel()
+
+    def _start(self, queued_run: _QueuedRun):
+        """Trigger an admitted run and hold its slot until it finishes."""
+        try:
+            trigger_response = queued_run.trigger(queued_run.request_body,
+                                                  queued_run.timeout)
+            dag_run_id = getattr(trigger_response, "dagRunId", None)
+            run_future = queued_run.watch(dag_run_id) \
+                if dag_run_id is not None else None
+        # pylint: disable=broad-except
+        except Exception as exception:
+            # hand the slot to the next run
+            self._release(queued_run.gpu)
+            queued_run.future.set_exception(exception)
+            return
+
+        if run_future is None:
+            # no run was started
+            self._release(queued_run.gpu)
+            queued_run.future.set_result(DagRunHandle.failed(
+                trigger_response, SdkDagRunException(
+                    f'Unable to trigger training run. Status code: '
+                    f'"{trigger_response.status_code}".')))
+            return
+
+        # the caller may stop waiting on the handle; the slot stays taken
+        # until the run itself finishes
+        handle_future = Future()
+        run_future.add_done_callback(
+            lambda finished: _forward(finished, handle_future))
+        run_future.add_done_callback(
+            lambda _: self._release(queued_run.gpu))
+        queued_run.future.set_result(
+            DagRunHandle(trigger_response, handle_future))
+
+
+class TrainingSchedulerRegistry:
+    """Define process-wide registry sharing one TrainingScheduler per
+    credential, so the training limits hold across every sdk instance and
+    pipeline in a process. The limits are those of the first config seen
+    for a credential.
+    """
+    _schedulers: typing.Dict[typing.Tuple[str, str, str],
+                             TrainingScheduler] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def training_scheduler(cls, bootstrap_config: SdkBootstrapConfig) \
+            -> TrainingScheduler:
+        """Return the shared scheduler for the config's credential. Runs
+        are submitted with the trigger and watch of the submitting sdk.
+        """
+        key = credential_key(bootstrap_config)
+        with cls._lock:
+            training_scheduler = cls._schedulers.get(key)
+            if training_scheduler is None:
+                training_scheduler = TrainingScheduler.from_config(
+                    bootstrap_config)
+                cls._schedulers[key] = training_scheduler
+        return training_scheduler
+
+    @classmethod
+    def clear(cls):
+        """Close and forget all shared schedulers."""
+        with cls._lock:
+            training_schedulers = list(cls._schedulers.values())
+            cls._schedulers.clear()
+        for training_scheduler in training_schedulers:
+            training_scheduler.close()
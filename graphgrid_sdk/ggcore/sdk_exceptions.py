@@ -37,3 +37,23 @@ class SdkUnauthorizedInvalidTokenException(SdkException):
     """Define exception for when a sdk response is 401 Unauthorized
     and current token is invalid (check_token).
     """
+
+
+class SdkTimeoutException(SdkException):
+    """Define exception for when a sdk call exceeds its timeout or
+    deadline.
+    """
+
+
+class SdkCircuitOpenException(SdkException):
+    """Define exception for when a call is rejected because the circuit
+    breaker of its service is open.
+    """
+
+
+class SdkDagRunException(SdkException):
+    """Define exception for when a dag run cannot be triggered or polled."""
+
+
+class SdkPipelineJournalException(SdkException):
+    """Define exception for when a pipeline journal cannot be resumed."""
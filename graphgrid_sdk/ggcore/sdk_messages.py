@@ -2,7 +2,7 @@
 
 import json
 import typing
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import requests
 
@@ -17,12 +17,14 @@ class GenericResponse:
     status_code: int
     response: str
     exception: requests.RequestException
+    headers: typing.Mapping[str, str]
 
     def __init__(self, status_code=None, response=None,
-                 exception=None):
+                 exception=None, headers=None):
         self.status_code = status_code
         self.response = response
         self.exception = exception
+        self.headers = headers if headers is not None else {}
 
 
 # pylint: disable=too-few-public-methods
@@ -72,6 +74,9 @@ class SdkServiceRequest:
     _query_params: dict = {}
     _body: dict = {}
 
+    # RetryPolicy from the API definition. None means no retries.
+    _retry_policy = None
+
     @property
     def url(self):
         return self._url
@@ -128,6 +133,14 @@ class SdkServiceRequest:
     def query_params(self, value):
         self._query_params = value
 
+    @property
+    def retry_policy(self):
+        return self._retry_policy
+
+    @retry_policy.setter
+    def retry_policy(self, value):
+        self._retry_policy = value
+
     def add_header(self, header_key, value, overwrite=True):
         if overwrite or (header_key not in self._headers):
             self._headers[header_key] = value
@@ -341,8 +354,65 @@ class GetActiveModelResponse(SdkServiceResponse):
             self.trainedModelData = TrainedModelData(**loaded.get('trainedModelData'))
 
 
+# pylint: disable=invalid-name
+@dataclass
+class ModelOutcome:
+    """Define class representing what happened to one model of a NMT train
+    pipeline.
+    """
+    model: str
+    dagRunId: typing.Optional[str] = None
+    state: typing.Optional[str] = None
+    promoted: bool = False
+    promotedModelName: typing.Optional[str] = None
+    detail: typing.Optional[str] = None
+
+
 @dataclass
 class NMTTrainPipelineResponse:
-    """Define class representing a NMT train pipeline call response."""
+    """Define class representing a NMT train pipeline call response.
+    ``modelOutcomes`` holds one outcome per model, in the order the models
+    were given.
+    """
     modelStatusList: list
     promotedModelList: list
+    modelOutcomes: typing.List[ModelOutcome] = field(default_factory=list)
+
+
+# pylint: disable=invalid-name
+@dataclass
+class DatasetTrainResult:
+    """Define class representing one dataset of an upload and train
+    pipeline. ``index`` is the position of the dataset in the stream.
+    """
+    index: int
+    filename: typing.Optional[str]
+    datasetId: typing.Optional[str] = None
+    pipelineResponse: typing.Optional[NMTTrainPipelineResponse] = None
+    detail: typing.Optional[str] = None
+
+
+# pylint: disable=invalid-name
+@dataclass
+class SweepRunResult:
+    """Define class representing one finished training run of a NMT train
+    sweep. ``index`` is the position of its request body in the sweep.
+    """
+    index: int
+    requestBody: TrainRequestBody
+    dagRunId: typing.Optional[str] = None
+    state: typing.Optional[str] = None
+    status: typing.Optional[NMTStatusResponse] = None
+    detail: typing.Optional[str] = None
+
+
+@dataclass
+class NMTTrainSweepResponse:
+    """Define class representing a NMT train sweep call response.
+    ``runResults`` holds one result per request body, in sweep order, and
+    ``taskOutcomes`` the best run of each task, in order of first
+    appearance.
+    """
+    runResults: typing.List[SweepRunResult]
+    taskOutcomes: typing.List[ModelOutcome]
+    promotedModelList: list
@@ -1,6 +1,9 @@
 """Define classes for request auth and building auth headers."""
 
 import base64
+import functools
+import types
+import typing
 from dataclasses import dataclass
 
 from graphgrid_sdk.ggcore.config import SdkBootstrapConfig
@@ -53,17 +56,29 @@ class BearerAuth(RequestAuth):
         return BEARER_HEADER_KEY
 
 
+@functools.lru_cache(maxsize=16)
+def _cached_bearer_header(token: str) -> typing.Mapping[str, str]:
+    """Return the read-only bearer auth header for a token."""
+    return types.MappingProxyType(BearerAuth(token).get_auth_header())
+
+
 class SdkAuthHeaderBuilder:
     """Define class to get specific auth headers based on security
     config.
+
+    Headers are built as read-only mappings. Basic headers are not cached
+    here, so encoded secrets are only kept by the clients using them. Bearer
+    headers are cached per token, so a refreshed token can never be sent
+    with a stale header.
     """
 
     @classmethod
-    def get_basic_header(cls, conf: SdkBootstrapConfig) -> dict:
+    def get_basic_header(cls, conf: SdkBootstrapConfig) \
+            -> typing.Mapping[str, str]:
         """Return the basic auth for the provided security config."""
-        return BasicAuth(conf).get_auth_header()
+        return types.MappingProxyType(BasicAuth(conf).get_auth_header())
 
     @classmethod
-    def get_bearer_header(cls, token: str) -> dict:
+    def get_bearer_header(cls, token: str) -> typing.Mapping[str, str]:
         """Return the bearer auth for the provided security config."""
-        return BearerAuth(token).get_auth_header()
+        return _cached_bearer_header(token)
@@ -1,44 +1,120 @@
 """Define classes around session tracking and token management."""
+import base64
+import functools
+import hashlib
+import json
+import logging
+import random
+import threading
 import time
 import typing
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 
 # Buffer for token expiration timeout
+from graphgrid_sdk.ggcore.cache import TtlCache
 from graphgrid_sdk.ggcore.sdk_exceptions import \
     SdkInvalidOauthCredentialsException, SdkGetTokenException
+from graphgrid_sdk.ggcore.config import SdkBootstrapConfig
 from graphgrid_sdk.ggcore.sdk_messages import GetTokenResponse, \
     CheckTokenResponse
+from graphgrid_sdk.ggcore.token_cache import FileTokenCache
 
 TIMEOUT_BUFFER_MS = 3000
 
+# Seconds a check token verdict is reused for 401s hitting the same token
+CHECK_TOKEN_CACHE_TTL_S = 5.0
+
+# Background renewer bounds, in seconds
+RENEWER_MIN_DELAY_S = 1.0
+RENEWER_MAX_BACKOFF_S = 30.0
+
+logger = logging.getLogger(__name__)
+
 
 def get_time_in_ms():
     """Return current system time in ms"""
     return time.time_ns() // 1_000_000
 
 
-@dataclass
+def credential_key(bootstrap_config: SdkBootstrapConfig) \
+        -> typing.Tuple[str, str, str]:
+    """Return the key of a config's credential for process-wide registries,
+    holding a hash of its secret rather than the secret itself.
+    """
+    secret_digest = hashlib.sha256(
+        str(bootstrap_config.secret_key).encode("utf-8")).hexdigest()
+    return (bootstrap_config.url_base, bootstrap_config.access_key,
+            secret_digest)
+
+
+@functools.lru_cache(maxsize=32)
+def jwt_expiration_time(token: str) -> typing.Optional[int]:
+    """Return the time (ms) a JWT expires at from its ``exp`` claim, or
+    None if the token is not a JWT or has no expiry.
+    """
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    payload = parts[1] + "=" * (-len(parts[1]) % 4)
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return int(claims["exp"]) * 1000
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+@dataclass(frozen=True)
 class TokenTracker:
-    """Define class to keep track of token information."""
+    """Define class to keep track of token information.
+
+    Trackers are immutable; a refresh swaps in a new tracker, so readers on
+    other threads always see a consistent token and expiry.
+    """
     token: str
     expires_in: int  # in milliseconds
     init_time: int = get_time_in_ms()
 
+    @property
+    def expiration_time(self) -> int:
+        """Return the time (ms) the token expires at."""
+        return self.init_time + self.expires_in
+
+    def is_expired(self) -> bool:
+        """Return whether the token has expired or is about to."""
+        return self.expiration_time - get_time_in_ms() <= TIMEOUT_BUFFER_MS
+
 
 class TokenFactory:
-    """Define class to dynamically call for a token."""
+    """Define class to dynamically call for a token.
+
+    Safe to share between threads: refreshes are single-flight, so while one
+    caller fetches a new token the others wait for it, or keep using the
+    current token if it has not actually expired yet.
+    """
     _token_supplier: typing.Callable[[], GetTokenResponse]
     _token_checker: typing.Callable[[], CheckTokenResponse]
 
     _token_tracker: TokenTracker = None
+    _token_cache: typing.Optional[FileTokenCache] = None
+    _check_token_cache: TtlCache
+    _refresh_lock: threading.Lock
+
+    _renewer: typing.Optional['TokenRenewer'] = None
 
-    def __init__(self, token_supp, token_checker):
+    def __init__(self, token_supp, token_checker,
+                 token_cache: typing.Optional[FileTokenCache] = None):
         self._token_supplier = token_supp
         self._token_checker = token_checker
+        self._token_cache = token_cache
+        self._check_token_cache = TtlCache(CHECK_TOKEN_CACHE_TTL_S)
+        self._refresh_lock = threading.Lock()
 
-    def call_get_token(self):
-        """Execute call to get a new token and populate the TokenTracker."""
-        get_token_response = self._token_supplier()
+    def call_get_token(self, token_supplier: typing.Optional[
+            typing.Callable[[], GetTokenResponse]] = None):
+        """Execute call to get a new token and populate the TokenTracker.
+        ``token_supplier`` makes the call instead of the factory's supplier.
+        """
+        get_token_response = (token_supplier or self._token_supplier)()
 
         # 200 OK
         if get_token_response.status_code == 200:
@@ -63,35 +139,376 @@ class TokenFactory:
 
         return self._token_tracker
 
-    def call_check_token(self) -> CheckTokenResponse:
-        """Execute call to check token and return response."""
-        return self._token_checker()
+    def call_check_token(self, token: typing.Optional[str] = None,
+                         token_checker: typing.Optional[typing.Callable[
+                             [str], CheckTokenResponse]] = None) \
+            -> CheckTokenResponse:
+        """Execute call to check a token (default: the current token) and
+        return response. ``token_checker`` makes the call instead of the
+        factory's checker.
+
+        Verdicts are cached briefly per token, and concurrent checks of the
+        same token share one call.
+        """
+        if token is None:
+            token = self.get_current_token()
+        token_checker = token_checker or self._token_checker
+        return self._check_token_cache.get_or_load(
+            token, lambda: token_checker(token),
+            cache_if=lambda response: response.status_code in (200, 400))
+
+    def is_token_known_invalid(self, token: str) -> bool:
+        """Return whether a token is invalid without asking the security
+        service: it was already replaced, or it expired according to its
+        tracked lifetime or its JWT ``exp`` claim.
+        """
+        token_tracker = self._token_tracker
+        if token_tracker is None or token_tracker.token != token:
+            return True
+
+        now = get_time_in_ms()
+        if token_tracker.expiration_time <= now:
+            return True
+
+        jwt_expiration = jwt_expiration_time(token)
+        return jwt_expiration is not None and jwt_expiration <= now
+
+    @property
+    def token_tracker(self) -> typing.Optional[TokenTracker]:
+        """Return the tracker of the current token, if any."""
+        return self._token_tracker
 
     def get_current_token(self) -> str:
         """Get token from the current TokenTracker."""
-        return self._token_tracker.token if self.is_token_present() else ""
+        token_tracker = self._token_tracker
+        return token_tracker.token if token_tracker is not None \
+            and token_tracker.token is not None else ""
 
     def is_token_expired(self) -> bool:
         """Return whether current token has expired."""
-        expiration_time = (self._token_tracker.init_time
-                           + self._token_tracker.expires_in)
-        return expiration_time - get_time_in_ms() <= TIMEOUT_BUFFER_MS
+        return self._token_tracker.is_expired()
 
     def is_token_present(self) -> bool:
         """Return whether there currently is a token."""
-        return self._token_tracker is not None \
-               and self._token_tracker.token is not None
+        return self.get_current_token() != ""
 
     def is_token_ready(self) -> bool:
         """Return whether the token is ready for use."""
         return self.is_token_present() and not self.is_token_expired()
 
-    def refresh_token(self, force_refresh=False) -> str:
+    def is_token_usable(self) -> bool:
+        """Return whether the token can still be sent: it is present and
+        has not actually expired, though it may be inside the refresh buffer.
+        """
+        token_tracker = self._token_tracker
+        return self.is_token_present() \
+            and token_tracker.expiration_time > get_time_in_ms()
+
+    def refresh_token(self, force_refresh=False,
+                      stale_token: typing.Optional[str] = None,
+                      token_supplier: typing.Optional[
+                          typing.Callable[[], GetTokenResponse]] = None) \
+            -> str:
         """Define method that conditionally refreshes the stored token.
         Returns the current token.
+
+        Only one caller refreshes at a time. A forced refresh with a
+        ``stale_token`` is skipped if another caller already replaced that
+        token. ``token_supplier`` gets the token instead of the factory's
+        supplier, so a shared factory can fetch on the caller's connections.
         """
-        if force_refresh or not self.is_token_ready():
-            # request new token
-            self.call_get_token()
+        if not force_refresh and self.is_token_ready():
+            return self.get_current_token()
+
+        if not force_refresh and self.is_token_usable() \
+                and self._refresh_lock.locked():
+            # inside the expiry buffer while someone else refreshes: keep
+            # using the still-valid token
+            return self.get_current_token()
+
+        with self._refresh_lock:
+            if force_refresh:
+                if stale_token is None \
+                        or self.get_current_token() == stale_token:
+                    # request new token
+                    self._fetch_token(self.get_current_token(),
+                                      token_supplier)
+            elif not self.is_token_ready():
+                # request new token, unless refreshed while waiting
+                self._fetch_token(token_supplier=token_supplier)
 
         return self.get_current_token()
+
+    def _fetch_token(self, rejected_token: typing.Optional[str] = None,
+                     token_supplier: typing.Optional[
+                         typing.Callable[[], GetTokenResponse]] = None):
+        """Replace the token, reusing one from the token cache if another
+        process already fetched a fresh one. ``rejected_token`` is never
+        reused.
+        """
+        if self._token_cache is None:
+            self.call_get_token(token_supplier)
+            return
+
+        with self._token_cache.locked():
+            cached_tracker = self._read_cached_token()
+            if cached_tracker is not None \
+                    and cached_tracker.token != rejected_token \
+                    and not cached_tracker.is_expired():
+                self._token_tracker = cached_tracker
+                return
+
+            token_tracker = self.call_get_token(token_supplier)
+            self._token_cache.write(asdict(token_tracker))
+
+    def _read_cached_token(self) -> typing.Optional[TokenTracker]:
+        """Return the tracker stored in the token cache, if valid."""
+        entry = self._token_cache.read()
+        try:
+            return TokenTracker(str(entry["token"]),
+                                int(entry["expires_in"]),
+                                int(entry["init_time"]))
+        except (TypeError, KeyError, ValueError):
+            return None
+
+    @property
+    def renewer_running(self) -> bool:
+        """Return whether the background renewer is running."""
+        return self._renewer is not None and self._renewer.running
+
+    @property
+    def renewer_failures(self) -> int:
+        """Return consecutive failed background renewals. While failing,
+        callers fall back to refreshing on the request path.
+        """
+        return self._renewer.failures if self._renewer is not None else 0
+
+    def start_renewer(self, renewal_fraction: float = 0.75,
+                      jitter_fraction: float = 0.1,
+                      token_supplier: typing.Optional[
+                          typing.Callable[[], GetTokenResponse]] = None):
+        """Start renewing the token in the background, with
+        ``token_supplier`` (default: the factory's supplier).
+
+        The token is renewed once ``renewal_fraction`` of its lifetime has
+        passed, shifted by a random +/- ``jitter_fraction`` of the lifetime
+        so processes sharing a credential do not renew in lockstep. The old
+        token stays in use until the new one is swapped in. Calling this
+        while the renewer runs does nothing.
+        """
+        with self._refresh_lock:
+            if self.renewer_running:
+                return
+            self._renewer = TokenRenewer(self, renewal_fraction,
+                                         jitter_fraction, token_supplier)
+            self._renewer.start()
+
+    def stop_renewer(self):
+        """Stop the background renewer, if running."""
+        renewer = self._renewer
+        if renewer is not None:
+            renewer.stop()
+
+
+class TokenRenewer:
+    """Define class renewing the token of a TokenFactory in a background
+    thread. Failures back off and leave the request path to refresh lazily.
+    """
+    _thread: typing.Optional[threading.Thread] = None
+    _failures: int = 0
+
+    def __init__(self, token_factory: TokenFactory, renewal_fraction: float,
+                 jitter_fraction: float,
+                 token_supplier: typing.Optional[
+                     typing.Callable[[], GetTokenResponse]] = None):
+        self._token_factory = token_factory
+        self._renewal_fraction = renewal_fraction
+        self._jitter_fraction = jitter_fraction
+        self._token_supplier = token_supplier
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        """Return whether the renewer thread is running."""
+        return self._thread is not None and self._thread.is_alive() \
+            and not self._stop.is_set()
+
+    @property
+    def failures(self) -> int:
+        """Return consecutive failed renewals."""
+        return self._failures
+
+    def start(self):
+        """Start the renewer thread."""
+        self._thread = threading.Thread(
+            target=self._renew_loop, name="graphgrid-sdk-token-renewer",
+            daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the renewer thread and wait for it, unless called from it."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _next_renewal_delay(self) -> float:
+        """Return seconds until the current token should be renewed."""
+        token_tracker = self._token_factory.token_tracker
+        if token_tracker is None or not self._token_factory.is_token_present():
+            # nothing to renew yet: fetch one now
+            return 0.0
+
+        offset = token_tracker.expires_in * (
+            self._renewal_fraction
+            + random.uniform(-self._jitter_fraction, self._jitter_fraction))
+        renew_at = token_tracker.init_time + offset
+        return max((renew_at - get_time_in_ms()) / 1000, RENEWER_MIN_DELAY_S)
+
+    def _renew_loop(self):
+        """Renew the token until stopped."""
+        while True:
+            if self._failures:
+                delay = min(2 ** self._failures, RENEWER_MAX_BACKOFF_S)
+            else:
+                delay = self._next_renewal_delay()
+            if self._stop.wait(delay):
+                return
+
+            stale_token = self._token_factory.get_current_token()
+            try:
+                # skipped if the request path already replaced the token
+                self._token_factory.refresh_token(
+                    force_refresh=bool(stale_token),
+                    stale_token=stale_token or None,
+                    token_supplier=self._token_supplier)
+                self._failures = 0
+            # pylint: disable=broad-except
+            except Exception:
+                self._failures += 1
+                logger.warning("Background token renewal failed.",
+                               exc_info=True)
+
+
+class TokenRegistry:
+    """Define process-wide registry sharing one TokenFactory per credential.
+
+    Every client and pipeline using the same url_base, access key and secret
+    key shares a single token, so a process pays for one token request per
+    credential rather than one per client object. Clients get and check the
+    shared token over their own connections.
+
+    Sdk instances hold the token of their credential while open. The
+    background renewer, if enabled, runs while the token is held and fetches
+    over the connections of one of its holders.
+    """
+    _factories: typing.Dict[typing.Tuple[str, str, str], TokenFactory] = {}
+    # token suppliers of the sdk instances holding each credential's token
+    _holders: typing.Dict[typing.Tuple[str, str, str],
+                          typing.List[typing.Callable[[], GetTokenResponse]]] \
+        = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def token_factory(cls, bootstrap_config: SdkBootstrapConfig,
+                      token_supp, token_checker) -> TokenFactory:
+        """Return the shared TokenFactory for the config's credential,
+        creating it from the given supplier and checker on first use.
+        """
+        if bootstrap_config is None:
+            # nothing to share without a credential
+            return TokenFactory(token_supp, token_checker)
+
+        key = credential_key(bootstrap_config)
+        with cls._lock:
+            return cls._shared_factory(key, bootstrap_config, token_supp,
+                                       token_checker)
+
+    @classmethod
+    def _shared_factory(cls, key: typing.Tuple[str, str, str],
+                        bootstrap_config: SdkBootstrapConfig, token_supp,
+                        token_checker) -> TokenFactory:
+        """Return the shared TokenFactory for a key, creating it on first
+        use. Call with the lock held.
+        """
+        token_factory = cls._factories.get(key)
+        if token_factory is None:
+            token_factory = TokenFactory(token_supp, token_checker,
+                                         cls._token_cache(bootstrap_config))
+            cls._factories[key] = token_factory
+        return token_factory
+
+    @classmethod
+    def hold(cls, bootstrap_config: SdkBootstrapConfig, token_supp,
+             token_checker) -> TokenFactory:
+        """Hold the shared token of the config's credential for an sdk
+        instance fetching with ``token_supp``, and return its factory.
+
+        Starts the background renewer if the config enables it. Every hold
+        must be matched by a release.
+        """
+        if bootstrap_config is None:
+            return TokenFactory(token_supp, token_checker)
+
+        key = credential_key(bootstrap_config)
+        with cls._lock:
+            token_factory = cls._shared_factory(key, bootstrap_config,
+                                                token_supp, token_checker)
+            holders = cls._holders.setdefault(key, [])
+            holders.append(token_supp)
+            if bootstrap_config.token_renewal_fraction is not None:
+                token_factory.start_renewer(
+                    bootstrap_config.token_renewal_fraction,
+                    bootstrap_config.token_renewal_jitter, holders[0])
+        return token_factory
+
+    @classmethod
+    def release(cls, bootstrap_config: SdkBootstrapConfig, token_supp):
+        """Release a hold on the shared token of the config's credential.
+
+        The background renewer stops once the last holder released the
+        token, and moves to the connections of a remaining holder if it was
+        fetching over the releasing one's.
+        """
+        if bootstrap_config is None:
+            return
+
+        key = credential_key(bootstrap_config)
+        with cls._lock:
+            holders = cls._holders.get(key, [])
+            if token_supp not in holders:
+                return
+            renewing_holder = holders[0]
+            holders.remove(token_supp)
+            if not holders:
+                del cls._holders[key]
+            token_factory = cls._factories.get(key)
+            if token_factory is None or token_supp != renewing_holder:
+                return
+
+            token_factory.stop_renewer()
+            if holders and bootstrap_config.token_renewal_fraction is not None:
+                token_factory.start_renewer(
+                    bootstrap_config.token_renewal_fraction,
+                    bootstrap_config.token_renewal_jitter, holders[0])
+
+    @staticmethod
+    def _token_cache(bootstrap_config: SdkBootstrapConfig) \
+            -> typing.Optional[FileTokenCache]:
+        """Return the token cache configured for the credential, if any."""
+        if bootstrap_config.token_cache_dir is None:
+            return None
+        return FileTokenCache(bootstrap_config.token_cache_dir,
+                              (bootstrap_config.url_base,
+                               bootstrap_config.access_key,
+                               bootstrap_config.secret_key))
+
+    @classmethod
+    def clear(cls):
+        """Stop renewers and forget all shared token factories and holds."""
+        with cls._lock:
+            token_factories = list(cls._factories.values())
+            cls._factories.clear()
+            cls._holders.clear()
+        for token_factory in token_factories:
+            token_factory.stop_renewer()
@@ -0,0 +1,220 @@
+"""Define nmt train sweeps: training grids of request bodies."""
+import functools
+import itertools
+import queue
+import threading
+import typing
+from concurrent.futures import Future
+
+from graphgrid_sdk.ggcore.model_ranking import ModelRanker
+from graphgrid_sdk.ggcore.nmt_train_pipeline import NmtTrainPipeline
+from graphgrid_sdk.ggcore.polling import DagRunPollingEngine
+from graphgrid_sdk.ggcore.scheduler import TrainingSchedulerRegistry
+from graphgrid_sdk.ggcore.sdk_messages import TrainRequestBody, \
+    SweepRunResult, NMTTrainSweepResponse, ModelOutcome
+from graphgrid_sdk.ggcore.utils import NlpModel, DAG_STATE_SUCCESS
+
+
+def train_request_grid(models: typing.Iterable[NlpModel],
+                       dataset_ids: typing.Iterable[str],
+                       no_cache: typing.Optional[bool] = None,
+                       gpu: typing.Optional[bool] = None) \
+        -> typing.List[TrainRequestBody]:
+    """Return a request body for every combination of model and dataset,
+    grouped by model.
+    """
+    return [TrainRequestBody(model=model, dataset_id=dataset_id,
+                             no_cache=no_cache, gpu=gpu)
+            for model, dataset_id in itertools.product(models, dataset_ids)]
+
+
+class _SweepSlots:
+    """Define class submitting the runs of one sweep to a training
+    scheduler, at most ``limit`` at a time. The next run is submitted as
+    soon as one finishes or fails to start.
+    """
+
+    def __init__(self, submit: typing.Callable[[int], Future],
+                 count: int, limit: int):
+        self._submit = submit
+        self._waiting = iter(range(count))
+        self._limit = limit
+        self._lock = threading.Lock()
+        self._closed = False
+        self.handle_futures: typing.List[Future] = []
+
+    def start(self):
+        """Submit the first runs, up to the limit."""
+        for _ in range(self._limit):
+            self._submit_next()
+
+    def close(self):
+        """Stop submitting runs and withdraw the submitted runs that were
+        not triggered yet.
+        """
+        with self._lock:
+            self._closed = True
+        for handle_future in self.handle_futures:
+            handle_future.cancel()
+
+    def _submit_next(self):
+        """Submit the next run, if any, and free its slot once it ends."""
+        with self._lock:
+            index = None if self._closed else next(self._waiting, None)
+            if index is None:
+                return
+            handle_future = self._submit(index)
+            self.handle_futures.append(handle_future)
+        handle_future.add_done_callback(self._on_started)
+
+    def _on_started(self, handle_future: Future):
+        """Free the slot of a run that did not start, or once it
+        finishes.
+        """
+        if handle_future.cancelled() or handle_future.exception() is not None:
+            self._submit_next()
+        else:
+            handle_future.result().future.add_done_callback(
+                lambda _: self._submit_next())
+
+
+class NmtTrainSweep(NmtTrainPipeline):
+    """Define class training a grid of request bodies and selecting the
+    best run per task.
+
+    Runs are admitted by the process-wide training scheduler, like every
+    other training run of the process. On top of its limits, at most
+    ``max_concurrent`` runs of a sweep train at once; the next run is
+    submitted as soon as one finishes.
+    """
+
+    def stream(self, request_bodies: typing.Iterable[TrainRequestBody],
+               max_concurrent: typing.Optional[int] = None) \
+            -> typing.Iterator[SweepRunResult]:
+        """Train every request body and yield each run's result as soon as
+        it finishes. Runs that were not triggered yet when the iterator is
+        closed are withdrawn.
+        """
+        request_bodies = list(request_bodies)
+        polling_engine = self._polling_engine \
+            or DagRunPollingEngine.from_config(self._configuration)
+        training_scheduler = self._training_scheduler \
+            or TrainingSchedulerRegistry.training_scheduler(
+                self._configuration)
+        finished_runs = queue.Queue()
+
+        def submit(index: int) -> Future:
+            handle_future = training_scheduler.submit(
+                request_bodies[index], trigger=self._nlp_client.trigger_nmt,
+                watch=lambda dag_run_id: polling_engine.watch(
+                    dag_run_id, self._nlp_client.get_nmt_status))
+            handle_future.add_done_callback(functools.partial(
+                self._on_job_started, index, finished_runs, None))
+            return handle_future
+
+        slots = _SweepSlots(
+            submit, len(request_bodies),
+            max_concurrent or self._configuration.sweep_max_concurrent)
+        try:
+            slots.start()
+            for _ in request_bodies:
+                i, status_future = finished_runs.get()
+                yield self._run_result(i, request_bodies[i],
+                                       status_future)
+        finally:
+            slots.close()
+            if polling_engine is not self._polling_engine:
+                polling_engine.close()
+
+    def _run_result(self, index: int, request_body: TrainRequestBody,
+                    status_future: Future) -> SweepRunResult:
+        """Return the result of a finished run, recording it in the metrics
+        store.
+        """
+        result = SweepRunResult(index, request_body)
+        try:
+            model_status = status_future.result()
+        # pylint: disable=broad-except
+        except Exception as exception:
+            result.detail = \
+                f"training could not be started or polled: {exception}"
+            return result
+
+        result.dagRunId = getattr(model_status, "dagRunId", None)
+        result.state = model_status.state
+        result.status = model_status
+        if result.state != DAG_STATE_SUCCESS:
+            result.detail = "training failed"
+        if self._metrics_store is not None and result.dagRunId is not None:
+            model = request_body.model
+            self._metrics_store.record_run(getattr(model, "value", model),
+                                           model_status,
+                                           request_body.dataset_id)
+        return result
+
+    def run(self, request_bodies: typing.Iterable[TrainRequestBody],
+            max_concurrent: typing.Optional[int] = None,
+            autopromote: bool = False,
+            result_handler: typing.Optional[
+                typing.Callable[[SweepRunResult], None]] = None) \
+            -> NMTTrainSweepResponse:
+        """Train every request body, calling ``result_handler`` with each
+        run's result as soon as it finishes. Then select the best successful
+        run of each task and, with ``autopromote``, promote it if it beats the
+        task's active model.
+        """
+        run_results = []
+        for result in self.stream(request_bodies, max_concurrent):
+            run_results.append(result)
+            if result_handler is not None:
+                result_handler(result)
+        run_results.sort(key=lambda result: result.index)
+
+        print("Sweep training has finished.")
+
+        results_by_task: typing.Dict[str, typing.List[SweepRunResult]] = {}
+        for result in run_results:
+            model = result.requestBody.model
+            results_by_task.setdefault(getattr(model, "value", model),
+                                       []).append(result)
+        task_outcomes = [self._select_best(task, results, autopromote)
+                         for task, results in results_by_task.items()]
+
+        promoted_models = [outcome.promotedModelName
+                           for outcome in task_outcomes if outcome.promoted]
+        if autopromote:
+            print("Model promotion is complete.")
+        return NMTTrainSweepResponse(run_results, task_outcomes, promoted_models)
+
+    def _select_best(self, task: str, results: typing.List[SweepRunResult],
+                     autopromote: bool) -> ModelOutcome:
+        """Return the outcome of the best successful run of a task,
+        promoting it if enabled and better than the active model.
+        """
+        outcome = ModelOutcome(task)
+        succeeded = [result for result in results
+                     if result.state == DAG_STATE_SUCCESS]
+        if not succeeded:
+            outcome.detail = "no training run succeeded"
+            return outcome
+
+        model = succeeded[0].requestBody.model
+        candidates = [result.status for result in succeeded]
+        # ranked and confirmed against the active model like pipeline runs
+        promotion = self._select_promotion(model, candidates) \
+            if autopromote else None
+        best_status = promotion if promotion is not None \
+            else ModelRanker().rank(candidates, None)[0].candidate
+        best = next(result for result in succeeded
+                    if result.status is best_status)
+        outcome.dagRunId = best.dagRunId
+        outcome.state = best.state
+        if not autopromote:
+            outcome.detail = "best run"
+        elif promotion is None:
+            outcome.detail = "active model is better"
+        else:
+            outcome.promotedModelName, outcome.detail = self._promote(
+                model, best.status, best.requestBody.dataset_id)
+            outcome.promoted = outcome.promotedModelName is not None
+        return outcome
@@ -0,0 +1,82 @@
+"""Define deadline tracking shared by every step of a sdk call."""
+import contextlib
+import contextvars
+import time
+import typing
+
+from graphgrid_sdk.ggcore.sdk_exceptions import SdkTimeoutException
+
+# Deadline of the sdk call currently executing in this context
+_current_deadline: contextvars.ContextVar = contextvars.ContextVar(
+    "graphgrid_sdk_deadline", default=None)
+
+
+class Deadline:
+    """Define class representing a point in time a sdk call must finish by."""
+    _expires_at: float
+
+    def __init__(self, timeout: float):
+        self._expires_at = time.monotonic() + timeout
+
+    def remaining(self) -> float:
+        """Return seconds left before the deadline (never negative)."""
+        return max(self._expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        """Return whether the deadline has passed."""
+        return self.remaining() <= 0.0
+
+    def check(self) -> float:
+        """Raise SdkTimeoutException if the deadline has passed, otherwise
+        return the seconds remaining.
+        """
+        remaining = self.remaining()
+        if remaining <= 0.0:
+            raise SdkTimeoutException("Sdk call exceeded its deadline.")
+        return remaining
+
+
+def current_deadline() -> typing.Optional[Deadline]:
+    """Return the deadline of the sdk call running in this context."""
+    return _current_deadline.get()
+
+
+@contextlib.contextmanager
+def deadline_scope(timeout: typing.Optional[float]):
+    """Bound everything run inside the scope by ``timeout`` seconds.
+
+    Nested scopes can only shorten an enclosing deadline. A timeout of None
+    keeps the enclosing deadline, if any.
+    """
+    outer = current_deadline()
+    if timeout is None:
+        yield outer
+        return
+
+    deadline = Deadline(timeout)
+    if outer is not None and outer.remaining() < deadline.remaining():
+        deadline = outer
+
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def request_timeout(connect_timeout: typing.Optional[float],
+                    read_timeout: typing.Optional[float]
+                    ) -> typing.Tuple[typing.Optional[float],
+                                      typing.Optional[float]]:
+    """Return the (connect, read) timeout for the next http request, clipped
+    to the current deadline.
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return connect_timeout, read_timeout
+
+    remaining = deadline.check()
+    return (remaining if connect_timeout is None
+            else min(connect_timeout, remaining),
+            remaining if read_timeout is None
+            else min(read_timeout, remaining))
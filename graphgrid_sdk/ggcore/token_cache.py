@@ -0,0 +1,95 @@
+"""Define an on-disk token cache shared between processes."""
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import typing
+
+try:
+    import fcntl
+except ImportError:  # not available on windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+@contextlib.contextmanager
+def file_lock(lock_path: str):
+    """Hold an advisory lock on a file, shared by the processes of a host
+    (where the platform supports it).
+    """
+    lock_fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        # closing the descriptor releases the lock
+        os.close(lock_fd)
+
+
+class FileTokenCache:
+    """Define class caching the token of one credential in a file.
+
+    Processes using the same credential and cache directory reuse each
+    other's tokens instead of each requesting their own. The file is named
+    after a hash of the credential and only readable by its owner; token
+    requests are serialized across processes with an advisory file lock
+    (where the platform supports it). Cache errors never fail a call, they
+    only cost a token request.
+    """
+
+    def __init__(self, cache_dir: str, credential: typing.Iterable[str]):
+        digest = hashlib.sha256(
+            "\0".join(credential).encode("utf-8")).hexdigest()
+        self._cache_dir = cache_dir
+        self._path = os.path.join(cache_dir, f"{digest}.json")
+        self._lock_path = f"{self._path}.lock"
+
+    @property
+    def path(self) -> str:
+        """Return the path of the cache file."""
+        return self._path
+
+    def _ensure_dir(self):
+        os.makedirs(self._cache_dir, mode=0o700, exist_ok=True)
+
+    @contextlib.contextmanager
+    def locked(self):
+        """Hold the cross-process lock for this credential."""
+        with contextlib.ExitStack() as stack:
+            try:
+                self._ensure_dir()
+                stack.enter_context(file_lock(self._lock_path))
+            except OSError:
+                logger.warning("Unable to open token cache lock %s.",
+                               self._lock_path, exc_info=True)
+            yield
+
+    def read(self) -> typing.Optional[dict]:
+        """Return the cached token entry, or None if missing or unreadable."""
+        try:
+            with open(self._path, encoding="utf-8") as cache_file:
+                entry = json.load(cache_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable token cache %s.", self._path,
+                           exc_info=True)
+            return None
+        return entry if isinstance(entry, dict) else None
+
+    def write(self, entry: dict):
+        """Atomically replace the cached token entry."""
+        tmp_path = f"{self._path}.{os.getpid()}.tmp"
+        try:
+            self._ensure_dir()
+            tmp_fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                             0o600)
+            with os.fdopen(tmp_fd, "w", encoding="utf-8") as cache_file:
+                json.dump(entry, cache_file)
+            os.replace(tmp_path, self._path)
+        except OSError:
+            logger.warning("Unable to write token cache %s.", self._path,
+                           exc_info=True)
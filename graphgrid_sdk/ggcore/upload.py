@@ -0,0 +1,48 @@
+"""Define chunked streaming of dataset uploads."""
+import typing
+from dataclasses import dataclass
+
+
+# pylint: disable=invalid-name
+@dataclass(frozen=True)
+class UploadProgress:
+    """Define class representing how much of a dataset has been sent."""
+    bytesSent: int
+    recordsSent: int
+
+
+ProgressCallback = typing.Callable[[UploadProgress], None]
+
+
+def chunked(lines: typing.Iterable[typing.Union[str, bytes]],
+            chunk_size: typing.Optional[int],
+            progress_callback: typing.Optional[ProgressCallback] = None) \
+        -> typing.Iterator[bytes]:
+    """Yield the utf-8 encoded ``lines`` coalesced into chunks of at least
+    ``chunk_size`` bytes, the last chunk possibly shorter. None yields every
+    line as its own chunk.
+
+    Lines are pulled only as chunks are consumed, so at most one chunk is
+    buffered. ``progress_callback`` is called once each chunk was consumed,
+    i.e. sent, with the totals sent so far.
+    """
+    buffer = bytearray()
+    records = 0
+    bytes_sent = 0
+    for line in lines:
+        buffer += line.encode("utf-8") if isinstance(line, str) else line
+        records += 1
+        if chunk_size is not None and len(buffer) < chunk_size:
+            continue
+        chunk = bytes(buffer)
+        buffer.clear()
+        yield chunk
+        bytes_sent += len(chunk)
+        if progress_callback is not None:
+            progress_callback(UploadProgress(bytes_sent, records))
+
+    if buffer:
+        yield bytes(buffer)
+        bytes_sent += len(buffer)
+        if progress_callback is not None:
+            progress_callback(UploadProgress(bytes_sent, records))
@@ -72,6 +72,11 @@ COREFERENCE_RESOLUTION = "coreference_resolution"
 TRANSLATION = "translation"
 RELATION_EXTRACTION = "relation_extraction"
 
+# DAG RUN STATES
+DAG_STATE_SUCCESS = "success"
+DAG_STATE_FAILED = "failed"
+DAG_TERMINAL_STATES = frozenset({DAG_STATE_SUCCESS, DAG_STATE_FAILED})
+
 
 class NlpModel(str, enum.Enum):
     """Define NLP models"""
@@ -83,4 +88,3 @@ class NlpModel(str, enum.Enum):
     COREFERENCE_RESOLUTION = COREFERENCE_RESOLUTION
     TRANSLATION = TRANSLATION
     RELATION_EXTRACTION = RELATION_EXTRACTION
-
@@ -0,0 +1,167 @@
+"""Define user-facing asyncio GraphGrid SDK."""
+import typing
+
+from graphgrid_sdk.ggcore.async_client import DatasetGenerator
+from graphgrid_sdk.ggcore.async_core import AsyncSdkCore
+from graphgrid_sdk.ggcore.config import SdkBootstrapConfig
+from graphgrid_sdk.ggcore.sdk_messages import TestApiResponse, \
+    SaveDatasetResponse, GetDataResponse, PromoteModelResponse, \
+    DagRunResponse, NMTTrainResponse, NMTStatusResponse, TrainRequestBody
+from graphgrid_sdk.ggcore.upload import ProgressCallback
+from graphgrid_sdk.ggsdk.bootstrap import bootstrap_config_from_file
+
+
+class AsyncGraphGridSdk:
+    """Initialize the async SDK Core for SDK calls. Expose those SDK calls as
+    awaitable user-callable methods.
+
+    One instance is safe to share between any number of concurrent
+    coroutines. Release its resources with close() or by using it as an
+    async context manager.
+    """
+    _core: AsyncSdkCore
+    _config: SdkBootstrapConfig
+
+    def __init__(self, bootstrap_config: SdkBootstrapConfig = None,
+                 max_workers: typing.Optional[int] = None):
+        if bootstrap_config is None:
+            bootstrap_config: SdkBootstrapConfig = bootstrap_config_from_file()
+
+        self._config = bootstrap_config
+        self._core = AsyncSdkCore(self._config, max_workers)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Close the SDK's executor and pooled connections."""
+        self._core.close()
+
+    async def test_api(self,
+                       message: str = None,
+                       timeout: typing.Optional[float] = None
+                       ) -> TestApiResponse:
+        """Call test api.
+
+        :param message:  The test message that is both send and received
+        :param timeout: Optional deadline in seconds for the whole call
+            (default=SdkBootstrapConfig.call_timeout)
+        """
+        return await self._core.test_api(message, timeout)
+
+    async def save_dataset(self,
+                           data_generator: DatasetGenerator,
+                           filename: str = None,
+                           timeout: typing.Optional[float] = None,
+                           progress_callback: typing.Optional[
+                               ProgressCallback] = None
+                           ) -> SaveDatasetResponse:
+        """Call save dataset api.
+
+        :param data_generator:  The generator or async generator providing
+            dataset lines
+        :param filename:  filename for the dataset (default=None)
+        :param timeout: Optional deadline in seconds for the whole call
+            (default=SdkBootstrapConfig.call_timeout)
+        :param progress_callback: Optional callable receiving an
+            UploadProgress after each sent chunk, called from the thread
+            sending the request
+        """
+        return await self._core.save_dataset(data_generator, filename,
+                                             timeout, progress_callback)
+
+    async def promote_model(self, model_name: str,
+                            environment: str = "default",
+                            timeout: typing.Optional[float] = None
+                            ) -> PromoteModelResponse:
+        """Call promote model api.
+
+        :param model_name: Name of the model to promote within cloud storage
+        :param environment: The config environment of the param to
+            persist (default=default)
+        :param timeout: Optional deadline in seconds for the whole call
+            (default=SdkBootstrapConfig.call_timeout)
+        """
+        return await self._core.promote_model(model_name, environment,
+                                              timeout)
+
+    async def get_data(self, module: str,
+                       profiles: typing.Union[str, typing.List[str]],
+                       revision: str,
+                       timeout: typing.Optional[float] = None
+                       ) -> GetDataResponse:
+        """Call get data api.
+
+        :param module: Name of the module for the spring param path, e.g., nlp
+        :param profiles: List or string for the module's profile, e.g., test
+        :param revision: The revision for the associated param path, e.g., 2.0
+        :param timeout: Optional deadline in seconds for the whole call
+            (default=SdkBootstrapConfig.call_timeout)
+        """
+        return await self._core.get_data(module, profiles, revision, timeout)
+
+    async def job_status(self, dag_id: str,
+                         dag_run_id: str,
+                         timeout: typing.Optional[float] = None
+                         ) -> DagRunResponse:
+        """Call for the job (DAGRun) status
+
+        :param dag_id: The name or id of the DAG
+        :param dag_run_id: The unique id for the DAG run.
+        :param timeout: Optional deadline in seconds for the whole call
+            (default=SdkBootstrapConfig.call_timeout)
+        """
+        return await self._core.get_dag_status(dag_id, dag_run_id, timeout)
+
+    async def job_run(self, dag_id: str,
+                      request_body: dict,
+                      timeout: typing.Optional[float] = None
+                      ) -> DagRunResponse:
+        """Call DAG to start the DAGRun
+
+        :param dag_id: The name or id of the DAG
+        :param request_body: Config values to be used in DAG run.
+        :param timeout: Optional deadline in seconds for the whole call
+            (default=SdkBootstrapConfig.call_timeout)
+        """
+        return await self._core.trigger_dag(dag_id, request_body, timeout)
+
+    async def nmt_status(self, dag_run_id: str,
+                         timeout: typing.Optional[float] = None
+                         ) -> NMTStatusResponse:
+        """Call to get NMT DAG run status/results
+
+        :param dag_run_id: The unique id for the DAG run.
+        :param timeout: Optional deadline in seconds for the whole call
+            (default=SdkBootstrapConfig.call_timeout)
+        """
+        return await self._core.get_nmt_status(dag_run_id, timeout)
+
+    async def nmt_train(self,
+                        request_body: TrainRequestBody,
+                        timeout: typing.Optional[float] = None,
+                        deduplicate: bool = True
+                        ) -> NMTTrainResponse:
+        """Call to start trigger NMT DAG
+
+        :param request_body: Training config.
+        :param timeout: Optional deadline in seconds for the whole call
+            (default=SdkBootstrapConfig.call_timeout)
+        :param deduplicate: Reuse a recently triggered or succeeded run of an
+            identical request instead of triggering a new one, if
+            SdkBootstrapConfig.training_dedup_ttl is set (default=True)
+        """
+        return await self._core.nmt_train(request_body, timeout, deduplicate)
+
+    async def get_active_model(self, nlp_task: str,
+                               timeout: typing.Optional[float] = None):
+        """Call to get active model api.
+
+        :param nlp_task: The associated NLP task for the desired model
+        :param timeout: Optional deadline in seconds for the whole call
+            (default=SdkBootstrapConfig.call_timeout)
+        """
+        return await self._core.get_active_model(nlp_task, timeout)
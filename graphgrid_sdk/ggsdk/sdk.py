@@ -1,13 +1,18 @@
 """Define user-facing GraphGrid SDK."""
 import typing
+from concurrent.futures import Executor, Future
 
 from graphgrid_sdk.ggcore.config import SdkBootstrapConfig
 from graphgrid_sdk.ggcore.core import SdkCore
+from graphgrid_sdk.ggcore.dag_run_handle import DagRunHandle
 from graphgrid_sdk.ggcore.nmt_train_pipeline import NmtTrainPipeline
 from graphgrid_sdk.ggcore.sdk_messages import TestApiResponse, \
     SaveDatasetResponse, GetDataResponse, PromoteModelResponse, \
     DagRunResponse, NMTTrainResponse, NMTStatusResponse, TrainRequestBody, \
-    NMTTrainPipelineResponse
+    NMTTrainPipelineResponse, NMTTrainSweepResponse, SweepRunResult, \
+    DatasetTrainResult
+from graphgrid_sdk.ggcore.sweep import NmtTrainSweep
+from graphgrid_sdk.ggcore.upload import ProgressCallback
 from graphgrid_sdk.ggcore.utils import NlpModel
 from graphgrid_sdk.ggsdk.bootstrap import bootstrap_config_from_file
 
@@ -15,6 +20,9 @@ from graphgrid_sdk.ggsdk.bootstrap import bootstrap_config_from_file
 class GraphGridSdk:
     """Initialize the SDK Core for SDK calls. Expose those SDK calls as
     user-callable methods.
+
+    The SDK holds pooled keep-alive connections; release them with close()
+    or by using the SDK as a context manager.
     """
     _core: SdkCore
     _config: SdkBootstrapConfig
@@ -26,83 +34,177 @@ class GraphGridSdk:
         self._config = bootstrap_config
         self._core = SdkCore(self._config)
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Stop waiting on submitted runs and close the SDK's pooled
+        connections.
+        """
+        self._core.close()
+
     def test_api(self,
-                 message: str = None) -> TestApiResponse:
+                 message: str = None,
+                 timeout: typing.Optional[float] = None) -> TestApiResponse:
         """Call test api.
 
         :param message:  The test message that is both send and received
+        :param timeout: Optional deadline in seconds for the whole call
+            (default=SdkBootstrapConfig.call_timeout)
         """
-        return self._core.test_api(message)
+        return self._core.test_api(message, timeout)
 
     def save_dataset(self,
                      data_generator: typing.Generator,
-                     filename: str = None) -> SaveDatasetResponse:
+                     filename: str = None,
+                     timeout: typing.Optional[float] = None,
+                     progress_callback: typing.Optional[
+                         ProgressCallback] = None
+                     ) -> SaveDatasetResponse:
         """Call save dataset api.
 
         :param data_generator:  The generator providing dataset lines
         :param filename:  filename for the dataset (default=None)
             exists (default=False)
+        :param timeout: Optional deadline in seconds for the whole call
+            (default=SdkBootstrapConfig.call_timeout)
+        :param progress_callback: Optional callable receiving an
+            UploadProgress (bytes and lines sent so far) after each sent
+            chunk
         """
-        return self._core.save_dataset(data_generator, filename)
+        return self._core.save_dataset(data_generator, filename, timeout,
+                                       progress_callback)
 
     def promote_model(self, model_name: str,
-                      environment: str = "default") -> PromoteModelResponse:
+                      environment: str = "default",
+                      timeout: typing.Optional[float] = None
+                      ) -> PromoteModelResponse:
         """Call promote model api.
 
         :param model_name: Name of the model to promote within cloud storage
         :param environment: The config environment of the param to
             persist (default=default)
+        :param timeout: Optional deadline in seconds for the whole call
+            (default=SdkBootstrapConfig.call_timeout)
         """
-        return self._core.promote_model(model_name, environment)
+        return self._core.promote_model(model_name, environment, timeout)
 
     def get_data(self, module: str,
                  profiles: typing.Union[str, typing.List[str]],
-                 revision: str) -> GetDataResponse:
+                 revision: str,
+                 timeout: typing.Optional[float] = None) -> GetDataResponse:
         """Call get data api.
 
         :param module: Name of the module for the spring param path, e.g., nlp
         :param profiles: List or string for the module's profile, e.g., test
         :param revision: The revision for the associated param path, e.g., 2.0
+        :param timeout: Optional deadline in seconds for the whole call
+            (default=SdkBootstrapConfig.call_timeout)
         """
-        return self._core.get_data(module, profiles, revision)
+        return self._core.get_data(module, profiles, revision, timeout)
 
     def job_status(self, dag_id: str,
-                   dag_run_id: str) -> DagRunResponse:
+                   dag_run_id: str,
+                   timeout: typing.Optional[float] = None) -> DagRunResponse:
         """Call for the job (DAGRun) status
 
         :param dag_id: The name or id of the DAG
         :param dag_run_id: The unique id for the DAG run.
+        :param timeout: Optional deadline in seconds for the whole call
+            (default=SdkBootstrapConfig.call_timeout)
         """
-        return self._core.get_dag_status(dag_id, dag_run_id)
+        return self._core.get_dag_status(dag_id, dag_run_id, timeout)
 
-    def job_run(self, dag_id: str, request_body: dict) -> DagRunResponse:
+    def job_run(self, dag_id: str, request_body: dict,
+                timeout: typing.Optional[float] = None) -> DagRunResponse:
         """Call DAG to start the DAGRun
 
         :param dag_id: The name or id of the DAG
         :param request_body: Config values to be used in DAG run.
+        :param timeout: Optional deadline in seconds for the whole call
+            (default=SdkBootstrapConfig.call_timeout)
+        """
+        return self._core.trigger_dag(dag_id, request_body, timeout)
+
+    def submit_job_run(self, dag_id: str, request_body: dict,
+                       timeout: typing.Optional[float] = None
+                       ) -> DagRunHandle:
+        """Call DAG to start the DAGRun and return a handle that resolves to
+        the run's final status.
+
+        :param dag_id: The name or id of the DAG
+        :param request_body: Config values to be used in DAG run.
+        :param timeout: Optional deadline in seconds for the trigger call
+            (default=SdkBootstrapConfig.call_timeout)
         """
-        return self._core.trigger_dag(dag_id, request_body)
+        return self._core.submit_dag(dag_id, request_body, timeout)
 
-    def nmt_status(self, dag_run_id: str) -> NMTStatusResponse:
+    def nmt_status(self, dag_run_id: str,
+                   timeout: typing.Optional[float] = None
+                   ) -> NMTStatusResponse:
         """Call to get NMT DAG run status/results
 
         :param dag_run_id: The unique id for the DAG run.
+        :param timeout: Optional deadline in seconds for the whole call
+            (default=SdkBootstrapConfig.call_timeout)
         """
-        return self._core.get_nmt_status(dag_run_id)
+        return self._core.get_nmt_status(dag_run_id, timeout)
 
-    def nmt_train(self, request_body: TrainRequestBody) -> NMTTrainResponse:
+    def nmt_train(self, request_body: TrainRequestBody,
+                  timeout: typing.Optional[float] = None,
+                  deduplicate: bool = True) -> NMTTrainResponse:
         """Call to start trigger NMT DAG
 
         :param request_body: Training config.
+        :param timeout: Optional deadline in seconds for the whole call
+            (default=SdkBootstrapConfig.call_timeout)
+        :param deduplicate: Reuse a recently triggered or succeeded run of an
+            identical request instead of triggering a new one, if
+            SdkBootstrapConfig.training_dedup_ttl is set (default=True)
         """
-        return self._core.nmt_train(request_body)
+        return self._core.nmt_train(request_body, timeout, deduplicate)
 
-    def get_active_model(self, nlp_task: str):
+    def submit_nmt_train(self, request_body: TrainRequestBody,
+                         timeout: typing.Optional[float] = None
+                         ) -> DagRunHandle:
+        """Call to start trigger NMT DAG and return a handle that resolves to
+        the run's final NMT status/results. Waits until the training
+        scheduler admits the run.
+
+        :param request_body: Training config.
+        :param timeout: Optional deadline in seconds for the trigger call
+            (default=SdkBootstrapConfig.call_timeout)
+        """
+        return self._core.submit_nmt_train(request_body, timeout)
+
+    def schedule_nmt_train(self, request_body: TrainRequestBody,
+                           timeout: typing.Optional[float] = None,
+                           priority: typing.Optional[int] = None) -> Future:
+        """Queue NMT DAG trigger on the training scheduler without waiting.
+
+        Returns a future resolving to the run's DagRunHandle once it was
+        admitted and triggered; cancel it to withdraw a queued run.
+
+        :param request_body: Training config.
+        :param timeout: Optional deadline in seconds for the trigger call
+            (default=SdkBootstrapConfig.call_timeout)
+        :param priority: Optional admission priority, lower first
+            (default=SdkBootstrapConfig.training_priorities)
+        """
+        return self._core.schedule_nmt_train(request_body, timeout, priority)
+
+    def get_active_model(self, nlp_task: str,
+                         timeout: typing.Optional[float] = None):
         """Call to get active model api.
 
         :param nlp_task: The associated NLP task for the desired model
+        :param timeout: Optional deadline in seconds for the whole call
+            (default=SdkBootstrapConfig.call_timeout)
         """
-        return self._core.get_active_model(nlp_task)
+        return self._core.get_active_model(nlp_task, timeout)
 
     def nmt_train_pipeline(self, models_to_train: typing.List[NlpModel],
                            dataset_id: str,
@@ -111,18 +213,142 @@ class GraphGridSdk:
                            autopromote: bool,
                            success_handler: typing.Optional[callable],
                            failed_handler: typing.Optional[
-                               callable]) -> NMTTrainPipelineResponse:
-        """Call to start training pipeline: kicks off and monitors training for specified tasks, then promotes
+                               callable],
+                           executor: typing.Optional[Executor] = None,
+                           journal_path: typing.Optional[str] = None
+                           ) -> NMTTrainPipelineResponse:
+        """Call to start training pipeline: kicks off and monitors training
+        for specified tasks, then promotes
 
         :param models_to_train: List of models to train.
         :param dataset_id: Dataset to train on.
         :param no_cache: Flag to prevent caching (defaults to False)
         :param gpu: Flag to enable GPU usage (defaults to False)
-        :param autopromote: Flag to enable automatic promotion on successfully trained models.
-        :param success_handler: Optional callable to run on a successful training.
+        :param autopromote: Flag to enable automatic promotion on
+            successfully trained models.
+        :param success_handler: Optional callable to run on a successful
+            training.
         :param failed_handler: Optional callable to run on a failed training.
+        :param executor: Optional executor running each model's handler and
+            promotion as soon as its training finishes (default=a thread pool
+            for the call)
+        :param journal_path: Optional file to journal the pipeline's progress
+            to, for ``resume_pipeline``
+        """
+        return self._pipeline().nmt_train_pipeline(
+            models_to_train, dataset_id, no_cache, gpu, autopromote,
+            success_handler, failed_handler, executor, journal_path)
+
+    def resume_pipeline(self, journal_path: str,
+                        success_handler: typing.Optional[callable] = None,
+                        failed_handler: typing.Optional[callable] = None,
+                        executor: typing.Optional[Executor] = None
+                        ) -> NMTTrainPipelineResponse:
+        """Call to resume a training pipeline from its journal: reattaches
+        to running training without triggering it again, trains models that
+        were never triggered, then evaluates and promotes models whose
+        promotion was not yet journaled.
+
+        :param journal_path: Journal written by ``nmt_train_pipeline``.
+        :param success_handler: Optional callable to run on a successful
+            training.
+        :param failed_handler: Optional callable to run on a failed training.
+        :param executor: Optional executor running each model's handler and
+            promotion as soon as its training finishes (default=a thread pool
+            for the call)
+        """
+        return self._pipeline().resume_pipeline(journal_path, success_handler,
+                                                failed_handler, executor)
+
+    # pylint: disable=too-many-arguments
+    def upload_train_pipeline(self,
+                              datasets: typing.Iterable[typing.Tuple[
+                                  typing.Generator, typing.Optional[str]]],
+                              models_to_train: typing.List[NlpModel],
+                              no_cache: typing.Optional[bool],
+                              gpu: typing.Optional[bool],
+                              autopromote: bool,
+                              success_handler: typing.Optional[
+                                  callable] = None,
+                              failed_handler: typing.Optional[
+                                  callable] = None,
+                              executor: typing.Optional[Executor] = None,
+                              max_pending_uploads: int = 1
+                              ) -> typing.List[DatasetTrainResult]:
+        """Call to upload a stream of datasets and run the training
+        pipeline on each: dataset N+1 uploads while dataset N trains
+
+        :param datasets: Iterable of ``(data_generator, filename)`` pairs;
+            filename may be None.
+        :param models_to_train: List of models to train on every dataset.
+        :param no_cache: Flag to prevent caching (defaults to False)
+        :param gpu: Flag to enable GPU usage (defaults to False)
+        :param autopromote: Flag to enable automatic promotion on
+            successfully trained models.
+        :param success_handler: Optional callable to run on a successful
+            training.
+        :param failed_handler: Optional callable to run on a failed training.
+        :param executor: Optional executor running each model's handler and
+            promotion as soon as its training finishes (default=a thread pool
+            per dataset)
+        :param max_pending_uploads: Max uploaded datasets waiting for
+            training before uploads pause (default=1)
+        """
+        return self._pipeline().upload_train_pipeline(
+            datasets, models_to_train, no_cache, gpu, autopromote,
+            success_handler, failed_handler, executor, max_pending_uploads)
+
+    def nmt_train_sweep(self,
+                        request_bodies: typing.Iterable[TrainRequestBody],
+                        max_concurrent: typing.Optional[int] = None,
+                        autopromote: bool = False,
+                        result_handler: typing.Optional[
+                            typing.Callable[[SweepRunResult], None]] = None
+                        ) -> NMTTrainSweepResponse:
+        """Call to start a training sweep: trains every request body with
+        bounded concurrency, then selects the best run per task and
+        optionally promotes it
+
+        :param request_bodies: Training configs to sweep, e.g. from
+            ``train_request_grid``.
+        :param max_concurrent: Optional max runs training at once
+            (default=SdkBootstrapConfig.sweep_max_concurrent)
+        :param autopromote: Flag to promote each task's best run if it beats
+            the task's active model.
+        :param result_handler: Optional callable to run on each run's result
+            as soon as the run finishes.
+        """
+        return self._sweep().run(request_bodies, max_concurrent, autopromote,
+                                 result_handler)
+
+    def stream_nmt_train_sweep(self,
+                               request_bodies: typing.Iterable[
+                                   TrainRequestBody],
+                               max_concurrent: typing.Optional[int] = None
+                               ) -> typing.Iterator[SweepRunResult]:
+        """Call to train every request body with bounded concurrency,
+        yielding each run's result as soon as the run finishes. Closing the
+        iterator withdraws runs not triggered yet.
+
+        :param request_bodies: Training configs to sweep, e.g. from
+            ``train_request_grid``.
+        :param max_concurrent: Optional max runs training at once
+            (default=SdkBootstrapConfig.sweep_max_concurrent)
+        """
+        return self._sweep().stream(request_bodies, max_concurrent)
+
+    def _sweep(self) -> NmtTrainSweep:
+        """Return a training sweep sharing this sdk's connections, polling
+        and scheduling.
+        """
+        return NmtTrainSweep(self._config, self._core.http_client,
+                             self._core.polling_engine,
+                             self._core.training_scheduler)
+
+    def _pipeline(self) -> NmtTrainPipeline:
+        """Return a training pipeline sharing this sdk's connections,
+        polling and scheduling.
         """
-        pipeline = NmtTrainPipeline(self._config)
-        return pipeline.nmt_train_pipeline(models_to_train, dataset_id, no_cache,
-                                           gpu, autopromote, success_handler,
-                                           failed_handler)
+        return NmtTrainPipeline(self._config, self._core.http_client,
+                                self._core.polling_engine,
+                                self._core.training_scheduler)
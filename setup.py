@@ -21,13 +21,13 @@ setup(
     long_description_content_type="text/markdown",
     classifiers=[
         "Development Status :: 5 - Production/Stable",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
     ],
     install_requires=[
         "requests~=2.27.1",
         "javaproperties~=0.8.1",
+        "numpy>=1.19",
     ],
-    python_requires="!=3.9.*, >=3.6",
+    python_requires="!=3.9.*, >=3.7",
 )
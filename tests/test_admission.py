@@ -0,0 +1,144 @@
+"""Define test classes for host-wide admission control of dag runs."""
+import dataclasses
+import json
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+import responses
+
+from graphgrid_sdk import ggcore
+from graphgrid_sdk.ggcore.admission import FileSlotSemaphore
+from graphgrid_sdk.ggcore.api import NlpApi
+from graphgrid_sdk.ggcore.client import NlpClient
+from graphgrid_sdk.ggcore.sdk_exceptions import SdkTimeoutException
+from graphgrid_sdk.ggcore.session import TokenTracker
+from graphgrid_sdk.ggcore.utils import NMT_DAG_ID
+from tests.test_base import TestBase, TestBootstrapBase
+
+
+class TestFileSlotSemaphore(TestBase):
+    """Define test class for grouping file slot semaphore tests."""
+
+    def setUp(self):
+        super().setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def _semaphore(self, limit=2, lease_timeout=60.0) -> FileSlotSemaphore:
+        return FileSlotSemaphore(self.temp_dir.name, limit, lease_timeout,
+                                 poll_interval=0.01)
+
+    def test_file_slot_semaphore__limit_and_release(self):
+        """Test that slots are shared through the directory and freed once
+        a bound run is released.
+        """
+        first, second = self._semaphore(), self._semaphore()
+        first.acquire().bind("dag", "run-1")
+        lease = second.acquire()
+        assert first.try_acquire() is None
+        assert second.in_flight() == 2
+
+        # a pending lease handed back frees its slot
+        lease.cancel()
+        first.try_acquire().bind("dag", "run-2")
+        assert second.release("dag", "run-1")
+        assert not second.release("dag", "run-1")
+        assert first.in_flight() == 1
+
+    def test_file_slot_semaphore__acquire_honours_deadline(self):
+        """Test that waiting for a slot gives up at the call deadline."""
+        semaphore = self._semaphore(limit=1)
+        semaphore.acquire()
+
+        with ggcore.timeouts.deadline_scope(0.05):
+            with self.assertRaises(SdkTimeoutException):
+                semaphore.acquire()
+
+    def test_file_slot_semaphore__stale_leases(self):
+        """Test that expired leases and pending leases of dead processes
+        stop counting against the limit.
+        """
+        semaphore = self._semaphore(limit=2, lease_timeout=60.0)
+        semaphore.acquire().bind("dag", "old-run")
+        expired = time.time() - 120
+        os.utime(semaphore.run_lease_path("dag", "old-run"),
+                 (expired, expired))
+
+        dead_lease = os.path.join(self.temp_dir.name,
+                                  "pending-999999999-abc.lease")
+        with open(dead_lease, "x", encoding="utf-8"):
+            pass
+
+        assert semaphore.in_flight() == 0
+        assert not os.path.exists(dead_lease)
+
+    def test_file_slot_semaphore__renew_and_rebind(self):
+        """Test that renewing keeps a polled run's lease from expiring, and
+        that a lease which cannot be moved on bind is created afresh.
+        """
+        semaphore = self._semaphore(limit=2, lease_timeout=60.0)
+        semaphore.acquire().bind("dag", "polled-run")
+        expired = time.time() - 120
+        os.utime(semaphore.run_lease_path("dag", "polled-run"),
+                 (expired, expired))
+        assert semaphore.renew("dag", "polled-run")
+        assert not semaphore.renew("dag", "unknown-run")
+
+        lease = semaphore.acquire()
+        with patch("os.replace", side_effect=FileNotFoundError):
+            lease.bind("dag", "moved-run")
+        assert lease.path == semaphore.run_lease_path("dag", "moved-run")
+        assert semaphore.in_flight() == 2
+
+
+class TestNlpClientAdmission(TestBootstrapBase):
+    """Define test class for admission control of nlp client triggers."""
+
+    @responses.activate  # mock responses
+    @patch.object(ggcore.session.TokenFactory, "_token_tracker",
+                  TokenTracker(TestBase.TEST_TOKEN, 10_000))
+    def test_nlp_client__trigger_dag__admission(self):
+        """Test that a triggered run holds a slot until a status call sees
+        it finish, and that a failed trigger frees its slot.
+        """
+        with tempfile.TemporaryDirectory() as admission_dir:
+            config = dataclasses.replace(self._test_bootstrap_config,
+                                         admission_dir=admission_dir,
+                                         admission_limit=1)
+            nlp_client = NlpClient(config)
+            request_body = {"test_key": "test_value"}
+            trigger_url = f'http://localhost/1.0/nlp/' \
+                          f'{NlpApi.trigger_dag_api("a_dag", request_body).endpoint()}'
+            status_url = f'http://localhost/1.0/nlp/' \
+                         f'{NlpApi.get_dag_run_status_api("a_dag", "run-1").endpoint()}'
+            responses.add(responses.POST, trigger_url, status=500,
+                          json={})
+            responses.add(responses.POST, trigger_url, status=200,
+                          json={"dagRunId": "run-1", "state": "queued"})
+            responses.add(responses.GET, status_url, status=200,
+                          body=json.dumps({"dagRunId": "run-1",
+                                           "state": "running"}))
+            responses.add(responses.GET, status_url, status=200,
+                          body=json.dumps({"dagRunId": "run-1",
+                                           "state": "success"}))
+
+            nlp_client.trigger_dag("a_dag", request_body)
+            assert nlp_client.admission.in_flight() == 0
+
+            nlp_client.trigger_dag("a_dag", request_body)
+            assert nlp_client.admission.in_flight() == 1
+            with self.assertRaises(SdkTimeoutException):
+                nlp_client.trigger_dag("a_dag", request_body, timeout=0.05)
+
+            # a status call on a run in flight renews its slot
+            run_lease = nlp_client.admission.run_lease_path("a_dag", "run-1")
+            expired = time.time() - 120
+            os.utime(run_lease, (expired, expired))
+            nlp_client.get_dag_run_status("a_dag", "run-1")
+            assert os.path.getmtime(run_lease) > expired + 60
+
+            nlp_client.get_dag_run_status("a_dag", "run-1")
+            assert nlp_client.admission.in_flight() == 0
+            assert not nlp_client.admission.release(NMT_DAG_ID, "run-1")
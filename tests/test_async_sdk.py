@@ -0,0 +1,133 @@
+"""Define test classes for testing user-facing async sdk calls."""
+import asyncio
+import json
+from unittest.mock import patch
+
+import responses
+
+from graphgrid_sdk.ggcore.api import ConfigApi, NlpApi, SecurityApi
+from graphgrid_sdk.ggcore.sdk_exceptions import SdkTimeoutException
+from graphgrid_sdk.ggcore.sdk_messages import TestApiResponse, \
+    GenericResponse, NMTStatusResponse, SaveDatasetResponse
+from graphgrid_sdk.ggcore.session import TokenTracker, TokenFactory
+from graphgrid_sdk.ggcore.utils import RequestAuthType
+from graphgrid_sdk.ggsdk.async_sdk import AsyncGraphGridSdk
+from tests.test_base import TestBootstrapBase, TestBase
+
+
+class TestAsyncSdkBase(TestBootstrapBase):
+    """Define test base specifically for high-level async sdk calls."""
+
+
+class TestAsyncSdkCalls(TestAsyncSdkBase):
+    """Define test class for awaitable sdk calls."""
+
+    @responses.activate  # mock responses
+    @patch.object(TokenFactory, "_token_tracker",
+                  TokenTracker(TestBase.TEST_TOKEN, 10_000))
+    def test_async_sdk_call__test_api__200(self):
+        """Test async TestApi call when response is 200 OK."""
+        expected_message = "pass me back and forth"
+        json_body = {"content": expected_message}
+
+        responses.add(responses.GET,
+                      f'http://localhost/1.0/config/'
+                      f'{ConfigApi.test_api().endpoint()}',
+                      json=json_body, status=200)
+
+        expected_response = TestApiResponse(
+            GenericResponse(200, json.dumps(json_body), None))
+
+        async def run():
+            async with AsyncGraphGridSdk(self._test_bootstrap_config) as sdk:
+                return await sdk.test_api(expected_message)
+
+        assert asyncio.run(run()) == expected_response
+
+    @responses.activate  # mock responses
+    @patch.object(TokenFactory, "_token_tracker",
+                  TokenTracker(TestBase.TEST_TOKEN, 10_000))
+    def test_async_sdk_call__save_dataset__async_generator(self):
+        """Test async SaveDataset call streams an async generator."""
+        filename = "any_dataset"
+        expected_response_dict = {"datasetId": filename}
+        lines = [json.dumps({"line": i}) + "\n" for i in range(3)]
+
+        sent_lines = []
+
+        def consume_body(request):
+            # consume the streamed body while the event loop is running
+            sent_lines.extend(line if isinstance(line, str) else line.decode()
+                              for line in request.body)
+            return 200, {}, json.dumps(expected_response_dict)
+
+        responses.add_callback(
+            responses.POST,
+            f'http://localhost/1.0/nlp/'
+            f'{NlpApi.save_dataset_api(None, filename).endpoint()}',
+            callback=consume_body)
+
+        async def data_generator():
+            for line in lines:
+                await asyncio.sleep(0)
+                yield line
+
+        async def run():
+            async with AsyncGraphGridSdk(self._test_bootstrap_config) as sdk:
+                return await sdk.save_dataset(data_generator(), filename)
+
+        actual_response: SaveDatasetResponse = asyncio.run(run())
+
+        assert actual_response.dataset_id == filename
+        # lines are coalesced into upload chunks
+        assert "".join(sent_lines) == "".join(lines)
+
+
+    @patch.object(TokenFactory, "_token_tracker",
+                  TokenTracker(TestBase.TEST_TOKEN, 10_000))
+    def test_async_sdk_call__expired_deadline__raises(self):
+        """Test async call with an exhausted deadline raises
+        SdkTimeoutException.
+        """
+
+        async def run():
+            async with AsyncGraphGridSdk(self._test_bootstrap_config) as sdk:
+                return await sdk.nmt_status("any-run", timeout=0)
+
+        self.assertRaises(SdkTimeoutException, asyncio.run, run())
+
+
+class TestAsyncSdkConcurrency(TestAsyncSdkBase):
+    """Define test class for async sdk behavior under concurrency."""
+
+    @responses.activate  # mock responses
+    def test_async_sdk__concurrent_calls__single_token_fetch(self):
+        """Test that concurrent coroutines share a single token refresh."""
+        dag_run_id = "manual__2022-03-28T16:02:45.526226+00:00"
+        token_url = f'http://localhost/1.0/security/' \
+                    f'{SecurityApi.get_token_api().endpoint()}'
+
+        responses.add(responses.POST, token_url,
+                      json={"access_token": TestBase.TEST_TOKEN,
+                            "token_type": RequestAuthType.BEARER.value,
+                            "expires_in": 10_000,
+                            "createdAt": "2022-04-01T19:48:47.647Z"},
+                      status=200)
+        responses.add(responses.GET,
+                      f'http://localhost/1.0/nlp/'
+                      f'{NlpApi.nmt_status_api(dag_run_id).endpoint()}',
+                      json={"dagRunId": dag_run_id, "state": "running"},
+                      status=200)
+
+        async def run():
+            async with AsyncGraphGridSdk(self._test_bootstrap_config) as sdk:
+                return await asyncio.gather(
+                    *(sdk.nmt_status(dag_run_id) for _ in range(50)))
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(result, NMTStatusResponse)
+                   and result.state == "running" for result in results)
+        token_calls = [call for call in responses.calls
+                       if call.request.url.startswith(token_url)]
+        assert len(token_calls) == 1
@@ -3,6 +3,9 @@ import os
 from unittest import TestCase
 
 from graphgrid_sdk.ggcore.config import SdkBootstrapConfig
+from graphgrid_sdk.ggcore.dedup import TrainingRunRegistry
+from graphgrid_sdk.ggcore.scheduler import TrainingSchedulerRegistry
+from graphgrid_sdk.ggcore.session import TokenRegistry
 
 
 class TestBase(TestCase):
@@ -14,6 +17,13 @@ class TestBase(TestCase):
     TEST_DIR_LOCATION = os.path.realpath(
         os.path.join(os.getcwd(), os.path.dirname(__file__)))
 
+    def setUp(self):
+        # tokens, training runs and training schedulers are shared
+        # process-wide; keep tests independent
+        TokenRegistry.clear()
+        TrainingRunRegistry.clear()
+        TrainingSchedulerRegistry.clear()
+
 
 class TestBootstrapBase(TestBase):
     """Define base for tests that contains the bootstrap config and test
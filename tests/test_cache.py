@@ -0,0 +1,138 @@
+"""Define test classes for the ttl cache."""
+import threading
+import time
+from unittest.mock import patch
+
+import responses
+
+from graphgrid_sdk import ggcore
+from graphgrid_sdk.ggcore.api import NlpApi
+from graphgrid_sdk.ggcore.cache import TtlCache
+from graphgrid_sdk.ggcore.session import TokenFactory, TokenTracker
+from graphgrid_sdk.ggcore.sdk_messages import CheckTokenResponse, \
+    GenericResponse
+from graphgrid_sdk.ggsdk.sdk import GraphGridSdk
+from tests.test_base import TestBase, TestBootstrapBase
+
+
+class TestTtlCache(TestBase):
+    """Define test class for grouping ttl cache tests."""
+
+    @patch("graphgrid_sdk.ggcore.cache.time.monotonic")
+    def test_ttl_cache__entries_expire(self, mock_monotonic):
+        """Test that entries are served until their ttl has passed."""
+        mock_monotonic.return_value = 100.0
+        cache = TtlCache(ttl=5.0)
+        cache.put("key", "value")
+
+        mock_monotonic.return_value = 104.0
+        assert cache.get("key") == "value"
+        mock_monotonic.return_value = 105.0
+        assert cache.get("key") is None
+
+    # pylint: disable=no-self-use
+    def test_ttl_cache__single_flight_load(self):
+        """Test that concurrent misses of one key share a single load and
+        that rejected values are not cached.
+        """
+        calls = []
+        release = threading.Event()
+
+        def load():
+            calls.append(1)
+            release.wait(5)
+            return len(calls)
+
+        cache = TtlCache(ttl=60.0)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            cache.get_or_load("key", load, cache_if=lambda value: False)))
+            for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert results == [1] * 10
+        assert cache.get("key") is None
+
+    # pylint: disable=no-self-use
+    def test_ttl_cache__evicts_oldest(self):
+        """Test that a full cache evicts its oldest entry."""
+        cache = TtlCache(ttl=60.0, max_size=2)
+        for key in ("a", "b", "c"):
+            cache.put(key, key)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == "b" and cache.get("c") == "c"
+
+    # pylint: disable=no-self-use
+    def test_ttl_cache__invalidated_during_load(self):
+        """Test that a load invalidated before it finished is not cached."""
+        cache = TtlCache(ttl=60.0)
+
+        def load():
+            cache.invalidate()
+            return "outdated"
+
+        assert cache.get_or_load("key", load) == "outdated"
+        assert cache.get("key") is None
+
+
+class TestCheckTokenCache(TestBase):
+    """Define test class for grouping cached check token verdicts."""
+
+    # pylint: disable=no-self-use
+    def test_check_token_cache__burst_checks_once(self):
+        """Test that repeated checks of the same token call check token
+        once, while other tokens are checked separately.
+        """
+        checked = []
+
+        def check(token):
+            checked.append(token)
+            return CheckTokenResponse(GenericResponse(400, "{}"))
+
+        token_factory = TokenFactory(None, check)
+        for _ in range(5):
+            token_factory.call_check_token("token-1")
+        token_factory.call_check_token("token-2")
+
+        assert checked == ["token-1", "token-2"]
+
+
+class TestActiveModelCache(TestBootstrapBase):
+    """Define test class for grouping cached get active model calls."""
+
+    @responses.activate  # mock responses
+    @patch.object(ggcore.session.TokenFactory, "_token_tracker",
+                  TokenTracker(TestBase.TEST_TOKEN, 10_000))
+    def test_get_active_model__cached_until_promote(self):
+        """Test that active models are served from cache until a model is
+        promoted through the same sdk.
+        """
+        active_model_url = f'http://localhost/1.0/nlp/' \
+                           f'{NlpApi.get_active_model_api(nlp_task="some_task").endpoint()}'
+        for model_name in ("old_model", "new_model"):
+            responses.add(responses.GET, active_model_url, status=200,
+                          json={"modelName": model_name, "trainedModelData": {
+                              "modelType": "some_task",
+                              "trainingDataset": [], "trainingAccuracy": None,
+                              "trainingLoss": None, "evalAccuracy": None,
+                              "evalLoss": None, "properties": {},
+                              "location": None, "timestamp": None,
+                              "platformVersion": None}})
+        responses.add(responses.POST,
+                      f'http://localhost/1.0/nlp/'
+                      f'{NlpApi.promote_model_api("new_model", "default").endpoint()}',
+                      json={"modelName": "new_model", "task": "some_task"}, status=200)
+
+        gg_sdk = GraphGridSdk(self._test_bootstrap_config)
+        for _ in range(3):
+            assert gg_sdk.get_active_model("some_task").modelName == "old_model"
+        gg_sdk.promote_model("new_model", "default")
+
+        assert gg_sdk.get_active_model("some_task").modelName == "new_model"
+        assert len([call for call in responses.calls if call.request.method == "GET"]) == 2
@@ -0,0 +1,138 @@
+"""Define test classes for per-service circuit breakers."""
+import dataclasses
+from unittest.mock import patch
+
+import requests
+import responses
+
+from graphgrid_sdk.ggcore.api import NlpApi, ConfigApi
+from graphgrid_sdk.ggcore.circuit_breaker import CircuitBreaker, \
+    CircuitState
+from graphgrid_sdk.ggcore.client import NlpClient, ConfigClient
+from graphgrid_sdk.ggcore.http_base import SdkHttpClient
+from graphgrid_sdk.ggcore.sdk_exceptions import SdkCircuitOpenException
+from graphgrid_sdk.ggcore.session import TokenFactory, TokenTracker
+from tests.test_base import TestBootstrapBase, TestBase
+
+
+class TestCircuitBreaker(TestBootstrapBase):
+    """Define test class for grouping circuit breaker state transitions."""
+
+    @patch("graphgrid_sdk.ggcore.circuit_breaker.time.monotonic")
+    def test_circuit_breaker__open_half_open_closed(self, mock_monotonic):
+        """Test the closed -> open -> half-open -> closed cycle."""
+        mock_monotonic.return_value = 100.0
+        breaker = CircuitBreaker("nlp", failure_threshold=2,
+                                 probe_interval=10.0)
+
+        breaker.record_failure()
+        assert breaker.state is CircuitState.CLOSED
+        breaker.record_failure()
+        assert breaker.state is CircuitState.OPEN
+
+        # open: calls are rejected until the probe interval passes
+        self.assertRaises(SdkCircuitOpenException, breaker.before_call)
+
+        # half-open: exactly one probe is admitted
+        mock_monotonic.return_value = 110.0
+        breaker.before_call()
+        assert breaker.state is CircuitState.HALF_OPEN
+        self.assertRaises(SdkCircuitOpenException, breaker.before_call)
+
+        breaker.record_success()
+        assert breaker.state is CircuitState.CLOSED
+        breaker.before_call()
+
+    @patch("graphgrid_sdk.ggcore.circuit_breaker.time.monotonic")
+    def test_circuit_breaker__failed_probe_reopens(self, mock_monotonic):
+        """Test that a failed half-open probe re-opens the breaker."""
+        mock_monotonic.return_value = 100.0
+        breaker = CircuitBreaker("nlp", failure_threshold=1,
+                                 probe_interval=10.0)
+        breaker.record_failure()
+
+        mock_monotonic.return_value = 110.0
+        breaker.before_call()
+        breaker.record_failure()
+
+        assert breaker.state is CircuitState.OPEN
+        self.assertRaises(SdkCircuitOpenException, breaker.fail_fast)
+
+    @patch("graphgrid_sdk.ggcore.circuit_breaker.time.monotonic")
+    def test_circuit_breaker__released_probe_readmits(self, mock_monotonic):
+        """Test that a probe ending without a verdict lets another call
+        probe.
+        """
+        mock_monotonic.return_value = 100.0
+        breaker = CircuitBreaker("nlp", failure_threshold=1,
+                                 probe_interval=10.0)
+        breaker.record_failure()
+
+        mock_monotonic.return_value = 110.0
+        assert breaker.before_call()
+        breaker.release_probe()
+
+        assert breaker.state is CircuitState.HALF_OPEN
+        assert breaker.before_call()
+
+
+@patch.object(TokenFactory, "_token_tracker",
+              TokenTracker(TestBase.TEST_TOKEN, 10_000))
+class TestClientCircuitBreaker(TestBootstrapBase):
+    """Define test class for grouping client-level circuit breaking."""
+
+    @responses.activate
+    def test_client_circuit__opens_and_fails_fast(self):
+        """Test that after repeated 5xx the client stops calling the
+        service, while other services keep working.
+        """
+        config = dataclasses.replace(self._test_bootstrap_config,
+                                     circuit_failure_threshold=2)
+        http_client = SdkHttpClient(config)
+        nlp_client = NlpClient(config, http_client)
+        config_client = ConfigClient(config, http_client)
+
+        responses.add(responses.POST,
+                      f'http://localhost/1.0/nlp/'
+                      f'{NlpApi.trigger_dag_api("dag", {}).endpoint()}',
+                      status=500)
+        responses.add(responses.GET,
+                      f'http://localhost/1.0/config/'
+                      f'{ConfigApi.test_api().endpoint()}',
+                      json={"content": "test-msg"}, status=200)
+
+        nlp_client.trigger_dag("dag", {})
+        nlp_client.trigger_dag("dag", {})
+        self.assertRaises(SdkCircuitOpenException,
+                          nlp_client.trigger_dag, "dag", {})
+
+        # the open nlp breaker never reached the network
+        assert len(responses.calls) == 2
+
+        # the config service has its own, closed breaker
+        assert config_client.test_api("test-msg").status_code == 200
+
+    @responses.activate
+    def test_client_circuit__counts_only_service_failures(self):
+        """Test that connection errors open the breaker, while other errors
+        raised sending a request leave it alone.
+        """
+        config = dataclasses.replace(self._test_bootstrap_config,
+                                     circuit_failure_threshold=2)
+        nlp_client = NlpClient(config, SdkHttpClient(config))
+        breaker = nlp_client.http_client.circuit_breakers.get("nlp")
+        trigger_url = f'http://localhost/1.0/nlp/' \
+                      f'{NlpApi.trigger_dag_api("dag", {}).endpoint()}'
+
+        for _ in range(2):
+            responses.add(responses.POST, trigger_url,
+                          body=ValueError("bad request body"))
+            self.assertRaises(ValueError, nlp_client.trigger_dag, "dag", {})
+        assert breaker.state is CircuitState.CLOSED
+
+        for _ in range(2):
+            responses.add(responses.POST, trigger_url,
+                          body=requests.ConnectionError("refused"))
+            self.assertRaises(requests.ConnectionError,
+                              nlp_client.trigger_dag, "dag", {})
+        assert breaker.state is CircuitState.OPEN
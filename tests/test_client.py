@@ -1,17 +1,26 @@
 """Define test classes for testing client-level features."""
+import base64
+import json
 from unittest.mock import patch
 
+import requests
 import responses
 
 from graphgrid_sdk.ggcore.api import ConfigApi, AbstractApi, SecurityApi
 from graphgrid_sdk.ggcore.client import ConfigClient, SecurityClientBase
+from graphgrid_sdk.ggcore.config import SdkBootstrapConfig, \
+    DEFAULT_POOL_MAXSIZE
+from graphgrid_sdk.ggcore.http_base import SdkHttpClient
 from graphgrid_sdk.ggcore.sdk_exceptions import \
-    SdkUnauthorizedValidTokenException, SdkInvalidOauthCredentialsException
+    SdkUnauthorizedValidTokenException, SdkInvalidOauthCredentialsException, \
+    SdkTimeoutException
 from graphgrid_sdk.ggcore.sdk_messages import SdkServiceRequest
 from graphgrid_sdk.ggcore.security_base import SdkAuthHeaderBuilder
 from graphgrid_sdk.ggcore.session import TokenFactory, TokenTracker
+from graphgrid_sdk.ggcore.timeouts import deadline_scope, current_deadline
 from graphgrid_sdk.ggcore.utils import HttpMethod, DOCKER_NGINX_PORT, \
-    RequestAuthType
+    RequestAuthType, NLP
+from graphgrid_sdk.ggsdk.sdk import GraphGridSdk
 from tests.test_base import TestBootstrapBase, TestBootstrapDockerBase, TestBase
 
 
@@ -157,6 +166,72 @@ class TestClientResponseHandling(TestClientBase):
             # after call_token 400
             assert mock_call_api.call_count == 2
 
+    @responses.activate
+    def test_client_feature__unauth_response_handling__expired_jwt(self):
+        """Test that a 401 for a JWT whose ``exp`` has passed is retried
+        with a new token without calling check_token.
+        """
+        claims = base64.urlsafe_b64encode(
+            json.dumps({"exp": 1}).encode()).decode().rstrip("=")
+        expired_jwt = f"e30.{claims}.signature"
+
+        for access_token in (expired_jwt, TestBase.TEST_TOKEN):
+            responses.add(responses.POST,
+                          f'http://localhost/1.0/security/'
+                          f'{SecurityApi.get_token_api().endpoint()}',
+                          json={"access_token": access_token,
+                                "expires_in": 10_000}, status=200)
+        for status in (401, 200):
+            responses.add(responses.GET,
+                          f'http://localhost/1.0/config/'
+                          f'{ConfigApi.test_api().endpoint()}',
+                          json={}, status=status)
+
+        config_client = ConfigClient(self._test_bootstrap_config)
+        config_client.test_api("test")
+
+        called_urls = [call.request.url for call in responses.calls]
+        assert not any(SecurityApi.check_token_api().endpoint() in url
+                       for url in called_urls)
+        assert len(called_urls) == 4
+
+    @responses.activate
+    def test_client_feature__unauth_response_handling__token_refreshed_in_flight(
+            self):
+        """Test that a 401 is handled for the token the request was sent
+        with, even if another caller refreshed the token while it was in
+        flight: the request is retried with the new token without checking
+        either.
+        """
+        for access_token in ("token-1", "token-2"):
+            responses.add(responses.POST,
+                          f'http://localhost/1.0/security/'
+                          f'{SecurityApi.get_token_api().endpoint()}',
+                          json={"access_token": access_token,
+                                "expires_in": 10_000}, status=200)
+
+        config_client = ConfigClient(self._test_bootstrap_config)
+        sent_tokens = []
+
+        def test_api_callback(request):
+            sent_tokens.append(request.headers["Authorization"])
+            if len(sent_tokens) > 1:
+                return 200, {}, "{}"
+            # another caller refreshes the token meanwhile
+            config_client.security_client.prepare_auth(force_token_refresh=True)
+            return 401, {}, "{}"
+
+        responses.add_callback(responses.GET,
+                               f'http://localhost/1.0/config/'
+                               f'{ConfigApi.test_api().endpoint()}',
+                               callback=test_api_callback)
+
+        config_client.test_api("test")
+
+        assert sent_tokens == ["Bearer token-1", "Bearer token-2"]
+        assert not any(SecurityApi.check_token_api().endpoint()
+                       in call.request.url for call in responses.calls)
+
     @responses.activate
     def test_client_feature__unauth_response_handling__get_token_401(self):
         """Test exception thrown when token response is 401 Unauthorized."""
@@ -208,3 +283,115 @@ class TestClientDockerContext(TestBootstrapDockerBase):
 
         # assert actual request equals expected request
         assert actual == expected
+
+
+class TestClientConnectionPool(TestClientBase):
+    """Define test class for grouping client-level connection pooling."""
+
+    # pylint: disable=protected-access
+    def test_client_feature__connection_pool__shared_by_clients(self):
+        """Test that security, config and nlp clients of one sdk share a
+        single pooled http client.
+        """
+        gg_sdk = GraphGridSdk(self._test_bootstrap_config)
+        core = gg_sdk._core
+
+        http_client = core.http_client
+        assert core._config_client._http_client is http_client
+        assert core._nlp_client._http_client is http_client
+        assert core._nlp_client._security_client._http_client is http_client
+
+    def test_client_feature__connection_pool__per_service_adapters(self):
+        """Test that each service host gets its own sized connection pool."""
+        config = SdkBootstrapConfig(
+            access_key='a3847750f486bd931de26c6e683b1dc4',
+            secret_key='81a62cea53883f4a163a96355d47656e',
+            url_base='localhost',
+            is_docker_context=False,
+            pool_maxsize={NLP: 32})
+        http_client = SdkHttpClient(config)
+
+        nlp_adapter = http_client.session.get_adapter(
+            'http://localhost/1.0/nlp/nmt/train')
+        config_adapter = http_client.session.get_adapter(
+            'http://localhost/1.0/config/this/is/a/test')
+
+        assert nlp_adapter is not config_adapter
+        # pylint: disable=protected-access
+        assert nlp_adapter._pool_maxsize == 32
+        assert config_adapter._pool_maxsize == DEFAULT_POOL_MAXSIZE
+
+    def test_client_feature__connection_pool__closed_on_exit(self):
+        """Test that leaving the sdk context closes the pooled session."""
+        with patch.object(requests.Session, "close") as mock_close:
+            with GraphGridSdk(self._test_bootstrap_config) as gg_sdk:
+                # pylint: disable=protected-access
+                # touch the session so the pool is created
+                assert gg_sdk._core.http_client.session is not None
+
+            mock_close.assert_called_once()
+
+
+class TestClientTimeouts(TestClientBase):
+    """Define test class for grouping client-level timeouts and deadlines."""
+
+    @responses.activate
+    @patch.object(TokenFactory, "_token_tracker",
+                  TokenTracker(TestBase.TEST_TOKEN, 10_000))
+    def test_client_feature__timeout__request_timeout_raises(self):
+        """Test that an http timeout surfaces as SdkTimeoutException."""
+        responses.add(responses.GET,
+                      f'http://localhost/1.0/config/'
+                      f'{ConfigApi.test_api().endpoint()}',
+                      body=requests.exceptions.ReadTimeout())
+
+        config_client = ConfigClient(self._test_bootstrap_config)
+
+        self.assertRaises(SdkTimeoutException,
+                          config_client.test_api, "test-msg")
+
+    @patch.object(TokenFactory, "_token_tracker",
+                  TokenTracker(TestBase.TEST_TOKEN, 10_000))
+    def test_client_feature__timeout__expired_deadline_fails_fast(self):
+        """Test that a call with an exhausted deadline never hits the
+        network.
+        """
+        config_client = ConfigClient(self._test_bootstrap_config)
+
+        with patch.object(requests.Session, "request") as mock_request:
+            self.assertRaises(SdkTimeoutException,
+                              config_client.test_api, "test-msg", 0)
+            mock_request.assert_not_called()
+
+    @responses.activate
+    @patch.object(TokenFactory, "_token_tracker",
+                  TokenTracker(TestBase.TEST_TOKEN, 10_000))
+    def test_client_feature__timeout__clipped_to_deadline(self):
+        """Test that request timeouts are clipped to the call deadline."""
+        responses.add(responses.GET,
+                      f'http://localhost/1.0/config/'
+                      f'{ConfigApi.test_api().endpoint()}',
+                      json={"content": "test-msg"}, status=200)
+
+        config_client = ConfigClient(self._test_bootstrap_config)
+
+        with patch.object(requests.Session, "request", autospec=True,
+                          side_effect=requests.Session.request) \
+                as mock_request:
+            config_client.test_api("test-msg", timeout=2)
+
+        connect_timeout, read_timeout = \
+            mock_request.call_args.kwargs["timeout"]
+        assert 0 < connect_timeout <= 2
+        assert 0 < read_timeout <= 2
+
+    def test_client_feature__timeout__nested_scopes_only_shorten(self):
+        """Test that a nested deadline scope cannot extend its parent."""
+        with deadline_scope(1) as outer:
+            with deadline_scope(60) as inner:
+                assert inner is outer
+            with deadline_scope(None) as unchanged:
+                assert unchanged is outer
+            with deadline_scope(0.5) as shorter:
+                assert shorter.remaining() <= 0.5
+        assert current_deadline() is None
@@ -0,0 +1,169 @@
+"""Define test classes for deduplication of training triggers."""
+import asyncio
+import dataclasses
+import time
+from unittest.mock import patch
+
+import responses
+
+from graphgrid_sdk import ggcore
+from graphgrid_sdk.ggcore.api import NlpApi
+from graphgrid_sdk.ggcore.dedup import TrainingRunCache, \
+    TrainingRunRegistry, training_fingerprint
+from graphgrid_sdk.ggcore.sdk_messages import TrainRequestBody
+from graphgrid_sdk.ggcore.session import TokenTracker
+from graphgrid_sdk.ggcore.utils import NlpModel
+from graphgrid_sdk.ggsdk.async_sdk import AsyncGraphGridSdk
+from graphgrid_sdk.ggsdk.sdk import GraphGridSdk
+from tests.test_base import TestBase, TestBootstrapBase
+
+
+class MockTrainResponse:
+    """Define minimal training trigger response."""
+    status_code: int = 200
+
+    def __init__(self, dag_run_id):
+        self.dagRunId = dag_run_id  # pylint: disable=invalid-name
+
+
+class TestTrainingRunCache(TestBase):
+    """Define test class for grouping training run cache tests."""
+
+    def test_training_fingerprint__canonical(self):
+        """Test that equivalent request bodies share a fingerprint."""
+        fingerprint = training_fingerprint(TrainRequestBody(
+            NlpModel.TRANSLATION, "dataset", no_cache=None, gpu=False))
+
+        assert fingerprint == training_fingerprint(
+            TrainRequestBody("translation", "dataset"))
+        assert fingerprint != training_fingerprint(
+            TrainRequestBody(NlpModel.TRANSLATION, "dataset", gpu=True))
+
+    def test_training_run_cache__reuse_until_finished(self):
+        """Test that runs are reused while running and after succeeding, and
+        forgotten once they failed.
+        """
+        training_runs = TrainingRunCache(ttl=60.0)
+        triggered = []
+
+        def trigger():
+            triggered.append(f"run-{len(triggered)}")
+            return MockTrainResponse(triggered[-1])
+
+        assert training_runs.get_or_trigger("a", trigger).dagRunId == "run-0"
+        assert training_runs.get_or_trigger("a", trigger).dagRunId == "run-0"
+        training_runs.observe("run-0", "running")
+        training_runs.observe("run-0", "success")
+        assert training_runs.get_or_trigger("a", trigger).dagRunId == "run-0"
+
+        assert training_runs.get_or_trigger("b", trigger).dagRunId == "run-1"
+        training_runs.observe("run-1", "failed")
+        assert training_runs.get_or_trigger("b", trigger).dagRunId == "run-2"
+
+        # runs that never started are not reused
+        assert training_runs.get_or_trigger(
+            "c", lambda: MockTrainResponse(None)).dagRunId is None
+        assert training_runs.get("c") is None
+
+    def test_training_run_cache__unobserved_run_reused_for_ttl(self):
+        """Test that a run never seen finishing is only reused for the ttl
+        after it was triggered.
+        """
+        training_runs = TrainingRunCache(ttl=0.05)
+        training_runs.remember("a", MockTrainResponse("run-0"))
+
+        assert training_runs.get("a").dagRunId == "run-0"
+        time.sleep(0.1)
+        assert training_runs.get("a") is None
+
+    def test_training_run_cache__reused_after_outliving_ttl(self):
+        """Test that a run training for longer than the ttl is reused again
+        once it is seen succeeding, unless a newer run took its place.
+        """
+        training_runs = TrainingRunCache(ttl=0.05)
+        training_runs.remember("a", MockTrainResponse("run-0"))
+        training_runs.remember("b", MockTrainResponse("run-1"))
+        time.sleep(0.1)
+        assert training_runs.get("a") is None
+
+        training_runs.observe("run-0", "success")
+        assert training_runs.get("a").dagRunId == "run-0"
+
+        training_runs.remember("b", MockTrainResponse("run-2"))
+        training_runs.observe("run-1", "failed")
+        assert training_runs.get("b").dagRunId == "run-2"
+
+
+class TestTrainingRunRegistry(TestBootstrapBase):
+    """Define test class for grouping shared training run cache tests."""
+
+    def test_training_run_registry__shared_per_credential(self):
+        """Test that configs of one credential share a cache, and configs
+        differing in access key or secret do not.
+        """
+        config = dataclasses.replace(self._test_bootstrap_config,
+                                     training_dedup_ttl=600.0)
+        shared = TrainingRunRegistry.training_runs(config)
+
+        assert TrainingRunRegistry.training_runs(
+            dataclasses.replace(config)) is shared
+        assert TrainingRunRegistry.training_runs(dataclasses.replace(
+            config, access_key="other-access-key")) is not shared
+        assert TrainingRunRegistry.training_runs(dataclasses.replace(
+            config, secret_key="other-secret-key")) is not shared
+
+
+class TestNlpClientDedup(TestBootstrapBase):
+    """Define test class for deduplicated training triggers."""
+
+    def setUp(self):
+        super().setUp()
+        self._dedup_bootstrap_config = dataclasses.replace(
+            self._test_bootstrap_config, training_dedup_ttl=600.0)
+
+    @responses.activate  # mock responses
+    @patch.object(ggcore.session.TokenFactory, "_token_tracker",
+                  TokenTracker(TestBase.TEST_TOKEN, 10_000))
+    def test_sdk_call__nmt_train__deduplicated(self):
+        """Test that identical requests share a run once enabled, unless
+        bypassed.
+        """
+        request_body = TrainRequestBody(model=NlpModel.NAMED_ENTITY_RECOGNITION,
+                                        dataset_id="some-dataset-id")
+        train_url = f'http://localhost/1.0/nlp/' \
+                    f'{NlpApi.nmt_train_api(request_body=request_body).endpoint()}'
+        for dag_run_id in ("run-0", "run-1", "run-2", "run-3"):
+            responses.add(responses.POST, train_url,
+                          json={"dagRunId": dag_run_id, "state": "queued"})
+
+        assert GraphGridSdk(self._test_bootstrap_config).nmt_train(
+            request_body).dagRunId == "run-0"
+        gg_sdk = GraphGridSdk(self._dedup_bootstrap_config)
+        assert gg_sdk.nmt_train(request_body).dagRunId == "run-1"
+        assert gg_sdk.nmt_train(request_body).dagRunId == "run-1"
+        assert gg_sdk.nmt_train(request_body, deduplicate=False).dagRunId == "run-2"
+        no_cache_body = TrainRequestBody(model=NlpModel.NAMED_ENTITY_RECOGNITION,
+                                         dataset_id="some-dataset-id", no_cache=True)
+        assert gg_sdk.nmt_train(no_cache_body).dagRunId == "run-3"
+        assert len(responses.calls) == 4
+
+    @responses.activate  # mock responses
+    @patch.object(ggcore.session.TokenFactory, "_token_tracker",
+                  TokenTracker(TestBase.TEST_TOKEN, 10_000))
+    def test_async_sdk_call__nmt_train__concurrent_single_flight(self):
+        """Test that concurrent identical async requests share one trigger."""
+        request_body = TrainRequestBody(model=NlpModel.NAMED_ENTITY_RECOGNITION,
+                                        dataset_id="some-dataset-id")
+        train_url = f'http://localhost/1.0/nlp/' \
+                    f'{NlpApi.nmt_train_api(request_body=request_body).endpoint()}'
+        responses.add(responses.POST, train_url,
+                      json={"dagRunId": "run-0", "state": "queued"})
+
+        async def run():
+            async with AsyncGraphGridSdk(self._dedup_bootstrap_config) as sdk:
+                return await asyncio.gather(
+                    *(sdk.nmt_train(request_body) for _ in range(5)))
+
+        assert [response.dagRunId for response in asyncio.run(run())] \
+            == ["run-0"] * 5
+        assert len(responses.calls) == 1
@@ -0,0 +1,186 @@
+"""Define test classes for the training metrics store."""
+import dataclasses
+import os
+import tempfile
+from unittest import mock
+
+from graphgrid_sdk.ggcore.metrics_store import MetricsStore, \
+    ActiveModelRecord
+from graphgrid_sdk.ggcore.sdk_messages import TrainedModelData
+from graphgrid_sdk.ggcore.utils import NlpModel
+from graphgrid_sdk.ggsdk.sdk import GraphGridSdk
+from tests.test_base import TestBase, TestBootstrapBase
+
+
+# pylint: disable=too-many-instance-attributes
+class MockRun:
+    """Define minimal training status response."""
+    status_code: int = 200
+
+    # pylint: disable=invalid-name,too-many-arguments
+    def __init__(self, dagRunId, state="success", evalLoss=None,
+                 evalAccuracy=None, properties=None):
+        self.dagRunId = dagRunId
+        self.state = state
+        self.savedModelName = f"{dagRunId}-model"
+        self.evalLoss = evalLoss
+        self.evalAccuracy = evalAccuracy
+        self.trainingLoss = None
+        self.trainingAccuracy = None
+        self.properties = properties
+
+
+class TestMetricsStore(TestBase):
+    """Define test class for grouping metrics store tests."""
+
+    def setUp(self):
+        super().setUp()
+        self._directory = tempfile.TemporaryDirectory()
+        self._store = MetricsStore(os.path.join(self._directory.name,
+                                                "metrics.db"))
+
+    def tearDown(self):
+        self._directory.cleanup()
+        super().tearDown()
+
+    def test_metrics_store__best_runs(self):
+        """Test best-N queries per task, by eval accuracy then loss."""
+        self._store.record_run("translation", MockRun("a", evalLoss=0.3,
+                                                      evalAccuracy=0.8))
+        self._store.record_run("translation", MockRun("b", evalLoss=0.1,
+                                                      evalAccuracy=0.9))
+        self._store.record_run("translation", MockRun("c"))
+        self._store.record_run("translation", MockRun(
+            "d", state="failed", evalLoss=0.0, evalAccuracy=1.0))
+        self._store.record_run("keyphrase_extraction", MockRun(
+            "e", evalLoss=0.0, evalAccuracy=1.0, properties={"k": 1}))
+        # a later status of a run replaces the earlier one
+        self._store.record_run("translation", MockRun("a", evalLoss=0.1,
+                                                      evalAccuracy=0.9))
+
+        assert [run.dagRunId for run in
+                self._store.best("translation", 2)] == ["a", "b"]
+        assert [run.dagRunId for run in
+                self._store.best("translation", 10)] == ["a", "b", "c"]
+        assert self._store.best("translation", 1, state=None)[0].dagRunId \
+            == "d"
+        assert self._store.best("keyphrase_extraction", 1)[0].properties \
+            == {"k": 1}
+        assert len(self._store.runs("translation")) == 4
+
+    def test_metrics_store__active_model(self):
+        """Test recording promotions and expiring recorded active models."""
+        assert self._store.active_model("translation") is None
+
+        self._store.record_promotion("translation", "b-model", MockRun(
+            "b", evalLoss=0.1, evalAccuracy=0.9), "dataset")
+        active = self._store.active_model("translation", max_age=60)
+
+        assert active.modelName == "b-model"
+        assert active.trainedModelData == TrainedModelData(
+            "translation", ["dataset"], None, None, 0.9, 0.1, None, None, None,
+            None)
+        with mock.patch("time.time", return_value=active.updatedAt + 61):
+            assert self._store.active_model("translation", max_age=60) is None
+
+
+class TestPipelineMetricsStore(TestBootstrapBase):
+    """Define test class for pipelines recording into a metrics store."""
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.promote_model')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_active_model')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_nmt_status')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.trigger_nmt')
+    def test_nmt_train_pipeline__compares_against_history(
+            self, mock_trigger_nmt, mock_get_nmt_status,
+            mock_get_active_model, mock_promote_model):
+        """Test that pipelines record their runs and promotions, and later
+        promotion decisions use the recorded active model.
+        """
+        statuses = {"run-0": MockRun("run-0", evalLoss=0.2, evalAccuracy=0.8),
+                    "run-1": MockRun("run-1", evalLoss=0.5, evalAccuracy=0.5)}
+        triggered = iter(["run-0", "run-1"])
+
+        class MockNoActiveModel:
+            """Define minimal response of a task without active model."""
+            status_code: int = 404
+
+        class MockPromoteResponse:
+            """Define minimal promote response."""
+            status_code: int = 200
+            modelName: str = "run-0-model"  # pylint: disable=invalid-name
+
+        mock_trigger_nmt.side_effect = \
+            lambda request_body, timeout=None, deduplicate=True: \
+            MockRun(next(triggered), state="queued")
+        mock_get_nmt_status.side_effect = \
+            lambda dag_run_id, timeout=None: statuses[dag_run_id]
+        mock_get_active_model.return_value = MockNoActiveModel()
+        mock_promote_model.return_value = MockPromoteResponse()
+
+        with tempfile.TemporaryDirectory() as directory:
+            bootstrap_config = dataclasses.replace(
+                self._test_bootstrap_config, poll_initial_interval=0.01,
+                metrics_store_path=os.path.join(directory, "metrics.db"))
+            with GraphGridSdk(bootstrap_config) as gg_sdk:
+                results = [gg_sdk.nmt_train_pipeline(
+                    [NlpModel.TRANSLATION], "some-dataset-id", False, False,
+                    True, None, None) for _ in range(2)]
+            store = MetricsStore(bootstrap_config.metrics_store_path)
+            best = store.best("translation", 5)
+            active = store.active_model("translation")
+
+        assert [result.promotedModelList for result in results] \
+            == [["run-0-model"], []]
+        # the second decision compared against the recorded promotion
+        mock_get_active_model.assert_called_once()
+        mock_promote_model.assert_called_once_with("run-0-model", "default")
+        assert [(run.dagRunId, run.datasetId) for run in best] \
+            == [("run-0", "some-dataset-id"), ("run-1", "some-dataset-id")]
+        assert active.modelName == "run-0-model"
+        assert active.trainedModelData.evalAccuracy == 0.8
+
+    # pylint: disable=too-many-arguments
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.promote_model')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_active_model')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_nmt_status')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.trigger_nmt')
+    def test_nmt_train_pipeline__confirms_recorded_active_model(
+            self, mock_trigger_nmt, mock_get_nmt_status,
+            mock_get_active_model, mock_promote_model):
+        """Test that a model beating the recorded active model is not
+        promoted if the active model was replaced by a better one since.
+        """
+        class MockActiveModel:
+            """Define minimal response of the fetched active model."""
+            status_code: int = 200
+            modelName: str = "elsewhere-model"  # pylint: disable=invalid-name
+            trainedModelData = TrainedModelData(
+                "translation", [], None, None, 0.95, 0.05, None, None, None,
+                None)
+
+        mock_trigger_nmt.return_value = MockRun("run-0", state="queued")
+        mock_get_nmt_status.return_value = MockRun("run-0", evalLoss=0.2,
+                                                   evalAccuracy=0.8)
+        mock_get_active_model.return_value = MockActiveModel()
+
+        with tempfile.TemporaryDirectory() as directory:
+            bootstrap_config = dataclasses.replace(
+                self._test_bootstrap_config, poll_initial_interval=0.01,
+                metrics_store_path=os.path.join(directory, "metrics.db"))
+            store = MetricsStore(bootstrap_config.metrics_store_path)
+            store.record_active_model("translation", ActiveModelRecord(
+                "recorded-model", TrainedModelData(
+                    "translation", [], None, None, 0.5, 0.5, None, None,
+                    None, None), 0.0))
+            with GraphGridSdk(bootstrap_config) as gg_sdk:
+                result = gg_sdk.nmt_train_pipeline(
+                    [NlpModel.TRANSLATION], "some-dataset-id", False, False,
+                    True, None, None)
+            active = store.active_model("translation")
+
+        assert result.promotedModelList == []
+        mock_promote_model.assert_not_called()
+        # the fetched active model replaced the stale record
+        assert active.modelName == "elsewhere-model"
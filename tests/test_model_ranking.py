@@ -0,0 +1,125 @@
+"""Define test classes for ranking trained models."""
+import numpy as np
+
+from graphgrid_sdk.ggcore.model_ranking import ModelRanker, TIER_EVAL, \
+    TIER_TRAINING, TIER_PROPERTIES_CHANGED, TIER_NO_METRICS
+from graphgrid_sdk.ggcore.nmt_train_pipeline import evaluate_models
+from graphgrid_sdk.ggcore.sdk_messages import TrainedModelData
+from tests.test_base import TestBase
+
+PROPERTIES = {"languages": ["en"]}
+
+
+class MockCandidate:
+    """Define minimal trained model status."""
+    # pylint: disable=invalid-name,too-many-arguments
+    def __init__(self, name, evalLoss=None, evalAccuracy=None,
+                 trainingLoss=None, trainingAccuracy=None,
+                 properties=None):
+        self.savedModelName = name
+        self.evalLoss = evalLoss
+        self.evalAccuracy = evalAccuracy
+        self.trainingLoss = trainingLoss
+        self.trainingAccuracy = trainingAccuracy
+        self.properties = PROPERTIES if properties is None else properties
+
+
+def _active(**metrics) -> TrainedModelData:
+    values = {"evalLoss": None, "evalAccuracy": None, "trainingLoss": None,
+              "trainingAccuracy": None}
+    values.update(metrics)
+    return TrainedModelData(modelType="translation", trainingDataset=[],
+                            properties=PROPERTIES, location=None,
+                            timestamp=None, platformVersion=None, **values)
+
+
+class TestModelRanker(TestBase):
+    """Define test class for grouping model ranking tests."""
+
+    # pylint: disable=no-self-use
+    def test_model_ranker__eval_accuracy_counts(self):
+        """Test that a candidate with equal loss but lower eval accuracy
+        than the active model does not beat it.
+        """
+        active = _active(evalLoss=0.2, evalAccuracy=0.9)
+        worse = MockCandidate("worse", evalLoss=0.2, evalAccuracy=0.5)
+        better = MockCandidate("better", evalLoss=0.2, evalAccuracy=0.95)
+
+        assert ModelRanker().best([worse], active) is None
+        assert ModelRanker().best([worse, better], active) is better
+
+    # pylint: disable=no-self-use
+    def test_model_ranker__ranked_table(self):
+        """Test the order and tiers of a mixed batch of candidates."""
+        active = _active(evalLoss=0.3, evalAccuracy=0.8, trainingLoss=0.1,
+                         trainingAccuracy=0.9)
+        candidates = [
+            MockCandidate("eval-good", evalLoss=0.1, evalAccuracy=0.9),
+            MockCandidate("eval-bad", evalLoss=0.9, evalAccuracy=0.1),
+            MockCandidate("training-good", trainingLoss=0.05,
+                          trainingAccuracy=0.95),
+            MockCandidate("new-languages", properties={"languages": ["de"]}),
+            MockCandidate("no-metrics"),
+            MockCandidate("eval-best", evalLoss=0.1, evalAccuracy=0.95),
+        ]
+
+        ranking = ModelRanker().rank(candidates, active)
+
+        assert [(row.candidate.savedModelName, row.tier, row.beats_active)
+                for row in ranking] == [
+                    ("eval-best", TIER_EVAL, True),
+                    ("eval-good", TIER_EVAL, True),
+                    ("training-good", TIER_TRAINING, True),
+                    ("new-languages", TIER_PROPERTIES_CHANGED, True),
+                    ("no-metrics", TIER_NO_METRICS, True),
+                    ("eval-bad", TIER_EVAL, False)]
+        assert [row.rank for row in ranking] == [1, 2, 3, 4, 5, 6]
+
+    # pylint: disable=no-self-use
+    def test_model_ranker__properties_changed_ranked_by_metrics(self):
+        """Test that candidates whose properties differ from the active
+        model's are ranked against each other on their metrics, not by
+        submission order.
+        """
+        active = _active(evalLoss=0.2, evalAccuracy=0.8)
+        changed = {"languages": ["de"]}
+        candidates = [
+            MockCandidate("best", evalLoss=0.01, evalAccuracy=0.99,
+                          properties=changed),
+            MockCandidate("training-only", trainingLoss=0.01,
+                          trainingAccuracy=0.99, properties=changed),
+            MockCandidate("worst", evalLoss=3.0, evalAccuracy=0.10,
+                          properties=changed),
+            MockCandidate("no-metrics", properties=changed),
+        ]
+
+        ranking = ModelRanker().rank(candidates, active)
+
+        assert [(row.candidate.savedModelName, row.tier, row.beats_active)
+                for row in ranking] == [
+                    ("best", TIER_PROPERTIES_CHANGED, True),
+                    ("worst", TIER_PROPERTIES_CHANGED, True),
+                    ("training-only", TIER_PROPERTIES_CHANGED, True),
+                    ("no-metrics", TIER_PROPERTIES_CHANGED, True)]
+        assert ModelRanker().best(candidates, active) is candidates[0]
+
+    # pylint: disable=no-self-use
+    def test_model_ranker__custom_scorer_and_no_active_model(self):
+        """Test a pluggable scorer, and that any candidate beats a missing
+        active model.
+        """
+        def accuracy_only(losses, accuracies, active_loss, active_accuracy):
+            return accuracies - active_accuracy
+
+        candidates = [MockCandidate("low-loss", evalLoss=0.01, evalAccuracy=0.7),
+                      MockCandidate("accurate", evalLoss=0.5, evalAccuracy=0.8)]
+        active = _active(evalLoss=0.2, evalAccuracy=0.75)
+
+        ranking = ModelRanker(eval_scorer=accuracy_only).rank(candidates,
+                                                              active)
+        assert ranking[0].candidate.savedModelName == "accurate"
+        assert np.isclose(ranking[0].score, 0.05)
+        assert not ranking[1].beats_active
+
+        assert ModelRanker().best(candidates, None) is candidates[0]
+        assert evaluate_models(object(), candidates[1]) is candidates[1]
@@ -0,0 +1,51 @@
+"""Define test classes for the nmt train pipeline journal."""
+import os
+import tempfile
+
+from graphgrid_sdk.ggcore.pipeline_journal import PipelineJournal
+from graphgrid_sdk.ggcore.sdk_exceptions import SdkPipelineJournalException
+from graphgrid_sdk.ggcore.utils import NlpModel
+from tests.test_base import TestBase
+
+
+class TestPipelineJournal(TestBase):
+    """Define test class for grouping pipeline journal tests."""
+
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.journal = PipelineJournal(
+            os.path.join(temp_dir.name, "pipeline.jsonl"))
+
+    def test_pipeline_journal__replays_last_pipeline(self):
+        """Test that replay returns the last pipeline and skips a record cut
+        short by a crash.
+        """
+        self.journal.record_pipeline([NlpModel.TRANSLATION], "old", False,
+                                     False, False)
+        self.journal.record_triggered(0, "old-run")
+        self.journal.record_pipeline(
+            [NlpModel.TRANSLATION, NlpModel.KEYPHRASE_EXTRACTION], "new",
+            True, False, True)
+        self.journal.record_triggered(1, "run-1")
+        self.journal.record_finished(1, "run-1", "failed")
+        with open(self.journal.path, "a", encoding="utf-8") as journal_file:
+            journal_file.write('{"event": "evalu')
+
+        pipeline = self.journal.replay()
+
+        assert pipeline.dataset_id == "new" and pipeline.autopromote
+        assert pipeline.jobs[0].dag_run_id is None
+        assert pipeline.jobs[1].model == NlpModel.KEYPHRASE_EXTRACTION
+        assert pipeline.jobs[1].state == "failed"
+        assert not pipeline.jobs[1].evaluated
+
+    def test_pipeline_journal__nothing_to_resume(self):
+        """Test that a missing or empty journal cannot be resumed."""
+        with self.assertRaises(SdkPipelineJournalException):
+            self.journal.replay()
+
+        self.journal.record_triggered(0, "run-0")
+        with self.assertRaises(SdkPipelineJournalException):
+            self.journal.replay()
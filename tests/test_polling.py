@@ -0,0 +1,184 @@
+"""Define test classes for concurrent dag run polling and run handles."""
+import threading
+import time
+
+import requests
+
+from graphgrid_sdk.ggcore.dag_run_handle import DagRunHandle, as_completed
+from graphgrid_sdk.ggcore.polling import PollSchedule, DagRunPollingEngine
+from graphgrid_sdk.ggcore.sdk_exceptions import SdkTimeoutException
+from tests.test_base import TestBase
+
+FAST_SCHEDULE = PollSchedule(initial_interval=0.01, max_interval=0.05,
+                             backoff_factor=2.0)
+
+
+class MockStatusResponse:
+    """Define minimal dag run status used by the polling tests."""
+
+    def __init__(self, state: str, status_code: int = 200,
+                 dag_run_id: str = None):
+        self.state = state
+        self.status_code = status_code
+        self.dagId = "dag"  # pylint: disable=invalid-name
+        self.dagRunId = dag_run_id  # pylint: disable=invalid-name
+
+
+class TestPollSchedule(TestBase):
+    """Define test class for grouping poll schedule tests."""
+
+    # pylint: disable=no-self-use
+    def test_poll_schedule__backs_off_to_cap(self):
+        """Test that intervals grow by the backoff factor up to the cap."""
+        schedule = PollSchedule(initial_interval=2.0, max_interval=10.0,
+                                backoff_factor=2.0)
+
+        assert [schedule.interval(polls) for polls in range(5)] == \
+               [2.0, 4.0, 8.0, 10.0, 10.0]
+        # the exponent stops growing at the cap instead of overflowing
+        assert PollSchedule().interval(100_000) == PollSchedule().max_interval
+        assert PollSchedule(max_interval=5.0).interval(1800) == 5.0
+
+
+class TestDagRunPollingEngine(TestBase):
+    """Define test class for grouping dag run polling engine tests."""
+
+    def setUp(self):
+        super().setUp()
+        self.engine = DagRunPollingEngine(FAST_SCHEDULE, max_workers=4)
+
+    def tearDown(self):
+        self.engine.close()
+
+    def test_polling_engine__polls_until_terminal(self):
+        """Test that each run is polled on the shared workers until its own
+        terminal state.
+        """
+        states = {"a": ["running", "running", "success"],
+                  "b": ["failed"],
+                  "c": ["running", "success"]}
+        polled_threads = set()
+
+        def get_status(dag_run_id):
+            polled_threads.add(threading.current_thread().name)
+            return MockStatusResponse(states[dag_run_id].pop(0))
+
+        futures = [self.engine.watch(dag_run_id, get_status)
+                   for dag_run_id in ("a", "b", "c")]
+
+        assert [future.result(5).state for future in futures] == \
+               ["success", "failed", "success"]
+        assert all(not remaining for remaining in states.values())
+        assert all(name.startswith("graphgrid-sdk-poll")
+                   for name in polled_threads)
+
+    def test_polling_engine__transient_errors_tolerated(self):
+        """Test that a failed status request is retried, while a run that
+        keeps failing is given up on.
+        """
+        responses = {"flaky": [requests.ConnectionError(),
+                               MockStatusResponse("", 503),
+                               MockStatusResponse("success")],
+                     "down": [requests.ConnectionError()] * 3}
+
+        def get_status(dag_run_id):
+            response = responses[dag_run_id].pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        flaky = self.engine.watch("flaky", get_status)
+        down = self.engine.watch("down", get_status)
+
+        assert flaky.result(5).state == "success"
+        self.assertRaises(requests.ConnectionError, down.result, 5)
+
+    def test_polling_engine__reschedule_error_resolves_future(self):
+        """Test that an error while rescheduling a run fails its future
+        instead of leaving it unresolved.
+        """
+        class FailingSchedule:
+            """Define schedule failing to compute a later interval."""
+
+            # pylint: disable=no-self-use
+            def interval(self, polls):
+                if polls:
+                    raise OverflowError("interval")
+                return 0.01
+
+        engine = DagRunPollingEngine(FailingSchedule(), max_workers=1)
+        try:
+            future = engine.watch("run",
+                                  lambda _: MockStatusResponse("running"))
+            self.assertRaises(OverflowError, future.result, 5)
+        finally:
+            engine.close()
+
+    def test_polling_engine__cancelled_run_not_polled(self):
+        """Test that a cancelled wait stops polling the run."""
+        polls = []
+
+        def get_status(dag_run_id):
+            polls.append(dag_run_id)
+            return MockStatusResponse("running")
+
+        future = self.engine.watch("run", get_status)
+        while not polls:
+            time.sleep(0.01)
+        future.cancel()
+        polls_at_cancel = len(polls)
+        time.sleep(0.2)
+
+        assert len(polls) <= polls_at_cancel + 1
+
+
+class TestDagRunHandle(TestBase):
+    """Define test class for grouping dag run handle tests."""
+
+    def setUp(self):
+        super().setUp()
+        self.engine = DagRunPollingEngine(FAST_SCHEDULE, max_workers=4)
+
+    def tearDown(self):
+        self.engine.close()
+
+    def _handle(self, dag_run_id, states, release=None):
+        """Return a handle on a run going through the given states."""
+
+        def get_status(_):
+            if release is not None:
+                release.wait(5)
+            return MockStatusResponse(states.pop(0), dag_run_id=dag_run_id)
+
+        return DagRunHandle(MockStatusResponse("queued", dag_run_id=dag_run_id),
+                            self.engine.watch(dag_run_id, get_status))
+
+    def test_dag_run_handle__as_completed_and_callbacks(self):
+        """Test that handles are yielded in completion order and callbacks
+        receive the handle.
+        """
+        release = threading.Event()
+        slow = self._handle("slow", ["success"], release)
+        fast = self._handle("fast", ["running", "failed"])
+        called = []
+        fast.add_done_callback(called.append)
+
+        completed = []
+        for handle in as_completed([slow, fast], timeout=5):
+            completed.append(handle)
+            release.set()
+
+        assert completed == [fast, slow]
+        assert called == [fast]
+        assert fast.result().state == "failed"
+        assert slow.done() and slow.dag_run_id == "slow"
+
+    def test_dag_run_handle__result_timeout_and_cancel(self):
+        """Test that result raises SdkTimeoutException while the run is
+        running and that waiting can be cancelled.
+        """
+        handle = self._handle("run", ["running"] * 1000)
+
+        self.assertRaises(SdkTimeoutException, handle.result, 0.05)
+        assert handle.cancel_wait()
+        assert handle.cancelled() and handle.done()
@@ -0,0 +1,129 @@
+"""Define test classes for request retry policies and the retry budget."""
+from unittest.mock import patch
+
+import requests
+import responses
+
+from graphgrid_sdk.ggcore.api import ConfigApi, NlpApi
+from graphgrid_sdk.ggcore.client import ConfigClient, NlpClient
+from graphgrid_sdk.ggcore.retry import RetryBudget, RetryPolicy, \
+    parse_retry_after, IDEMPOTENT_RETRY, NO_RETRY
+from graphgrid_sdk.ggcore.sdk_messages import GenericResponse
+from graphgrid_sdk.ggcore.session import TokenFactory, TokenTracker
+from tests.test_base import TestBootstrapBase, TestBase
+
+
+class TestRetryPolicy(TestBootstrapBase):
+    """Define test class for grouping retry policy features."""
+
+    # pylint: disable=no-self-use
+    def test_retry_policy__defaults_by_api(self):
+        """Test that reads are retried and side-effecting calls are not."""
+        assert NlpApi.nmt_status_api("run").retry_policy() is IDEMPOTENT_RETRY
+        assert NlpApi.get_dag_run_status_api("dag", "run").retry_policy() \
+               is IDEMPOTENT_RETRY
+        assert NlpApi.trigger_dag_api("dag", {}).retry_policy() is NO_RETRY
+        assert NlpApi.promote_model_api("model", "default").retry_policy() \
+               is NO_RETRY
+
+    # pylint: disable=no-self-use
+    def test_retry_policy__backoff_is_capped(self):
+        """Test that jittered backoff never exceeds its cap."""
+        policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+        for attempt in range(1, 10):
+            assert 0 <= policy.backoff(attempt) \
+                   <= min(4.0, 2 ** (attempt - 1))
+
+    # pylint: disable=no-self-use
+    def test_retry_policy__parse_retry_after(self):
+        """Test Retry-After parsing of seconds and invalid values."""
+        assert parse_retry_after(
+            GenericResponse(503, "", None, {"Retry-After": "2"})) == 2.0
+        assert parse_retry_after(
+            GenericResponse(503, "", None, {"Retry-After": "soon"})) is None
+        assert parse_retry_after(GenericResponse(503, "", None)) is None
+
+    # pylint: disable=no-self-use
+    def test_retry_budget__exhausts_and_refills(self):
+        """Test that the budget caps retries and refills with traffic."""
+        budget = RetryBudget(ratio=0.5, min_tokens=1.0)
+        assert budget.try_acquire()
+        assert not budget.try_acquire()
+
+        budget.record_request()
+        budget.record_request()
+        assert budget.try_acquire()
+
+
+@patch("graphgrid_sdk.ggcore.retry.time.sleep")
+@patch.object(TokenFactory, "_token_tracker",
+              TokenTracker(TestBase.TEST_TOKEN, 10_000))
+class TestClientRetries(TestBootstrapBase):
+    """Define test class for grouping client-level request retries."""
+
+    _test_api_url = f'http://localhost/1.0/config/' \
+                    f'{ConfigApi.test_api().endpoint()}'
+
+    @responses.activate
+    def test_client_retry__get_503_then_200(self, mock_sleep):
+        """Test that a GET is retried after a gateway error."""
+        responses.add(responses.GET, self._test_api_url, status=503)
+        responses.add(responses.GET, self._test_api_url,
+                      json={"content": "test-msg"}, status=200)
+
+        response = ConfigClient(self._test_bootstrap_config).test_api("test")
+
+        assert response.status_code == 200
+        assert len(responses.calls) == 2
+        mock_sleep.assert_called_once()
+
+    @responses.activate
+    def test_client_retry__honors_retry_after(self, mock_sleep):
+        """Test that Retry-After replaces the computed backoff."""
+        responses.add(responses.GET, self._test_api_url, status=503,
+                      headers={"Retry-After": "3"})
+        responses.add(responses.GET, self._test_api_url,
+                      json={"content": "test-msg"}, status=200)
+
+        ConfigClient(self._test_bootstrap_config).test_api("test")
+
+        mock_sleep.assert_called_once_with(3.0)
+
+    @responses.activate
+    def test_client_retry__connection_error_then_200(self, mock_sleep):
+        """Test that a GET is retried after a connection error."""
+        responses.add(responses.GET, self._test_api_url,
+                      body=requests.exceptions.ConnectionError())
+        responses.add(responses.GET, self._test_api_url,
+                      json={"content": "test-msg"}, status=200)
+
+        response = ConfigClient(self._test_bootstrap_config).test_api("test")
+
+        assert response.status_code == 200
+        mock_sleep.assert_called_once()
+
+    @responses.activate
+    def test_client_retry__trigger_dag_not_retried(self, mock_sleep):
+        """Test that a dag trigger is never retried blindly."""
+        responses.add(responses.POST,
+                      f'http://localhost/1.0/nlp/'
+                      f'{NlpApi.trigger_dag_api("dag", {}).endpoint()}',
+                      status=503)
+
+        response = NlpClient(self._test_bootstrap_config).trigger_dag(
+            "dag", {})
+
+        assert response.status_code == 503
+        assert len(responses.calls) == 1
+        mock_sleep.assert_not_called()
+
+    @responses.activate
+    def test_client_retry__gives_up_after_max_attempts(self, mock_sleep):
+        """Test that retries stop after the policy's max attempts."""
+        responses.add(responses.GET, self._test_api_url, status=502)
+
+        response = ConfigClient(self._test_bootstrap_config).test_api("test")
+
+        assert response.status_code == 502
+        assert len(responses.calls) == IDEMPOTENT_RETRY.max_attempts
+        assert mock_sleep.call_count == IDEMPOTENT_RETRY.max_attempts - 1
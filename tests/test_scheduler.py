@@ -0,0 +1,180 @@
+"""Define test classes for the training scheduler."""
+import dataclasses
+import threading
+from concurrent.futures import Future, wait
+
+from graphgrid_sdk.ggcore.scheduler import TrainingScheduler
+from graphgrid_sdk.ggcore.sdk_exceptions import SdkDagRunException
+from graphgrid_sdk.ggcore.sdk_messages import TrainRequestBody
+from graphgrid_sdk.ggcore.utils import NlpModel
+from graphgrid_sdk.ggsdk.sdk import GraphGridSdk
+from tests.test_base import TestBase, TestBootstrapBase
+
+# Seconds to wait for the dispatch thread
+TIMEOUT = 5
+
+
+class MockTrainResponse:
+    """Define minimal training trigger response."""
+    status_code: int = 200
+
+    def __init__(self, dag_run_id):
+        self.dagRunId = dag_run_id  # pylint: disable=invalid-name
+
+
+class TestTrainingScheduler(TestBase):
+    """Define test class for grouping training scheduler tests."""
+
+    def setUp(self):
+        super().setUp()
+        self.triggered = []
+        self.runs = {}
+
+    # pylint: disable=unused-argument
+    def _trigger(self, request_body, timeout):
+        self.triggered.append(request_body.dataset_id)
+        if request_body.dataset_id == "broken":
+            return MockTrainResponse(None)
+        return MockTrainResponse(request_body.dataset_id)
+
+    def _watch(self, dag_run_id):
+        self.runs[dag_run_id] = Future()
+        return self.runs[dag_run_id]
+
+    def _scheduler(self, **limits) -> TrainingScheduler:
+        return TrainingScheduler(self._trigger, self._watch, **limits)
+
+    def _finish(self, dag_run_id):
+        self.runs[dag_run_id].set_result(dag_run_id)
+
+    @staticmethod
+    def _wait(futures):
+        """Wait until runs were triggered on the dispatch thread."""
+        assert not wait(futures, TIMEOUT).not_done
+
+    @staticmethod
+    def _body(name, model=NlpModel.NAMED_ENTITY_RECOGNITION, gpu=False):
+        return TrainRequestBody(model=model, dataset_id=name, gpu=gpu)
+
+    def test_training_scheduler__concurrency_limit(self):
+        """Test that runs beyond the limit wait for a finished run."""
+        scheduler = self._scheduler(max_concurrent=2)
+        futures = [scheduler.submit(self._body(name))
+                   for name in ("a", "b", "c", "d")]
+
+        self._wait(futures[:2])
+        assert self.triggered == ["a", "b"]
+        assert scheduler.queued == 2 and not futures[2].done()
+
+        self._finish("a")
+        assert futures[2].result(TIMEOUT).dag_run_id == "c"
+        assert self.triggered == ["a", "b", "c"]
+        assert futures[0].result().result() == "a"
+
+    def test_training_scheduler__gpu_limit(self):
+        """Test that gpu runs are capped separately and a waiting gpu run
+        does not hold back cpu runs.
+        """
+        scheduler = self._scheduler(max_concurrent=3, max_concurrent_gpu=1)
+        gpu_1 = scheduler.submit(self._body("gpu-1", gpu=True))
+        gpu_2 = scheduler.submit(self._body("gpu-2", gpu=True))
+        cpu = scheduler.submit(self._body("cpu"))
+
+        self._wait([gpu_1, cpu])
+        assert self.triggered == ["gpu-1", "cpu"]
+        self._finish("gpu-1")
+        self._wait([gpu_2])
+        assert self.triggered == ["gpu-1", "cpu", "gpu-2"]
+
+    def test_training_scheduler__priority_then_fifo(self):
+        """Test that waiting runs are admitted by model priority, then in
+        submission order.
+        """
+        scheduler = self._scheduler(
+            max_concurrent=1,
+            priorities={NlpModel.TRANSLATION.value: -1})
+        futures = {name: scheduler.submit(self._body(name, model))
+                   for name, model in (
+                       ("first", NlpModel.NAMED_ENTITY_RECOGNITION),
+                       ("ner-1", NlpModel.NAMED_ENTITY_RECOGNITION),
+                       ("translation", NlpModel.TRANSLATION),
+                       ("ner-2", NlpModel.NAMED_ENTITY_RECOGNITION))}
+
+        for dag_run_id in ("first", "translation", "ner-1"):
+            self._wait([futures[dag_run_id]])
+            self._finish(dag_run_id)
+        self._wait([futures["ner-2"]])
+
+        assert self.triggered == ["first", "translation", "ner-1", "ner-2"]
+
+    def test_training_scheduler__slot_lifecycle(self):
+        """Test that a failed trigger frees its slot, while a handle whose
+        waiter gave up keeps it until the run finishes.
+        """
+        scheduler = self._scheduler(max_concurrent=1)
+        broken = scheduler.submit(self._body("broken"))
+        running = scheduler.submit(self._body("running"))
+        waiting = scheduler.submit(self._body("waiting"))
+
+        self.assertRaises(SdkDagRunException, broken.result(TIMEOUT).result)
+        running.result(TIMEOUT).cancel_wait()
+        assert self.triggered == ["broken", "running"]
+        assert scheduler.running == 1 and not waiting.done()
+
+        self._finish("running")
+        assert waiting.result(TIMEOUT).dag_run_id == "waiting"
+
+    def test_training_scheduler__triggers_on_dispatch_thread(self):
+        """Test that runs admitted when a run finishes are triggered on the
+        dispatch thread, not the thread reporting the finished run.
+        """
+        trigger_threads = []
+
+        def trigger(request_body, timeout):
+            trigger_threads.append(threading.current_thread().name)
+            return self._trigger(request_body, timeout)
+
+        scheduler = TrainingScheduler(trigger, self._watch, max_concurrent=1)
+        first = scheduler.submit(self._body("first"))
+        second = scheduler.submit(self._body("second"))
+        self._wait([first])
+        self._finish("first")
+        self._wait([second])
+
+        assert all(name.startswith("graphgrid-sdk-training-dispatch")
+                   for name in trigger_threads)
+        assert len(trigger_threads) == 2
+
+    def test_training_scheduler__closed_withdraws_waiting_runs(self):
+        """Test that closing a scheduler withdraws runs waiting for
+        admission.
+        """
+        scheduler = self._scheduler(max_concurrent=1)
+        running = scheduler.submit(self._body("running"))
+        waiting = scheduler.submit(self._body("waiting"))
+        self._wait([running])
+
+        scheduler.close()
+        assert waiting.cancelled()
+
+
+class TestTrainingSchedulerRegistry(TestBootstrapBase):
+    """Define test class for grouping shared training scheduler tests."""
+
+    # pylint: disable=protected-access
+    def test_training_scheduler_registry__shared_per_credential(self):
+        """Test that sdk instances of one credential share the training
+        limits.
+        """
+        other_config = dataclasses.replace(self._test_bootstrap_config,
+                                           access_key="other-access-key")
+        other_secret_config = dataclasses.replace(
+            self._test_bootstrap_config, secret_key="other-secret-key")
+        with GraphGridSdk(self._test_bootstrap_config) as first_sdk, \
+                GraphGridSdk(self._test_bootstrap_config) as second_sdk, \
+                GraphGridSdk(other_config) as other_sdk, \
+                GraphGridSdk(other_secret_config) as other_secret_sdk:
+            shared = first_sdk._core.training_scheduler
+            assert second_sdk._core.training_scheduler is shared
+            assert other_sdk._core.training_scheduler is not shared
+            assert other_secret_sdk._core.training_scheduler is not shared
@@ -1,5 +1,10 @@
 """Define test classes for testing user-facing sdk calls."""
+import dataclasses
 import json
+import os
+import tempfile
+import threading
+from concurrent.futures import Future
 from unittest import mock
 from unittest.mock import patch
 
@@ -8,6 +13,8 @@ import responses
 
 from graphgrid_sdk import ggcore
 from graphgrid_sdk.ggcore.api import ConfigApi, NlpApi
+from graphgrid_sdk.ggcore.nmt_train_pipeline import NmtTrainPipeline
+from graphgrid_sdk.ggcore.pipeline_journal import PipelineJournal
 from graphgrid_sdk.ggcore.sdk_messages import TestApiResponse, \
     GenericResponse, SaveDatasetResponse, PromoteModelResponse, \
     GetDataResponse, DagRunResponse, NMTTrainResponse, NMTStatusResponse, \
@@ -96,6 +103,42 @@ class TestSdkSaveDataset(TestSdkBase):
         assert actual_response == expected_response
 
 
+    @responses.activate  # mock responses
+    @patch.object(TokenFactory, "_token_tracker",
+                  TokenTracker(TestBase.TEST_TOKEN, 10_000))
+    def test_sdk_call__save_dataset__chunked_with_progress(self):
+        """Test that dataset lines are sent in chunks of the configured size,
+        with progress reported per chunk.
+        """
+        filename = "any_dataset"
+        lines = [json.dumps({"line": i}) + "\n" for i in range(10)]
+        sent_chunks = []
+        progress = []
+
+        def consume_body(request):
+            sent_chunks.extend(request.body)
+            return 200, {}, json.dumps({"datasetId": filename})
+
+        responses.add_callback(
+            responses.POST,
+            f'http://localhost/1.0/nlp/{NlpApi.save_dataset_api(None, filename).endpoint()}',
+            callback=consume_body)
+
+        bootstrap_config = dataclasses.replace(self._test_bootstrap_config,
+                                               upload_chunk_size=40)
+        gg_sdk = sdk.GraphGridSdk(bootstrap_config)
+        actual_response = gg_sdk.save_dataset(
+            iter(lines), filename, progress_callback=progress.append)
+
+        assert actual_response.dataset_id == filename
+        assert all(isinstance(chunk, bytes) for chunk in sent_chunks)
+        assert b"".join(sent_chunks) == "".join(lines).encode()
+        # each line is 12 bytes, so chunks hold 4 lines, the last one 2
+        assert [len(chunk) for chunk in sent_chunks] == [48, 48, 24]
+        assert [(update.bytesSent, update.recordsSent)
+                for update in progress] == [(48, 4), (96, 8), (120, 10)]
+
+
 class TestSdkGetData(TestSdkBase):
     """Define test class for GetDataApi sdk calls."""
 
@@ -365,11 +408,45 @@ class TestSdkNMT(TestSdkBase):
 
         assert actual_response == expected_response
 
+    @responses.activate  # mock responses
+    @patch.object(ggcore.session.TokenFactory, "_token_tracker",
+                  TokenTracker(TestBase.TEST_TOKEN, 10_000))
+    def test_sdk_call__submit_nmt_train__200(self):
+        """Test sdk submit_nmt_train returns a handle resolving to the final
+        NMT status.
+        """
+        dag_run_id = "manual__2022-03-28T16:02:45.526226+00:00"
+        request_body = TrainRequestBody(model=NlpModel.NAMED_ENTITY_RECOGNITION,
+                                        dataset_id="some-dataset-id",
+                                        no_cache=False,
+                                        gpu=False)
+
+        responses.add(method=responses.POST,
+                      url=f'http://localhost/1.0/nlp/'
+                          f'{NlpApi.nmt_train_api(request_body=request_body).endpoint()}',
+                      json={"dagRunId": dag_run_id, "state": "queued"}, status=200)
+        for state in ("running", "success"):
+            responses.add(method=responses.GET,
+                          url=f'http://localhost/1.0/nlp/'
+                              f'{NlpApi.nmt_status_api(dag_run_id=dag_run_id).endpoint()}',
+                          json={"dagRunId": dag_run_id, "state": state,
+                                "savedModelName": "nerModel"}, status=200)
+
+        bootstrap_config = dataclasses.replace(self._test_bootstrap_config,
+                                               poll_initial_interval=0.01)
+        with GraphGridSdk(bootstrap_config) as gg_sdk:
+            handle = gg_sdk.submit_nmt_train(request_body)
+            status: NMTStatusResponse = handle.result(timeout=5)
+
+        assert handle.dag_run_id == dag_run_id
+        assert status.state == "success"
+        assert status.savedModelName == "nerModel"
+
 
 class TestNMTTrainPipeline(TestSdkBase):
     """Define test class for nmt_train_pipeline sdk call."""
 
-    @mock.patch('graphgrid_sdk.ggcore.nmt_train_pipeline.evaluate_models')
+    @mock.patch('graphgrid_sdk.ggcore.nmt_train_pipeline.select_best_model')
     @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.promote_model')
     @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_active_model')
     @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_nmt_status')
@@ -426,3 +503,376 @@ class TestNMTTrainPipeline(TestSdkBase):
 
         self.assertEqual(result.modelStatusList, [mock_status_success_response, mock_status_success_response])
         self.assertEqual(result.promotedModelList, [MockPromoteResponse.modelName, MockPromoteResponse.modelName])
+
+    @mock.patch('graphgrid_sdk.ggcore.nmt_train_pipeline.select_best_model')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.promote_model')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_active_model')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_nmt_status')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.trigger_nmt')
+    def test_nmt_train_pipeline__finishes_each_job_on_completion(
+            self, mock_trigger_nmt, mock_get_nmt_status, mock_get_active_model,
+            mock_promote_model, mock_evaluate_models):
+        """Test that a fast job is handled and promoted while a slow job is
+        still running.
+        """
+        fast_done = threading.Event()
+        events = []
+
+        class MockRun:
+            status_code: int = 200
+
+            def __init__(self, dag_run_id, state=None):
+                self.dagRunId = dag_run_id
+                self.state = state
+                self.savedModelName = dag_run_id
+
+        class MockPromoteResponse:
+            status_code: int = 200
+
+            def __init__(self, model_name):
+                self.modelName = model_name
+
+        def get_nmt_status(dag_run_id, timeout=None):
+            if dag_run_id == "slow" and not fast_done.is_set():
+                return MockRun(dag_run_id, "running")
+            return MockRun(dag_run_id, "success")
+
+        def promote_model(model_name, environment):
+            events.append(f"promote {model_name}")
+            if model_name == "fast":
+                fast_done.set()
+            return MockPromoteResponse(model_name)
+
+        mock_trigger_nmt.side_effect = [MockRun("slow"), MockRun("fast")]
+        mock_get_nmt_status.side_effect = get_nmt_status
+        mock_evaluate_models.side_effect = \
+            lambda active_model, candidates: candidates[0]
+        mock_promote_model.side_effect = promote_model
+
+        bootstrap_config = dataclasses.replace(self._test_bootstrap_config,
+                                               poll_initial_interval=0.01,
+                                               poll_max_interval=0.05)
+        with GraphGridSdk(bootstrap_config) as gg_sdk:
+            result = gg_sdk.nmt_train_pipeline(
+                [NlpModel.TRANSLATION, NlpModel.KEYPHRASE_EXTRACTION],
+                "some-dataset-id", False, False, True,
+                lambda status: events.append(f"success {status.dagRunId}"),
+                None)
+
+        self.assertEqual(events, ["success fast", "promote fast",
+                                  "success slow", "promote slow"])
+        self.assertEqual([status.dagRunId
+                          for status in result.modelStatusList],
+                         ["slow", "fast"])
+        self.assertEqual(result.promotedModelList, ["slow", "fast"])
+        mock_get_active_model.assert_any_call(NlpModel.TRANSLATION)
+        mock_get_active_model.assert_any_call(NlpModel.KEYPHRASE_EXTRACTION)
+
+    @mock.patch('graphgrid_sdk.ggcore.nmt_train_pipeline.select_best_model')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.promote_model')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_active_model')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_nmt_status')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.trigger_nmt')
+    def test_resume_pipeline(self, mock_trigger_nmt, mock_get_nmt_status,
+                             mock_get_active_model, mock_promote_model,
+                             mock_evaluate_models):
+        """Test that a resumed pipeline reattaches to running jobs and only
+        triggers and promotes outstanding work.
+        """
+
+        class MockRun:
+            status_code: int = 200
+
+            def __init__(self, dag_run_id, state=None):
+                self.dagRunId = dag_run_id
+                self.state = state
+                self.savedModelName = dag_run_id
+
+        class MockPromoteResponse:
+            status_code: int = 200
+
+            def __init__(self, model_name):
+                self.modelName = model_name
+
+        mock_trigger_nmt.return_value = MockRun("new-run")
+        mock_get_nmt_status.side_effect = \
+            lambda dag_run_id, timeout=None: MockRun(dag_run_id, "success")
+        mock_evaluate_models.side_effect = \
+            lambda active_model, candidates: candidates[0]
+        mock_promote_model.side_effect = \
+            lambda model_name, environment: MockPromoteResponse(model_name)
+
+        with tempfile.TemporaryDirectory() as journal_dir:
+            journal = PipelineJournal(os.path.join(journal_dir,
+                                                   "pipeline.jsonl"))
+            journal.record_pipeline([NlpModel.TRANSLATION,
+                                     NlpModel.KEYPHRASE_EXTRACTION,
+                                     NlpModel.PART_OF_SPEECH_TAGGING],
+                                    "some-dataset-id", False, True, True)
+            journal.record_triggered(0, "done-run")
+            journal.record_finished(0, "done-run", "success")
+            journal.record_evaluated(0, "done-run")
+            journal.record_triggered(1, "running-run")
+
+            bootstrap_config = dataclasses.replace(
+                self._test_bootstrap_config, poll_initial_interval=0.01)
+            with GraphGridSdk(bootstrap_config) as gg_sdk:
+                result = gg_sdk.resume_pipeline(journal.path)
+            resumed = journal.replay()
+
+        mock_trigger_nmt.assert_called_once()
+        self.assertEqual(mock_trigger_nmt.call_args[0][0],
+                         TrainRequestBody(NlpModel.PART_OF_SPEECH_TAGGING,
+                                          "some-dataset-id", False, True))
+        self.assertEqual([status.dagRunId
+                          for status in result.modelStatusList],
+                         ["done-run", "running-run", "new-run"])
+        self.assertEqual(result.promotedModelList,
+                         ["done-run", "running-run", "new-run"])
+        self.assertEqual(mock_promote_model.call_count, 2)
+        self.assertEqual([(job.dag_run_id, job.evaluated)
+                          for job in resumed.jobs],
+                         [("done-run", True), ("running-run", True),
+                          ("new-run", True)])
+
+    @mock.patch('graphgrid_sdk.ggcore.nmt_train_pipeline.select_best_model')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.promote_model')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_active_model')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_nmt_status')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.trigger_nmt')
+    def test_nmt_train_pipeline__model_outcomes(
+            self, mock_trigger_nmt, mock_get_nmt_status, mock_get_active_model,
+            mock_promote_model, mock_evaluate_models):
+        """Test that the pipeline reports an outcome per model, in model
+        order.
+        """
+
+        class MockRun:
+            status_code: int = 200
+
+            def __init__(self, dag_run_id, state=None):
+                self.dagRunId = dag_run_id
+                self.state = state
+                self.savedModelName = dag_run_id
+
+        class MockPromoteResponse:
+            status_code: int = 200
+            modelName: str = "promoted-model"
+
+        def trigger_nmt(request_body, timeout=None, deduplicate=True):
+            if request_body.model == NlpModel.RELATION_EXTRACTION:
+                raise requests.ConnectionError("unreachable")
+            return MockRun(request_body.model.value)
+
+        mock_trigger_nmt.side_effect = trigger_nmt
+        mock_get_nmt_status.side_effect = \
+            lambda dag_run_id, timeout=None: MockRun(
+                dag_run_id,
+                "failed" if dag_run_id == NlpModel.KEYPHRASE_EXTRACTION.value
+                else "success")
+        mock_evaluate_models.side_effect = \
+            lambda active_model, candidates: next(
+                (candidate for candidate in candidates
+                 if candidate.dagRunId == NlpModel.TRANSLATION.value), None)
+        mock_promote_model.return_value = MockPromoteResponse()
+
+        bootstrap_config = dataclasses.replace(self._test_bootstrap_config,
+                                               poll_initial_interval=0.01)
+        with GraphGridSdk(bootstrap_config) as gg_sdk:
+            result = gg_sdk.nmt_train_pipeline(
+                [NlpModel.TRANSLATION, NlpModel.KEYPHRASE_EXTRACTION,
+                 NlpModel.RELATION_EXTRACTION,
+                 NlpModel.PART_OF_SPEECH_TAGGING],
+                "some-dataset-id", False, False, True, None, None)
+
+        self.assertEqual([(outcome.model, outcome.state, outcome.promoted,
+                           outcome.detail)
+                          for outcome in result.modelOutcomes],
+                         [("translation", "success", True, "promoted"),
+                          ("keyphrase_extraction", "failed", False,
+                           "training failed"),
+                          ("relation_extraction", None, False,
+                           "training could not be started or polled: "
+                           "unreachable"),
+                          ("part_of_speech_tagging", "success", False,
+                           "active model is better")])
+        self.assertEqual(result.promotedModelList, ["promoted-model"])
+        mock_promote_model.assert_called_once_with("translation", "default")
+
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_nmt_status')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.trigger_nmt')
+    def test_nmt_train_pipeline__finishes_jobs_while_triggering(
+            self, mock_trigger_nmt, mock_get_nmt_status):
+        """Test that finished jobs are handled while other jobs are still
+        being triggered.
+        """
+        translation_handled = threading.Event()
+
+        class MockRun:
+            status_code: int = 200
+
+            def __init__(self, dag_run_id, state=None):
+                self.dagRunId = dag_run_id
+                self.state = state
+
+        def trigger_nmt(request_body, timeout=None, deduplicate=True):
+            if request_body.model == NlpModel.NAMED_ENTITY_RECOGNITION:
+                # only triggered once the translation job was handled
+                assert translation_handled.wait(5)
+            return MockRun(request_body.model.value)
+
+        mock_trigger_nmt.side_effect = trigger_nmt
+        mock_get_nmt_status.side_effect = \
+            lambda dag_run_id, timeout=None: MockRun(dag_run_id, "success")
+
+        bootstrap_config = dataclasses.replace(self._test_bootstrap_config,
+                                               poll_initial_interval=0.01)
+        with GraphGridSdk(bootstrap_config) as gg_sdk:
+            result = gg_sdk.nmt_train_pipeline(
+                [NlpModel.TRANSLATION, NlpModel.NAMED_ENTITY_RECOGNITION],
+                "some-dataset-id", False, False, False,
+                lambda model_status: translation_handled.set(), None)
+
+        self.assertEqual([status.dagRunId for status in result.modelStatusList],
+                         ["translation", "named_entity_recognition"])
+
+    @mock.patch('graphgrid_sdk.ggcore.nmt_train_pipeline.select_best_model')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.promote_model')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_active_model')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_nmt_status')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.trigger_nmt')
+    def test_nmt_train_pipeline__prefetches_active_models(
+            self, mock_trigger_nmt, mock_get_nmt_status, mock_get_active_model,
+            mock_promote_model, mock_evaluate_models):
+        """Test that the active model of every task is fetched while the jobs
+        train, even without the cache, and that a prefetched active model is
+        confirmed before promoting once it may be stale.
+        """
+        prefetched = threading.Event()
+        active_models = []
+
+        class MockRun:
+            status_code: int = 200
+
+            def __init__(self, dag_run_id, state=None):
+                self.dagRunId = dag_run_id
+                self.state = state
+                self.savedModelName = dag_run_id
+
+        class MockPromoteResponse:
+            status_code: int = 200
+            modelName: str = "promoted-model"
+
+        def get_active_model(model):
+            active_models.append(model)
+            if len(active_models) == 2:
+                prefetched.set()
+            return mock.Mock(trainedModelData=None)
+
+        def get_nmt_status(dag_run_id, timeout=None):
+            # jobs only finish once both active models were fetched
+            return MockRun(dag_run_id,
+                           "success" if prefetched.wait(5) else "failed")
+
+        mock_trigger_nmt.side_effect = [MockRun("translation"),
+                                        MockRun("keyphrase")]
+        mock_get_nmt_status.side_effect = get_nmt_status
+        mock_get_active_model.side_effect = get_active_model
+        mock_evaluate_models.side_effect = \
+            lambda active_model, candidates: candidates[0]
+        mock_promote_model.return_value = MockPromoteResponse()
+
+        bootstrap_config = dataclasses.replace(self._test_bootstrap_config,
+                                               poll_initial_interval=0.01,
+                                               active_model_cache_ttl=None)
+        with GraphGridSdk(bootstrap_config) as gg_sdk:
+            result = gg_sdk.nmt_train_pipeline(
+                [NlpModel.TRANSLATION, NlpModel.KEYPHRASE_EXTRACTION],
+                "some-dataset-id", False, False, True, None, None)
+
+        self.assertEqual([outcome.detail for outcome in result.modelOutcomes],
+                         ["promoted", "promoted"])
+        self.assertEqual(set(active_models[:2]),
+                         {NlpModel.TRANSLATION,
+                          NlpModel.KEYPHRASE_EXTRACTION})
+        # without the cache every prefetched active model is fetched again before promoting
+        self.assertEqual(len(active_models), 4)
+
+    def test_nmt_train_pipeline__withdrawn_job_fails(self):
+        """Test that a job withdrawn from the training scheduler is reported
+        as failed instead of waited for.
+        """
+        withdrawn = Future()
+        withdrawn.cancel()
+        training_scheduler = mock.Mock()
+        training_scheduler.submit.return_value = withdrawn
+
+        pipeline = NmtTrainPipeline(self._test_bootstrap_config,
+                                    training_scheduler=training_scheduler)
+        result = pipeline.nmt_train_pipeline([NlpModel.TRANSLATION],
+                                             "some-dataset-id", False, False,
+                                             False, None, None)
+
+        self.assertEqual([(outcome.model, outcome.detail)
+                          for outcome in result.modelOutcomes],
+                         [("translation",
+                           "training could not be started or polled: "
+                           "training run was withdrawn before it was "
+                           "triggered")])
+
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_nmt_status')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.trigger_nmt')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.save_dataset')
+    def test_upload_train_pipeline__overlaps_upload_and_training(
+            self, mock_save_dataset, mock_trigger_nmt, mock_get_nmt_status):
+        """Test that the next dataset uploads while the previous one trains,
+        and failed uploads are skipped.
+        """
+        second_upload_started = threading.Event()
+
+        class MockRun:
+            status_code: int = 200
+
+            def __init__(self, dag_run_id, state=None):
+                self.dagRunId = dag_run_id
+                self.state = state
+
+        def save_dataset(generator, filename):
+            lines = list(generator)
+            if filename == "broken":
+                raise requests.ConnectionError("unreachable")
+            if filename == "second":
+                second_upload_started.set()
+            return mock.Mock(status_code=200,
+                             dataset_id=f"{filename}-{len(lines)}")
+
+        def get_nmt_status(dag_run_id, timeout=None):
+            if dag_run_id == "first-1":
+                # training on the first dataset only finishes once the second
+                # one is uploading
+                assert second_upload_started.wait(5)
+            return MockRun(dag_run_id, "success")
+
+        mock_save_dataset.side_effect = save_dataset
+        mock_trigger_nmt.side_effect = \
+            lambda request_body, timeout=None, deduplicate=True: \
+            MockRun(request_body.dataset_id)
+        mock_get_nmt_status.side_effect = get_nmt_status
+
+        datasets = ((iter(["line"] * (i + 1)), filename) for i, filename
+                    in enumerate(["first", "broken", "second"]))
+        bootstrap_config = dataclasses.replace(self._test_bootstrap_config,
+                                               poll_initial_interval=0.01)
+        with GraphGridSdk(bootstrap_config) as gg_sdk:
+            results = gg_sdk.upload_train_pipeline(
+                datasets, [NlpModel.TRANSLATION], False, False, False)
+
+        self.assertEqual([(result.index, result.datasetId, result.detail)
+                          for result in results],
+                         [(0, "first-1", None),
+                          (1, None, "upload failed: unreachable"),
+                          (2, "second-3", None)])
+        self.assertEqual([[status.dagRunId for status
+                           in result.pipelineResponse.modelStatusList]
+                          for result in results if result.pipelineResponse is not None],
+                         [["first-1"], ["second-3"]])
@@ -1,7 +1,12 @@
 """Define tests around the security base and auth header creation."""
+from unittest.mock import patch
 
+import responses
+
+from graphgrid_sdk.ggcore.api import SecurityApi
+from graphgrid_sdk.ggcore.client import InternalSecurityClient
 from graphgrid_sdk.ggcore.security_base import SdkAuthHeaderBuilder
-from graphgrid_sdk.ggcore.utils import AUTH_HEADER_KEY
+from graphgrid_sdk.ggcore.utils import AUTH_HEADER_KEY, RequestAuthType
 from tests.test_base import TestBootstrapBase, TestBase
 
 
@@ -29,3 +34,41 @@ class TestAuth(TestBootstrapBase):
             TestBase.TEST_TOKEN)
 
         assert actual_headers == expected_headers
+
+    # pylint: disable=protected-access
+    @responses.activate
+    def test_auth_basic_header__cached_per_client(self):
+        """Test basic auth header is read-only and built once per security
+        client, not kept for the process.
+        """
+        responses.add(responses.POST,
+                      f'http://localhost/1.0/security/'
+                      f'{SecurityApi.get_token_api().endpoint()}',
+                      json={"access_token": TestBase.TEST_TOKEN,
+                            "token_type": RequestAuthType.BEARER.value,
+                            "expires_in": 50_000}, status=200)
+        security_client = InternalSecurityClient(self._test_bootstrap_config)
+
+        with patch.object(SdkAuthHeaderBuilder, "get_basic_header",
+                          wraps=SdkAuthHeaderBuilder.get_basic_header) \
+                as get_basic_header:
+            security_client._get_token_builtin()
+            security_client._get_token_builtin()
+            get_basic_header.assert_called_once()
+
+        basic_header = SdkAuthHeaderBuilder.get_basic_header(
+            self._test_bootstrap_config)
+        assert security_client._basic_header is not basic_header
+        with self.assertRaises(TypeError):
+            basic_header[AUTH_HEADER_KEY] = ""
+
+    # pylint: disable=no-self-use
+    def test_auth_bearer_header__cached_per_token(self):
+        """Test bearer auth header is reused for a token and rebuilt for a
+        new one.
+        """
+        first = SdkAuthHeaderBuilder.get_bearer_header("token-1")
+
+        assert SdkAuthHeaderBuilder.get_bearer_header("token-1") is first
+        assert SdkAuthHeaderBuilder.get_bearer_header("token-2") == {
+            AUTH_HEADER_KEY: 'Bearer token-2'}
@@ -1,11 +1,24 @@
 """Define test classes for session features and TokenFactory."""
+import dataclasses
+import json
+import os
+import stat
+import tempfile
+import threading
 import time
+from unittest.mock import patch
 
 import responses
 
 from graphgrid_sdk.ggcore.api import SecurityApi
 from graphgrid_sdk.ggcore.client import InternalSecurityClient
-from graphgrid_sdk.ggcore.session import TokenFactory
+from graphgrid_sdk.ggcore.http_base import SdkHttpClient
+from graphgrid_sdk.ggcore.sdk_messages import GenericResponse, \
+    GetTokenResponse
+from graphgrid_sdk.ggcore.token_cache import FileTokenCache
+from graphgrid_sdk.ggcore.session import TokenFactory, TokenRegistry, \
+    TokenTracker, get_time_in_ms
+from graphgrid_sdk.ggsdk.sdk import GraphGridSdk
 from graphgrid_sdk.ggcore.utils import RequestAuthType
 from tests.test_base import TestBootstrapBase, TestBase
 
@@ -93,3 +106,320 @@ class TestTokenFactory(TestBootstrapBase):
         # assert the current token is updated and matches the mock response
         # token value.
         assert token_factory.get_current_token() == test_token_after_expiry
+
+
+class TestTokenRegistry(TestBootstrapBase):
+    """Define test class for grouping shared token registry tests."""
+
+    _token_json_body = {"access_token": TestBase.TEST_TOKEN,
+                        "token_type": RequestAuthType.BEARER.value,
+                        "expires_in": 50_000,
+                        "createdAt": "2022-04-01T19:48:47.647Z"}
+
+    # pylint: disable=protected-access
+    @responses.activate
+    def test_token_registry__one_token_per_credential(self):
+        """Test that all clients of several sdk instances with the same
+        credential share one token request.
+        """
+        responses.add(responses.POST,
+                      f'http://localhost/1.0/security/'
+                      f'{SecurityApi.get_token_api().endpoint()}',
+                      json=self._token_json_body, status=200)
+
+        sdks = [GraphGridSdk(self._test_bootstrap_config) for _ in range(3)]
+        for gg_sdk in sdks:
+            gg_sdk._core._config_client.security_client.prepare_auth()
+            gg_sdk._core._nlp_client.security_client.prepare_auth()
+
+        assert len(responses.calls) == 1
+
+    # pylint: disable=no-self-use
+    def test_token_registry__keyed_by_credential(self):
+        """Test that different credentials get different token factories."""
+        other_config = dataclasses.replace(self._test_bootstrap_config,
+                                           access_key="other-access-key")
+        other_secret_config = dataclasses.replace(
+            self._test_bootstrap_config, secret_key="other-secret-key")
+
+        def no_call():
+            return None
+
+        factory = TokenRegistry.token_factory(
+            self._test_bootstrap_config, no_call, no_call)
+
+        assert TokenRegistry.token_factory(
+            self._test_bootstrap_config, no_call, no_call) is factory
+        assert TokenRegistry.token_factory(
+            other_config, no_call, no_call) is not factory
+        assert TokenRegistry.token_factory(
+            other_secret_config, no_call, no_call) is not factory
+
+    @responses.activate
+    def test_token_registry__fetches_on_caller_connections(self):
+        """Test that a shared token is fetched over the connections of the
+        client asking for it, not those of the first registered client.
+        """
+        responses.add(responses.POST,
+                      f'http://localhost/1.0/security/'
+                      f'{SecurityApi.get_token_api().endpoint()}',
+                      json=self._token_json_body, status=200)
+        first_http_client = SdkHttpClient(self._test_bootstrap_config)
+        caller_http_client = SdkHttpClient(self._test_bootstrap_config)
+        InternalSecurityClient(self._test_bootstrap_config, first_http_client)
+        caller = InternalSecurityClient(self._test_bootstrap_config,
+                                        caller_http_client)
+
+        with patch.object(first_http_client, "execute_request") \
+                as first_execute_request, \
+                patch.object(caller_http_client, "execute_request",
+                             wraps=caller_http_client.execute_request) \
+                as caller_execute_request:
+            caller.prepare_auth()
+
+        first_execute_request.assert_not_called()
+        caller_execute_request.assert_called_once()
+        assert caller.get_current_token() == TestBase.TEST_TOKEN
+
+
+class TestTokenFactoryConcurrency(TestBootstrapBase):
+    """Define test class for grouping thread-safety of token refresh."""
+
+    @staticmethod
+    def _token_supplier(calls: list, release: threading.Event = None):
+        """Return a token supplier that counts calls and can be held."""
+
+        def supply():
+            calls.append(1)
+            if release is not None:
+                release.wait(5)
+            else:
+                time.sleep(0.05)
+            return GetTokenResponse(GenericResponse(200, json.dumps(
+                {"access_token": f"token-{len(calls)}",
+                 "expires_in": 50_000})))
+
+        return supply
+
+    @staticmethod
+    def _run_threads(target, count=20):
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    # pylint: disable=no-self-use
+    def test_token_factory__single_flight_refresh(self):
+        """Test that concurrent callers without a token trigger exactly one
+        token request.
+        """
+        calls = []
+        token_factory = TokenFactory(self._token_supplier(calls), None)
+
+        self._run_threads(token_factory.refresh_token)
+
+        assert len(calls) == 1
+        assert token_factory.get_current_token() == "token-1"
+
+    # pylint: disable=no-self-use
+    def test_token_factory__single_flight_forced_refresh(self):
+        """Test that concurrent forced refreshes of the same stale token
+        trigger exactly one token request.
+        """
+        calls = []
+        token_factory = TokenFactory(self._token_supplier(calls), None)
+        token_factory.refresh_token()
+        stale_token = token_factory.get_current_token()
+
+        self._run_threads(lambda: token_factory.refresh_token(
+            force_refresh=True, stale_token=stale_token))
+
+        assert len(calls) == 2
+        assert token_factory.get_current_token() == "token-2"
+
+    # pylint: disable=protected-access
+    def test_token_factory__usable_token_not_blocked(self):
+        """Test that while one caller refreshes a token inside the expiry
+        buffer, others keep using the still-valid token.
+        """
+        calls = []
+        release = threading.Event()
+        token_factory = TokenFactory(self._token_supplier(calls, release),
+                                     None)
+        # valid for one more second: inside the refresh buffer
+        token_factory._token_tracker = TokenTracker(
+            "old-token", 1_000, get_time_in_ms())
+
+        refresher = threading.Thread(target=token_factory.refresh_token)
+        refresher.start()
+        while not calls:
+            time.sleep(0.01)
+
+        assert token_factory.refresh_token() == "old-token"
+
+        release.set()
+        refresher.join()
+        assert token_factory.get_current_token() == "token-1"
+
+
+class TestTokenRenewer(TestBootstrapBase):
+    """Define test class for grouping background token renewal tests."""
+
+    @staticmethod
+    def _token_supplier(calls: list, fail_after: int = None):
+        """Return a token supplier of short-lived tokens that counts calls
+        and fails once ``fail_after`` calls were made.
+        """
+
+        def supply():
+            calls.append(1)
+            if fail_after is not None and len(calls) > fail_after:
+                return GetTokenResponse(GenericResponse(503, "{}"))
+            return GetTokenResponse(GenericResponse(200, json.dumps(
+                {"access_token": f"token-{len(calls)}", "expires_in": 2})))
+
+        return supply
+
+    @staticmethod
+    def _wait_for(condition, timeout=5.0):
+        end = time.monotonic() + timeout
+        while not condition() and time.monotonic() < end:
+            time.sleep(0.05)
+
+    # pylint: disable=no-self-use
+    def test_token_renewer__renews_before_expiry(self):
+        """Test that the renewer fetches the first token and renews it
+        without any caller refreshing.
+        """
+        calls = []
+        token_factory = TokenFactory(self._token_supplier(calls), None)
+        token_factory.start_renewer(renewal_fraction=0.5, jitter_fraction=0)
+        try:
+            self._wait_for(lambda: len(calls) >= 2)
+        finally:
+            token_factory.stop_renewer()
+
+        assert not token_factory.renewer_running
+        assert token_factory.get_current_token() == f"token-{len(calls)}"
+        assert len(calls) >= 2
+
+    # pylint: disable=no-self-use
+    def test_token_renewer__failure_falls_back_to_lazy_refresh(self):
+        """Test that a failing renewer is reported and callers still get a
+        token on the request path.
+        """
+        calls = []
+        token_factory = TokenFactory(self._token_supplier(calls, 1), None)
+        token_factory.start_renewer(renewal_fraction=0.5, jitter_fraction=0)
+        try:
+            self._wait_for(lambda: token_factory.renewer_failures > 0)
+        finally:
+            token_factory.stop_renewer()
+        assert token_factory.renewer_failures > 0
+
+        token_factory._token_supplier = self._token_supplier([])
+        token_factory.refresh_token()
+        assert token_factory.get_current_token() == "token-1"
+
+    # pylint: disable=no-self-use
+    def test_token_renewer__started_from_config(self):
+        """Test that the registry starts the renewer when configured and
+        stops it when cleared.
+        """
+        bootstrap_config = dataclasses.replace(self._test_bootstrap_config,
+                                               token_renewal_fraction=0.75)
+        token_factory = TokenRegistry.hold(
+            bootstrap_config, self._token_supplier([]), None)
+        assert token_factory.renewer_running
+
+        TokenRegistry.clear()
+        assert not token_factory.renewer_running
+
+    def test_token_renewer__stopped_when_last_sdk_closes(self):
+        """Test that the renewer keeps running while any sdk holding the
+        credential is open, and stops once the last one closes.
+        """
+        bootstrap_config = dataclasses.replace(self._test_bootstrap_config,
+                                               token_renewal_fraction=0.75)
+        with patch.object(InternalSecurityClient, "_get_token_builtin",
+                          autospec=True,
+                          return_value=GetTokenResponse(GenericResponse(
+                              200, json.dumps({"access_token": "token-1",
+                                               "expires_in": 10_000})))):
+            first_sdk = GraphGridSdk(bootstrap_config)
+            second_sdk = GraphGridSdk(bootstrap_config)
+            token_factory = TokenRegistry.token_factory(bootstrap_config,
+                                                        None, None)
+            assert token_factory.renewer_running
+
+            first_sdk.close()
+            first_sdk.close()
+            assert token_factory.renewer_running
+
+            second_sdk.close()
+            assert not token_factory.renewer_running
+
+
+class TestFileTokenCache(TestBootstrapBase):
+    """Define test class for grouping cross-process token cache tests."""
+
+    @staticmethod
+    def _token_supplier(calls: list):
+        """Return a token supplier that counts calls."""
+
+        def supply():
+            calls.append(1)
+            return GetTokenResponse(GenericResponse(200, json.dumps(
+                {"access_token": f"token-{len(calls)}",
+                 "expires_in": 50_000})))
+
+        return supply
+
+    # pylint: disable=no-self-use
+    def test_file_token_cache__token_reused_across_factories(self):
+        """Test that a second factory, as in another process, reuses the
+        cached token instead of requesting one.
+        """
+        calls = []
+        with tempfile.TemporaryDirectory() as cache_dir:
+            factories = [
+                TokenFactory(self._token_supplier(calls), None,
+                             FileTokenCache(cache_dir, ("host", "key", "s")))
+                for _ in range(2)]
+
+            tokens = [token_factory.refresh_token()
+                      for token_factory in factories]
+            cache_path = FileTokenCache(cache_dir, ("host", "key", "s")).path
+            mode = stat.S_IMODE(os.stat(cache_path).st_mode)
+
+        assert len(calls) == 1
+        assert tokens == ["token-1", "token-1"]
+        assert mode == 0o600
+
+    # pylint: disable=no-self-use
+    def test_file_token_cache__rejected_token_not_reused(self):
+        """Test that a forced refresh of a rejected token requests a new
+        token even though the cached one has not expired.
+        """
+        calls = []
+        with tempfile.TemporaryDirectory() as cache_dir:
+            token_cache = FileTokenCache(cache_dir, ("host", "key", "s"))
+            token_factory = TokenFactory(self._token_supplier(calls), None,
+                                         token_cache)
+            token_factory.refresh_token()
+            token_factory.refresh_token(force_refresh=True,
+                                        stale_token="token-1")
+
+            cached_token = token_cache.read()["token"]
+
+        assert len(calls) == 2
+        assert token_factory.get_current_token() == "token-2"
+        assert cached_token == "token-2"
+
+    # pylint: disable=no-self-use
+    def test_file_token_cache__keyed_by_credential(self):
+        """Test that different credentials use different cache files."""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            assert FileTokenCache(cache_dir, ("host", "a", "s")).path \
+                != FileTokenCache(cache_dir, ("host", "b", "s")).path
@@ -0,0 +1,218 @@
+"""Define test classes for nmt train sweeps."""
+import dataclasses
+import os
+import tempfile
+import threading
+from unittest import mock
+
+from graphgrid_sdk.ggcore.metrics_store import MetricsStore, \
+    ActiveModelRecord
+from graphgrid_sdk.ggcore.scheduler import TrainingSchedulerRegistry
+from graphgrid_sdk.ggcore.sweep import train_request_grid
+from graphgrid_sdk.ggcore.sdk_messages import TrainedModelData
+from graphgrid_sdk.ggcore.utils import NlpModel
+from graphgrid_sdk.ggsdk.sdk import GraphGridSdk
+from tests.test_base import TestBootstrapBase
+
+# eval loss and accuracy per (task, dataset) of runs that succeed
+METRICS = {("translation", "a"): (0.1, 0.9),
+           ("translation", "b"): (0.4, 0.6),
+           ("named_entity_recognition", "a"): (0.5, 0.5)}
+
+
+# pylint: disable=too-many-instance-attributes
+class MockRun:
+    """Define minimal training trigger and status response."""
+    status_code: int = 200
+
+    # pylint: disable=invalid-name
+    def __init__(self, dagRunId, state="queued"):
+        self.dagRunId = dagRunId
+        self.state = state
+        self.savedModelName = f"{dagRunId}-model"
+        self.evalLoss, self.evalAccuracy = METRICS.get(
+            tuple(dagRunId.split("/")), (None, None))
+        self.trainingLoss = None
+        self.trainingAccuracy = None
+        # translation runs train with changed properties
+        self.properties = {"vocabulary": "v2" if dagRunId.startswith(
+            "translation/") else "v1"}
+
+
+class MockActiveModel:
+    """Define minimal get active model response."""
+    status_code: int = 200
+
+    # pylint: disable=invalid-name
+    def __init__(self, evalLoss, evalAccuracy):
+        self.trainedModelData = MockRun("active")
+        self.trainedModelData.evalLoss = evalLoss
+        self.trainedModelData.evalAccuracy = evalAccuracy
+
+
+class TestNmtTrainSweep(TestBootstrapBase):
+    """Define test class for grouping nmt train sweep tests."""
+
+    def setUp(self):
+        super().setUp()
+        self._lock = threading.Lock()
+        self._running = set()
+        self._max_running = 0
+
+    # pylint: disable=unused-argument
+    def _trigger_nmt(self, request_body, timeout=None, deduplicate=True):
+        dag_run_id = f"{request_body.model.value}/{request_body.dataset_id}"
+        with self._lock:
+            self._running.add(dag_run_id)
+            self._max_running = max(self._max_running, len(self._running))
+        return MockRun(dag_run_id)
+
+    # pylint: disable=unused-argument
+    def _get_nmt_status(self, dag_run_id, timeout=None):
+        with self._lock:
+            self._running.discard(dag_run_id)
+        return MockRun(dag_run_id, "success" if tuple(dag_run_id.split("/"))
+                       in METRICS else "failed")
+
+    # pylint: disable=too-many-arguments
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.promote_model')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_active_model')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_nmt_status')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.trigger_nmt')
+    def test_nmt_train_sweep__promotes_best_run_per_task(
+            self, mock_trigger_nmt, mock_get_nmt_status,
+            mock_get_active_model, mock_promote_model):
+        """Test that a sweep respects its concurrency limit, reports every
+        run, and promotes each task's best run only if it beats the active
+        model. Runs whose properties changed beat the active model and are
+        ranked against each other.
+        """
+        mock_trigger_nmt.side_effect = self._trigger_nmt
+        mock_get_nmt_status.side_effect = self._get_nmt_status
+        mock_get_active_model.side_effect = lambda model: MockActiveModel(
+            0.05, 0.95) if model == NlpModel.TRANSLATION \
+            else MockActiveModel(0.1, 0.9)
+        mock_promote_model.side_effect = lambda name, environment: \
+            mock.Mock(status_code=200, modelName=name)
+
+        request_bodies = train_request_grid(
+            [NlpModel.TRANSLATION, NlpModel.NAMED_ENTITY_RECOGNITION,
+             NlpModel.KEYPHRASE_EXTRACTION], ["a", "b"])
+        handled = []
+        bootstrap_config = dataclasses.replace(self._test_bootstrap_config,
+                                               poll_initial_interval=0.01)
+        with GraphGridSdk(bootstrap_config) as gg_sdk:
+            result = gg_sdk.nmt_train_sweep(request_bodies, max_concurrent=2,
+                                            autopromote=True,
+                                            result_handler=handled.append)
+
+        assert self._max_running <= 2
+        assert sorted(run.index for run in handled) == list(range(6))
+        assert [(run.requestBody.dataset_id, run.state)
+                for run in result.runResults] == [
+                    ("a", "success"), ("b", "success"), ("a", "success"),
+                    ("b", "failed"), ("a", "failed"), ("b", "failed")]
+        assert [(outcome.model, outcome.dagRunId, outcome.promoted,
+                 outcome.detail) for outcome in result.taskOutcomes] == [
+                     ("translation", "translation/a", True, "promoted"),
+                     ("named_entity_recognition", "named_entity_recognition/a",
+                      False, "active model is better"),
+                     ("keyphrase_extraction", None, False,
+                      "no training run succeeded")]
+        assert result.promotedModelList == ["translation/a-model"]
+        mock_promote_model.assert_called_once_with("translation/a-model",
+                                                   "default")
+
+    # pylint: disable=too-many-arguments
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.promote_model')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_active_model')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_nmt_status')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.trigger_nmt')
+    def test_nmt_train_sweep__confirms_recorded_active_model(
+            self, mock_trigger_nmt, mock_get_nmt_status,
+            mock_get_active_model, mock_promote_model):
+        """Test that a run beating a stale recorded active model is not
+        promoted if the fetched active model is better.
+        """
+        mock_trigger_nmt.side_effect = self._trigger_nmt
+        mock_get_nmt_status.side_effect = self._get_nmt_status
+        mock_get_active_model.return_value = mock.Mock(
+            status_code=200, modelName="elsewhere-model",
+            trainedModelData=TrainedModelData(
+                "named_entity_recognition", [], None, None, 0.9, 0.1,
+                {"vocabulary": "v1"}, None, None, None))
+
+        with tempfile.TemporaryDirectory() as directory:
+            bootstrap_config = dataclasses.replace(
+                self._test_bootstrap_config, poll_initial_interval=0.01,
+                metrics_store_path=os.path.join(directory, "metrics.db"))
+            MetricsStore(bootstrap_config.metrics_store_path) \
+                .record_active_model(
+                    "named_entity_recognition", ActiveModelRecord(
+                        "recorded-model", TrainedModelData(
+                            "named_entity_recognition", [], None, None, 0.1,
+                            0.9, {"vocabulary": "v1"}, None, None, None),
+                        0.0))
+            with GraphGridSdk(bootstrap_config) as gg_sdk:
+                result = gg_sdk.nmt_train_sweep(
+                    train_request_grid([NlpModel.NAMED_ENTITY_RECOGNITION],
+                                       ["a"]), autopromote=True)
+
+        assert [(outcome.dagRunId, outcome.promoted, outcome.detail)
+                for outcome in result.taskOutcomes] == [
+                    ("named_entity_recognition/a", False,
+                     "active model is better")]
+        mock_get_active_model.assert_called_once()
+        mock_promote_model.assert_not_called()
+
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_nmt_status')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.trigger_nmt')
+    def test_nmt_train_sweep__shares_training_limits(self, mock_trigger_nmt,
+                                                     mock_get_nmt_status):
+        """Test that sweep runs are admitted by the process-wide training
+        scheduler, whose limit holds below the sweep's own.
+        """
+        mock_trigger_nmt.side_effect = self._trigger_nmt
+        mock_get_nmt_status.side_effect = self._get_nmt_status
+
+        request_bodies = train_request_grid([NlpModel.TRANSLATION],
+                                            ["a", "b", "c"])
+        bootstrap_config = dataclasses.replace(self._test_bootstrap_config,
+                                               poll_initial_interval=0.01,
+                                               max_concurrent_training=1)
+        with GraphGridSdk(bootstrap_config) as gg_sdk:
+            training_scheduler = TrainingSchedulerRegistry.training_scheduler(
+                bootstrap_config)
+            with mock.patch.object(training_scheduler, "submit",
+                                   wraps=training_scheduler.submit) \
+                    as mock_submit:
+                result = gg_sdk.nmt_train_sweep(request_bodies,
+                                                max_concurrent=3)
+
+        assert self._max_running == 1
+        assert mock_submit.call_count == 3
+        assert len(result.runResults) == 3
+
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.get_nmt_status')
+    @mock.patch('graphgrid_sdk.ggcore.client.NlpClient.trigger_nmt')
+    def test_stream_nmt_train_sweep(self, mock_trigger_nmt,
+                                    mock_get_nmt_status):
+        """Test that streamed results arrive as runs finish, and that
+        closing the stream withdraws runs not triggered yet.
+        """
+        mock_trigger_nmt.side_effect = self._trigger_nmt
+        mock_get_nmt_status.side_effect = self._get_nmt_status
+
+        request_bodies = train_request_grid([NlpModel.TRANSLATION],
+                                            ["a", "b", "c", "d"])
+        bootstrap_config = dataclasses.replace(self._test_bootstrap_config,
+                                               poll_initial_interval=0.2)
+        with GraphGridSdk(bootstrap_config) as gg_sdk:
+            results = gg_sdk.stream_nmt_train_sweep(request_bodies,
+                                                    max_concurrent=1)
+            first = next(results)
+            results.close()
+
+        assert (first.index, first.dagRunId, first.state) \
+            == (0, "translation/a", "success")
+        assert mock_trigger_nmt.call_count < len(request_bodies)